@@ -0,0 +1,69 @@
+import time
+from model.batch_evaluator import BatchEvaluator
+from model.engine import Engine
+from model.policies import RandomPolicy
+from model.board import Board
+
+
+def generate_positions(count=4096, seed=0, plies=120):
+    """
+    Collect positions from seeded random games
+
+    Args:
+        count: Number of positions
+        seed: Seed for the random games
+        plies: Maximum length of every game
+
+    Returns:
+        List of python-chess Boards
+    """
+    policy = RandomPolicy(seed)
+    positions = []
+    while len(positions) < count:
+        board = Board()
+        for _ in range(plies):
+            move = policy.choose_move(board)
+            if move is None or len(positions) == count:
+                break
+            board.push(move)
+            positions.append(board.chess_board.copy(stack=False))
+    return positions
+
+
+def run_eval_benchmark(count=4096, seed=0):
+    """
+    Time scoring a set of positions one by one and in one batch
+
+    The scalar run uses Engine.evaluate (material and piece-square tables
+    only); the batch run computes every BatchEvaluator term on top.
+
+    Args:
+        count: Number of positions
+        seed: Seed for the random games the positions come from
+
+    Returns:
+        Dictionary mapping "scalar" and "batch" to the position count,
+        time and positions per second
+    """
+    positions = generate_positions(count, seed)
+    engine = Engine()
+    evaluator = BatchEvaluator()
+    results = {}
+
+    start_time = time.perf_counter()
+    for chess_board in positions:
+        engine.evaluate(chess_board)
+    results["scalar"] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    evaluator.evaluate(positions)
+    results["batch"] = time.perf_counter() - start_time
+
+    return {
+        name: {
+            "positions": len(positions),
+            "seconds": round(seconds, 6),
+            "nps": int(len(positions) / seconds) if seconds > 0 else 0
+        }
+        for name, seconds in results.items()
+    }
\ No newline at end of file
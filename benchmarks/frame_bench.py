@@ -0,0 +1,127 @@
+import os
+import time
+
+# Render without a window; must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import chess
+from controller.game_controller import GameController
+from model.policies import RandomPolicy
+from model.board import Board
+from view.board_view import BoardView
+from view.gui import ChessGUI
+from view.piece_view import PieceView
+from view.sprite_atlas import SpriteAtlas
+
+# Fixed openings followed by seeded random play keep every run identical
+SCRIPTED_OPENINGS = [
+    "e2e4 e7e5 g1f3 b8c6 f1b5 a7a6 b5a4 g8f6 e1g1 f8e7",
+    "d2d4 d7d5 c2c4 e7e6 b1c3 g8f6 c1g5 f8e7 e2e3 e8g8",
+    "e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6 b1c3 a7a6"
+]
+
+
+def generate_games(plies=80, seed=0):
+    """
+    Build the scripted games replayed by the benchmark
+
+    Args:
+        plies: Length of every game in plies (shorter if it ends earlier)
+        seed: Seed for the random continuation
+
+    Returns:
+        List of games, each a list of python-chess Moves
+    """
+    games = []
+    for number, opening in enumerate(SCRIPTED_OPENINGS):
+        board = Board()
+        policy = RandomPolicy(seed + number)
+        moves = [chess.Move.from_uci(uci) for uci in opening.split()]
+        for move in moves:
+            board.push(move)
+        while len(moves) < plies and not board.is_game_over():
+            move = policy.choose_move(board)
+            if move.promotion:
+                # Clicks always promote to a queen
+                move = chess.Move(move.from_square, move.to_square, chess.QUEEN)
+            board.push(move)
+            moves.append(move)
+        games.append(moves)
+    return games
+
+
+def summarize(samples):
+    """
+    Summarize frame times
+
+    Args:
+        samples: List of frame times in seconds
+
+    Returns:
+        Dictionary of count, mean, median, 95th percentile and maximum in ms
+    """
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4)
+    }
+
+
+def run_frame_benchmark(plies=80, seed=0, size=512):
+    """
+    Time GameController.update_display while replaying scripted games
+
+    Every move is played through mouse clicks on the controller. The
+    frame after selecting a piece, the frame after completing the move and
+    a forced full redraw of the same position are timed separately.
+
+    Args:
+        plies: Length of every scripted game in plies
+        seed: Seed for the scripted games
+        size: Window size in pixels
+
+    Returns:
+        Dictionary mapping frame kinds to timing summaries
+    """
+    gui = ChessGUI(size, size)
+    atlas = SpriteAtlas((BoardView.WHITE, BoardView.GRAY))
+    board_view = BoardView(gui.screen, gui.square_size, atlas=atlas)
+    piece_view = PieceView(gui.square_size, atlas)
+    controller = GameController(board_view, piece_view, gui)
+    # Time the position changes themselves, not slides spread over frames
+    controller.animate_moves = False
+
+    samples = {"select": [], "move": [], "full": []}
+
+    def click(square):
+        row = 7 - chess.square_rank(square)
+        col = chess.square_file(square)
+        controller.handle_square_click((
+            col * gui.square_size + gui.square_size // 2,
+            row * gui.square_size + gui.square_size // 2
+        ))
+
+    def timed_update(kind):
+        start_time = time.perf_counter()
+        controller.update_display()
+        samples[kind].append(time.perf_counter() - start_time)
+
+    for moves in generate_games(plies, seed):
+        controller.reset_game()
+        controller.update_display()
+        for move in moves:
+            click(move.from_square)
+            timed_update("select")
+            click(move.to_square)
+            timed_update("move")
+            controller.request_full_redraw()
+            timed_update("full")
+
+    gui.quit()
+    return {kind: summarize(times) for kind, times in samples.items()}
\ No newline at end of file
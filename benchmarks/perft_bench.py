@@ -0,0 +1,35 @@
+from model.board import Board
+from model.perft import PERFT_POSITIONS, run_perft
+
+def run_perft_benchmark(max_depth=3, backend="python-chess"):
+    """
+    Run perft over the standard test positions
+
+    Args:
+        max_depth: Deepest perft depth to run per position
+        backend: Board backend generating the moves (see Board.BACKENDS)
+
+    Returns:
+        Dictionary mapping position names to results with the node count,
+        the expected count, whether they match, time and nodes per second
+    """
+    results = {}
+    for name, fen, expected_counts in PERFT_POSITIONS:
+        depth = min(max_depth, len(expected_counts))
+        board = Board(backend)
+        board.reset(fen)
+        if backend == "bitboard":
+            # Load the attack tables and set up the mirror before timing
+            board.get_position()
+
+        nodes, seconds = run_perft(board, depth)
+        expected = expected_counts[depth - 1]
+        results[name] = {
+            "depth": depth,
+            "nodes": nodes,
+            "expected": expected,
+            "ok": nodes == expected,
+            "seconds": round(seconds, 6),
+            "nps": int(nodes / seconds) if seconds > 0 else 0
+        }
+    return results
\ No newline at end of file
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from benchmarks.eval_bench import run_eval_benchmark
+from benchmarks.perft_bench import run_perft_benchmark
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Metrics compared against the baseline and whether higher is better
+TRACKED_METRICS = {
+    "nps": True,
+    "mean_ms": False,
+    "p50_ms": False,
+    "p95_ms": False
+}
+
+
+def flatten_metrics(results):
+    """
+    Collect the tracked metrics of a result document
+
+    Args:
+        results: Benchmark results as produced by run_benchmarks
+
+    Returns:
+        Dictionary mapping dotted metric names to values
+    """
+    metrics = {}
+    for section in ("perft", "perft_bitboard", "evaluation", "frames"):
+        for name, values in results.get(section, {}).items():
+            for metric in TRACKED_METRICS:
+                if metric in values:
+                    metrics[f"{section}.{name}.{metric}"] = values[metric]
+    return metrics
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compare results against a baseline
+
+    Args:
+        results: Current benchmark results
+        baseline: Baseline benchmark results
+        tolerance: Allowed relative slowdown, e.g. 0.15 for 15%
+
+    Returns:
+        List of comparison dictionaries, one per metric present in both
+    """
+    current = flatten_metrics(results)
+    reference = flatten_metrics(baseline)
+    comparisons = []
+
+    for name, value in sorted(current.items()):
+        if name not in reference or not reference[name]:
+            continue
+        higher_is_better = TRACKED_METRICS[name.rsplit('.', 1)[1]]
+        ratio = value / reference[name]
+        slowdown = (1 / ratio if ratio else float("inf")) if higher_is_better else ratio
+        comparisons.append({
+            "metric": name,
+            "baseline": reference[name],
+            "current": value,
+            "ratio": round(ratio, 4),
+            "regression": slowdown > 1 + tolerance
+        })
+    return comparisons
+
+
+def run_benchmarks(perft_depth=3, frames=True, plies=80):
+    """
+    Run the benchmark suite (perft with both board backends, position
+    evaluation and frame times)
+
+    Args:
+        perft_depth: Deepest perft depth per test position
+        frames: Whether to run the frame-time benchmark
+        plies: Length of the scripted games of the frame-time benchmark
+
+    Returns:
+        Dictionary of results, ready to be written as JSON
+    """
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "perft_depth": perft_depth,
+            "plies": plies
+        },
+        "perft": run_perft_benchmark(perft_depth),
+        "perft_bitboard": run_perft_benchmark(perft_depth, "bitboard"),
+        "evaluation": run_eval_benchmark()
+    }
+    if frames:
+        # Imported lazily so perft-only runs never load pygame
+        from benchmarks.frame_bench import run_frame_benchmark
+        results["frames"] = run_frame_benchmark(plies)
+    return results
+
+
+def main(argv=None):
+    """Command-line entry point for the benchmark suite"""
+    parser = argparse.ArgumentParser(description="Run perft and frame-time benchmarks")
+    parser.add_argument("--perft-depth", type=int, default=3, help="deepest perft depth per position")
+    parser.add_argument("--plies", type=int, default=80, help="plies per scripted game in the frame benchmark")
+    parser.add_argument("--no-frames", action="store_true", help="skip the frame-time benchmark")
+    parser.add_argument("--output", help="write results JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown before failing")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.perft_depth, not args.no_frames, args.plies)
+    failed = [
+        f"{section}.{name}"
+        for section in ("perft", "perft_bitboard")
+        for name, values in results[section].items() if not values["ok"]
+    ]
+
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as baseline_file:
+            comparisons = compare_to_baseline(results, json.load(baseline_file), args.tolerance)
+        results["comparison"] = comparisons
+        failed += [item["metric"] for item in comparisons if item["regression"]]
+
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(document + "\n")
+    else:
+        print(document)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            baseline_file.write(document + "\n")
+
+    if failed:
+        print("Benchmark failures: " + ", ".join(failed), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import chess
+from controller.game_server import GameServer
+
+
+async def _play(port, game_id, role, plies, spectators, rng, stats):
+    """
+    Play random moves in one server game over a loopback connection
+
+    Args:
+        port: Server TCP port
+        game_id: Name of the game
+        role: "white", "black" or "spectator"
+        plies: Number of plies after which the game is left
+        spectators: Number of spectators to wait for before moving
+        rng: random.Random used to pick moves
+        stats: Dictionary of counters shared by all clients
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(json.dumps({"type": "join", "game": game_id, "role": role}).encode() + b"\n")
+    color = {"white": chess.WHITE, "black": chess.BLACK}.get(role)
+    sent = None
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        if message["type"] != "state":
+            continue
+        stats["states"] += 1
+
+        moves = message["moves"]
+        if sent is not None and len(moves) > sent[0]:
+            stats["latencies"].append(time.perf_counter() - sent[1])
+            sent = None
+        if len(moves) >= plies or message["result"] != "*":
+            break
+
+        # Only the side to move parses the position
+        turn = message["fen"].split()[1] == "w"
+        everyone_joined = message["white"] and message["black"] and message["spectators"] >= spectators
+        if turn == color and sent is None and everyone_joined:
+            move = rng.choice(list(chess.Board(message["fen"]).legal_moves))
+            sent = (len(moves), time.perf_counter())
+            writer.write(json.dumps({"type": "move", "game": game_id, "move": move.uci()}).encode() + b"\n")
+            await writer.drain()
+            stats["moves"] += 1
+
+    writer.close()
+
+
+async def run_server_benchmark_async(games=100, spectators=2, plies=40, seed=0):
+    """
+    Host games on a loopback server and play them with local clients
+
+    Args:
+        games: Number of concurrent games
+        spectators: Spectators connected to every game
+        plies: Plies played per game
+        seed: Seed of the random move choice
+
+    Returns:
+        Dictionary with the moves played, states received, wall time,
+        moves per second and move round-trip latencies in milliseconds
+    """
+    server = GameServer(port=0, broadcast_interval=0.01)
+    await server.start()
+    rng = random.Random(seed)
+    stats = {"moves": 0, "states": 0, "latencies": []}
+
+    clients = []
+    for game in range(games):
+        game_id = f"bench-{game}"
+        clients.append(_play(server.port, game_id, "white", plies, spectators, rng, stats))
+        clients.append(_play(server.port, game_id, "black", plies, spectators, rng, stats))
+        for _ in range(spectators):
+            clients.append(_play(server.port, game_id, "spectator", plies, spectators, rng, stats))
+
+    start = time.perf_counter()
+    await asyncio.gather(*clients)
+    seconds = time.perf_counter() - start
+    await server.close()
+
+    latencies = sorted(stats["latencies"]) or [0.0]
+    return {
+        "games": games,
+        "clients": len(clients),
+        "moves": stats["moves"],
+        "states": stats["states"],
+        "seconds": round(seconds, 3),
+        "moves_per_second": int(stats["moves"] / seconds) if seconds > 0 else 0,
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 3)
+    }
+
+
+def run_server_benchmark(games=100, spectators=2, plies=40, seed=0):
+    """Run run_server_benchmark_async on a fresh event loop"""
+    return asyncio.run(run_server_benchmark_async(games, spectators, plies, seed))
+
+
+def main(argv=None):
+    """Command-line entry point for the server benchmark"""
+    parser = argparse.ArgumentParser(description="Play random games against a loopback game server")
+    parser.add_argument("--games", type=int, default=100, help="number of concurrent games")
+    parser.add_argument("--spectators", type=int, default=2, help="spectators per game")
+    parser.add_argument("--plies", type=int, default=40, help="plies played per game")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random move choice")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run_server_benchmark(args.games, args.spectators, args.plies, args.seed), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
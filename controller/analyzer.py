@@ -0,0 +1,230 @@
+import multiprocessing
+import queue
+import signal
+import threading
+import chess
+from model.board import Board
+from model.engine import Engine
+from model.tablebase import Tablebase
+
+
+class _JobStop:
+    """
+    Stop condition of one analysis job: the GUI has moved on to another
+
+    Comparing job ids instead of clearing an event when a job is picked
+    up leaves no gap in which a stop request could be lost.
+    """
+
+    def __init__(self, current_job, job_id):
+        """
+        Initialize the stop condition
+
+        Args:
+            current_job: multiprocessing.Value holding the wanted job id
+            job_id: Id of the job being analyzed
+        """
+        self.current_job = current_job
+        self.job_id = job_id
+
+    def is_set(self):
+        """Check if the job is no longer wanted"""
+        return self.current_job.value != self.job_id
+
+
+def _analysis_main(jobs, results, current_job, hash_size_mb, tablebase_directory):
+    """
+    Analyze positions until told to quit (runs in the analysis process)
+
+    Args:
+        jobs: multiprocessing.Queue of (job id, FEN, UCI moves) or None
+        results: multiprocessing.Queue receiving (job id, SearchResult)
+        current_job: multiprocessing.Value of the id of the job wanted;
+            the running analysis stops once it changes
+        hash_size_mb: Size of the engine's transposition table
+        tablebase_directory: Directory of endgame tables, or None
+    """
+    # A forked child inherits the SIGTERM handler SDL installs in the
+    # parent, which would make terminate() a no-op
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    tablebase = Tablebase(tablebase_directory) if tablebase_directory else None
+    # One engine for the whole session, so its hash table carries what was
+    # learnt about the previous positions over to the next ones
+    engine = Engine(hash_size_mb, tablebase=tablebase)
+
+    try:
+        while True:
+            job = jobs.get()
+            # Only the newest position matters
+            try:
+                while True:
+                    job = jobs.get_nowait()
+            except queue.Empty:
+                pass
+            if job is None:
+                break
+
+            job_id, fen, moves = job
+            board = Board()
+            board.chess_board = chess.Board(fen)
+            for move in moves:
+                board.chess_board.push_uci(move)
+
+            engine.search(
+                board, max_depth=Engine.MAX_PLY - 1, stop_event=_JobStop(current_job, job_id),
+                info_callback=lambda result: results.put((job_id, result))
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if tablebase:
+            tablebase.close()
+
+
+class Analyzer:
+    """
+    Analyzes the current position in a separate process
+
+    The analysis runs in its own process so that it never competes with
+    the render loop for the GIL. Every completed search iteration is
+    streamed back through a queue; get_result() drains it without
+    blocking. Positions are identified by a job id, so results that
+    arrive for a position that is no longer shown are dropped.
+    """
+
+    def __init__(self, on_update=None, hash_size_mb=32, tablebase_directory=None):
+        """
+        Initialize the analyzer; the process starts on first use
+
+        Args:
+            on_update: Function called from a helper thread when a result
+                arrives, e.g. to wake up the event loop
+            hash_size_mb: Size of the analysis transposition table
+            tablebase_directory: Directory of endgame tables, or None
+        """
+        self.on_update = on_update
+        self.hash_size_mb = hash_size_mb
+        self.tablebase_directory = tablebase_directory
+        self.process = None
+        self.jobs = None
+        self.results = None
+        self.current_job = None
+        self.job_id = 0
+        self.fen = None
+        self.white_to_move = True
+        self.latest = None
+        # Results moved over by the wake-up thread when on_update is set
+        self.pending = queue.Queue()
+        self.waker = None
+
+    def _start_process(self):
+        """Start the analysis process and the thread forwarding wake-ups"""
+        self.jobs = multiprocessing.Queue()
+        self.results = multiprocessing.Queue()
+        self.current_job = multiprocessing.Value('q', 0)
+        self.process = multiprocessing.Process(
+            target=_analysis_main,
+            args=(self.jobs, self.results, self.current_job, self.hash_size_mb, self.tablebase_directory),
+            daemon=True
+        )
+        self.process.start()
+
+        if self.on_update:
+            self.waker = threading.Thread(target=self._forward_results, daemon=True)
+            self.waker.start()
+
+    def _forward_results(self):
+        """Move results to the local queue and wake the event loop (helper thread)"""
+        while True:
+            try:
+                item = self.results.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            self.pending.put(item)
+            self.on_update()
+
+    def analyze(self, board):
+        """
+        Start analyzing a position unless it is already being analyzed
+
+        The running analysis is interrupted at once; nothing waits for it.
+
+        Args:
+            board: Board instance (a snapshot of the position is sent)
+        """
+        chess_board = board.chess_board
+        fen = chess_board.fen()
+        if fen == self.fen:
+            return
+        if self.process is None:
+            self._start_process()
+
+        self.job_id += 1
+        self.fen = fen
+        self.white_to_move = chess_board.turn == chess.WHITE
+        self.latest = None
+
+        # Changing the wanted job stops the running analysis
+        self.current_job.value = self.job_id
+        root = chess_board.root()
+        moves = [move.uci() for move in chess_board.move_stack]
+        self.jobs.put((self.job_id, root.fen(), moves))
+
+    def stop(self):
+        """Stop analyzing; the process stays up for the next position"""
+        self.job_id += 1
+        if self.process is not None:
+            self.current_job.value = self.job_id
+        self.fen = None
+        self.latest = None
+
+    def get_result(self):
+        """
+        Take the newest result for the current position without blocking
+
+        Returns:
+            SearchResult, or None if nothing new arrived
+        """
+        if self.process is None:
+            return None
+        source = self.pending if self.waker else self.results
+        result = None
+        while True:
+            try:
+                job_id, item = source.get_nowait()
+            except queue.Empty:
+                break
+            if job_id == self.job_id:
+                result = item
+        if result:
+            self.latest = result
+        return result
+
+    def get_white_score(self, result):
+        """
+        Get a result's score from white's point of view
+
+        Args:
+            result: SearchResult for the current position
+
+        Returns:
+            Score in centipawns, positive when white is better
+        """
+        return result.score if self.white_to_move else -result.score
+
+    def close(self):
+        """Stop the analysis process"""
+        if self.process is None:
+            return
+        self.current_job.value = -1
+        self.jobs.put(None)
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        # Ends the forwarding thread
+        self.results.put(None)
+        if self.waker:
+            self.waker.join(1.0)
+        self.process = None
\ No newline at end of file
@@ -0,0 +1,249 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import pygame
+from model.board import Board
+from model.game_record import read_games
+from view.board_view import BoardView
+from view.gif_writer import GifWriter
+from view.piece_view import PieceView
+from view.sprite_atlas import SpriteAtlas
+
+# Renderer of the current worker process, created once by _init_worker
+_worker_renderer = None
+
+
+class GameRenderer:
+    """
+    Draws the positions of games on an off-screen surface
+
+    The board and piece views draw on a plain pygame Surface, so no
+    display is needed. The background and sprites come from one
+    SpriteAtlas that lives as long as the renderer, and only the squares
+    that a move changes are redrawn, just like the GUI does.
+    """
+
+    HIGHLIGHT_COLOR = BoardView.YELLOW
+
+    def __init__(self, square_size, dimension=8, atlas=None):
+        """
+        Initialize the renderer
+
+        Args:
+            square_size: Size of a square in pixels
+            dimension: Board dimension (default: 8x8)
+            atlas: SpriteAtlas to take the sprites from (default: a
+                private one, loading baked sprites from disk if possible)
+        """
+        self.square_size = square_size
+        self.dimension = dimension
+        self.atlas = atlas or SpriteAtlas((BoardView.WHITE, BoardView.GRAY), dimension)
+        board_size = square_size * dimension
+        self.surface = pygame.Surface((board_size, board_size))
+        self.board_view = BoardView(self.surface, square_size, dimension, self.atlas)
+        self.piece_view = PieceView(square_size, self.atlas)
+
+    def render_game(self, record):
+        """
+        Draw every position of a game in turn
+
+        The surface is reused, so a frame must be saved or encoded before
+        the next one is requested. Moves after an illegal one are skipped.
+
+        Args:
+            record: GameRecord to render
+
+        Yields:
+            Tuple (ply, pygame.Rect of the area changed since the previous
+            frame) once the position after that many plies is drawn on
+            self.surface; the first frame changes the whole board
+        """
+        board = Board()
+        board.reset(record.headers.get("FEN"))
+        _, snapshot = board.get_snapshot()
+        snapshot = snapshot[:]
+        self.board_view.draw_squares()
+        self.piece_view.draw_snapshot(self.surface, snapshot)
+        yield 0, self.surface.get_rect()
+
+        highlighted = []
+        for ply, move in enumerate(record.moves, 1):
+            if not board.push(move):
+                break
+            _, new_snapshot = board.get_snapshot()
+            changed = {index for index in range(64) if snapshot[index] != new_snapshot[index]}
+            move_squares = [divmod(move.from_square ^ 56, 8), divmod(move.to_square ^ 56, 8)]
+
+            # Repaint the changed squares and those losing their highlight
+            squares = {divmod(index, 8) for index in changed}
+            squares.update(highlighted, move_squares)
+            for row, col in squares:
+                self.board_view.draw_square(row, col)
+                code = new_snapshot[row * 8 + col]
+                if code:
+                    self.piece_view.draw_code(self.surface, code, row, col)
+            for row, col in move_squares:
+                self.board_view.highlight_square(row, col, self.HIGHLIGHT_COLOR)
+
+            highlighted = move_squares
+            snapshot = new_snapshot[:]
+            rects = [self.board_view.get_square_rect(row, col) for row, col in squares]
+            yield ply, rects[0].unionall(rects[1:])
+
+    def save_frames(self, record, directory):
+        """
+        Render a game to one PNG file per ply
+
+        Args:
+            record: GameRecord to render
+            directory: Directory receiving <ply>.png files
+
+        Returns:
+            Number of files written
+        """
+        os.makedirs(directory, exist_ok=True)
+        count = 0
+        for ply, _ in self.render_game(record):
+            pygame.image.save(self.surface, os.path.join(directory, f"{ply:03d}.png"))
+            count += 1
+        return count
+
+    def save_thumbnail(self, record, path):
+        """
+        Render the final position of a game to a PNG file
+
+        Args:
+            record: GameRecord to render
+            path: Path of the PNG file
+
+        Returns:
+            Number of files written, i.e. 1
+        """
+        for _ in self.render_game(record):
+            pass
+        pygame.image.save(self.surface, path)
+        return 1
+
+    def save_gif(self, record, path, frame_ms=500, final_ms=2000):
+        """
+        Render a game to an animated GIF
+
+        Args:
+            record: GameRecord to render
+            path: Path of the GIF file
+            frame_ms: Time each position is shown in milliseconds
+            final_ms: Time the final position is shown before looping
+
+        Returns:
+            Number of frames written
+        """
+        gif = GifWriter(path, self.surface.get_size(), (BoardView.GRAY,))
+        try:
+            # Each frame is written when the next one is known, so the last
+            # one can be given the longer delay
+            frame = rect = None
+            count = 0
+            for _, next_rect in self.render_game(record):
+                if frame:
+                    gif.add_frame(frame, frame_ms, rect)
+                frame, rect = self.surface.copy(), next_rect
+                count += 1
+            gif.add_frame(frame, final_ms, rect)
+        finally:
+            gif.close()
+        return count
+
+
+def _init_worker(square_size):
+    """Create the renderer of a worker process"""
+    global _worker_renderer
+    _worker_renderer = GameRenderer(square_size)
+
+
+def _render_task(task):
+    """
+    Render one game in a worker process
+
+    Args:
+        task: Tuple (game number, GameRecord, output directory, format,
+            frame time in milliseconds)
+
+    Returns:
+        Tuple (game number, path written, number of frames)
+    """
+    number, record, output, image_format, frame_ms = task
+    if image_format == "gif":
+        path = os.path.join(output, f"{number:05d}.gif")
+        return number, path, _worker_renderer.save_gif(record, path, frame_ms)
+    if image_format == "thumbnail":
+        path = os.path.join(output, f"{number:05d}.png")
+        return number, path, _worker_renderer.save_thumbnail(record, path)
+    path = os.path.join(output, f"{number:05d}")
+    return number, path, _worker_renderer.save_frames(record, path)
+
+
+def render_games(games, output, image_format="gif", square_size=32, frame_ms=500, workers=None, first=1):
+    """
+    Render many games across a process pool
+
+    Every worker creates one GameRenderer when it starts, so the sprites
+    are loaded and the background rendered once per process rather than
+    once per game.
+
+    Args:
+        games: Iterable of GameRecord objects
+        output: Directory receiving the images
+        image_format: "gif" for one animation per game, "png" for one
+            image per ply or "thumbnail" for the final position only
+        square_size: Size of a square in pixels
+        frame_ms: Time each position of a GIF is shown in milliseconds
+        workers: Number of worker processes (default: CPU count)
+        first: Number given to the first game in the file names
+
+    Yields:
+        Tuple (game number, path written, number of frames) in completion
+        order
+    """
+    os.makedirs(output, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    tasks = ((number, record, output, image_format, frame_ms) for number, record in enumerate(games, first))
+
+    if workers == 1:
+        _init_worker(square_size)
+        yield from map(_render_task, tasks)
+        return
+
+    # Render the background and bake the sprites before forking, so the
+    # workers all load them from the cache
+    SpriteAtlas((BoardView.WHITE, BoardView.GRAY)).get(square_size)
+    with multiprocessing.Pool(workers, _init_worker, (square_size,)) as pool:
+        yield from pool.imap_unordered(_render_task, tasks, 4)
+
+
+def main(argv=None):
+    """Command-line entry point for batch rendering"""
+    parser = argparse.ArgumentParser(description="Render games to PNG frames or animated GIFs without a display")
+    parser.add_argument("games", help="PGN file or binary record file (model.game_record)")
+    parser.add_argument("--output", default="renders", help="directory receiving the images")
+    parser.add_argument("--format", choices=["gif", "png", "thumbnail"], default="gif",
+                        help="one GIF per game, one PNG per ply, or one PNG of the final position")
+    parser.add_argument("--square-size", type=int, default=32, help="size of a square in pixels")
+    parser.add_argument("--frame-ms", type=int, default=500, help="time each GIF frame is shown")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    games = frames = 0
+    for number, path, count in render_games(
+        read_games(args.games), args.output, args.format, args.square_size, args.frame_ms, args.workers
+    ):
+        games += 1
+        frames += count
+    elapsed = time.perf_counter() - start_time
+    print(f"Rendered {games} games ({frames} frames) to {args.output} in {elapsed:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import queue
+import threading
+from model.engine import Engine, SearchResult
+from model.parallel_search import ParallelSearch
+
+class ComputerPlayer:
+    """Runs engine searches on a background thread"""
+
+    def __init__(self, time_limit=2.0, max_depth=None, on_result=None, book=None,
+                 tablebase=None, workers=1):
+        """
+        Initialize the computer player
+
+        Args:
+            time_limit: Thinking time per move in seconds
+            max_depth: Maximum search depth in plies, or None for no limit
+            on_result: Function called from the search thread when a move
+                is ready, e.g. to wake up the event loop
+            book: OpeningBook to play from before searching, or None
+            tablebase: Tablebase the engine plays endgames from, or None
+            workers: Number of search processes; more than one runs a
+                ParallelSearch sharing its hash table between processes
+        """
+        if workers > 1:
+            self.engine = ParallelSearch(
+                workers, tablebase_directory=tablebase.directory if tablebase else None
+            )
+        else:
+            self.engine = Engine(tablebase=tablebase)
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.on_result = on_result
+        self.book = book
+        self.results = queue.Queue()
+        self.error = None
+        self.thread = None
+        self.stop_event = None
+
+    def is_thinking(self):
+        """Check if a search is running"""
+        return self.thread is not None and self.thread.is_alive()
+
+    def start_search(self, board):
+        """
+        Start searching a position in the background
+
+        Args:
+            board: Board instance to search; a private copy is taken so the
+                caller may keep changing it
+        """
+        self.cancel()
+
+        # Book moves are played at once without starting a search
+        book_move = self.book.choose_move(board) if self.book else None
+        if book_move:
+            self.results.put(SearchResult(book_move, 0, 0, [book_move], 0, 0.0))
+            if self.on_result:
+                self.on_result()
+            return
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self._search,
+            args=(board.copy(), self.stop_event),
+            daemon=True
+        )
+        self.thread.start()
+
+    def _search(self, board, stop_event):
+        """
+        Search a position and queue the result (runs on the search thread)
+
+        Args:
+            board: Private Board copy to search
+            stop_event: threading.Event that cancels this search
+        """
+        try:
+            result = self.engine.search(board, self.time_limit, self.max_depth, stop_event)
+        except RuntimeError as error:
+            # A search process failed or died; say so instead of leaving
+            # the game waiting for a move that never comes
+            self.error = str(error).splitlines()[0]
+            if self.on_result:
+                self.on_result()
+            return
+        if not stop_event.is_set():
+            self.results.put(result)
+            if self.on_result:
+                self.on_result()
+
+    def get_result(self):
+        """
+        Get the result of a finished search without blocking
+
+        Returns:
+            SearchResult, or None if no search has finished
+        """
+        try:
+            return self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def get_error(self):
+        """
+        Take the reason the last search failed, if it did
+
+        Returns:
+            Error message, or None
+        """
+        error, self.error = self.error, None
+        return error
+
+    def cancel(self):
+        """Abort the running search and discard any pending result"""
+        if self.stop_event:
+            self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        while self.get_result():
+            pass
+
+    def close(self):
+        """Abort any search and stop the search processes, if any"""
+        self.cancel()
+        if isinstance(self.engine, ParallelSearch):
+            self.engine.close()
\ No newline at end of file
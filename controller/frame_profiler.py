@@ -0,0 +1,216 @@
+import csv
+import json
+import time
+from array import array
+
+# Main loop phases, in the order they run
+PHASES = ("input", "update", "legal_moves", "squares", "pieces", "panel", "analysis", "sprites", "overlay", "flip", "frame")
+
+# Upper bounds in milliseconds of the histogram buckets (the last is open)
+HISTOGRAM_BOUNDS_MS = (0.25, 0.5, 1, 2, 4, 8, 16, 33, 66)
+
+
+class TimingBuffer:
+    """
+    Ring buffer of the most recent durations of one phase
+
+    Samples are stored in a preallocated array of doubles, so recording
+    allocates nothing and old samples are overwritten in place.
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        Initialize the buffer
+
+        Args:
+            capacity: Number of samples kept
+        """
+        self.capacity = capacity
+        self.samples = array('d', bytes(8 * capacity))
+        self.position = 0
+        self.count = 0
+        self.total_count = 0
+
+    def add(self, seconds):
+        """
+        Record a duration
+
+        Args:
+            seconds: Duration in seconds
+        """
+        self.samples[self.position] = seconds
+        self.position += 1
+        if self.position == self.capacity:
+            self.position = 0
+        if self.count < self.capacity:
+            self.count += 1
+        self.total_count += 1
+
+    def get_samples(self):
+        """Get the kept samples in seconds, oldest first"""
+        if self.count < self.capacity:
+            return self.samples[:self.count].tolist()
+        return (self.samples[self.position:] + self.samples[:self.position]).tolist()
+
+    def summarize(self):
+        """
+        Summarize the kept samples
+
+        Returns:
+            Dictionary of count, mean, 50th, 95th and 99th percentile and
+            maximum in ms, plus the number of samples per histogram bucket
+        """
+        if not self.count:
+            return {"count": 0}
+        ordered = sorted(self.samples[:self.count])
+        last = len(ordered) - 1
+
+        def percentile(fraction):
+            return round(ordered[min(last, int(len(ordered) * fraction))] * 1000, 4)
+
+        histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        bucket = 0
+        for seconds in ordered:
+            while bucket < len(HISTOGRAM_BOUNDS_MS) and seconds * 1000 > HISTOGRAM_BOUNDS_MS[bucket]:
+                bucket += 1
+            histogram[bucket] += 1
+
+        return {
+            "count": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 4),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(ordered[-1] * 1000, 4),
+            "histogram": histogram
+        }
+
+
+class FrameProfiler:
+    """
+    Times the phases of the main loop
+
+    Callers take a timestamp with now() and pass it to record() when the
+    phase ends; record() returns the end time so that consecutive phases
+    can be chained without reading the clock twice:
+
+        start = profiler.now()
+        draw_squares()
+        start = profiler.record("squares", start)
+        draw_pieces()
+        profiler.record("pieces", start)
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        Initialize the profiler
+
+        Args:
+            capacity: Number of samples kept per phase
+        """
+        self.buffers = {phase: TimingBuffer(capacity) for phase in PHASES}
+        self.now = time.perf_counter
+
+    def record(self, phase, start):
+        """
+        Record the end of a phase
+
+        Args:
+            phase: Phase name, one of PHASES
+            start: Value of now() when the phase started
+
+        Returns:
+            Current time, the start of the next phase
+        """
+        end = self.now()
+        self.buffers[phase].add(end - start)
+        return end
+
+    def summarize(self):
+        """
+        Summarize every phase
+
+        Returns:
+            Dictionary mapping phase names to TimingBuffer summaries
+        """
+        return {phase: buffer.summarize() for phase, buffer in self.buffers.items()}
+
+    def write_trace(self, prefix):
+        """
+        Write the summaries as JSON and the raw samples as CSV
+
+        Args:
+            prefix: Path prefix; .json and .csv are appended
+
+        Returns:
+            Tuple (json_path, csv_path)
+        """
+        json_path = prefix + ".json"
+        csv_path = prefix + ".csv"
+
+        document = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "histogram_bounds_ms": list(HISTOGRAM_BOUNDS_MS),
+            "phases": self.summarize()
+        }
+        with open(json_path, "w") as json_file:
+            json_file.write(json.dumps(document, indent=2) + "\n")
+
+        with open(csv_path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["phase", "sample", "ms"])
+            for phase, buffer in self.buffers.items():
+                for number, seconds in enumerate(buffer.get_samples()):
+                    writer.writerow([phase, number, round(seconds * 1000, 4)])
+
+        return json_path, csv_path
+
+class StartupTimer:
+    """
+    Records how long each startup step takes
+
+        timer = StartupTimer()
+        import_modules()
+        timer.mark("imports")
+        open_window()
+        timer.mark("window")
+        print(timer.report())
+    """
+
+    def __init__(self, start=None):
+        """
+        Initialize the timer
+
+        Args:
+            start: time.perf_counter() value startup began at (default: now)
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.steps = []
+
+    def mark(self, step, note=None):
+        """
+        Record the end of a step
+
+        Args:
+            step: Step name
+            note: Optional detail shown next to the step, e.g. "cache hit"
+        """
+        now = time.perf_counter()
+        self.steps.append((step, now - self.last, note))
+        self.last = now
+
+    def report(self):
+        """
+        Format the steps as a table
+
+        Returns:
+            Multi-line string with the milliseconds of every step and the total
+        """
+        width = max([len(step) for step, _, _ in self.steps] + [len("total")])
+        lines = ["Startup times (ms):"]
+        for step, seconds, note in self.steps:
+            line = f"  {step:<{width}} {seconds * 1000:8.1f}"
+            lines.append(line + (f"  ({note})" if note else ""))
+        lines.append(f"  {'total':<{width}} {(self.last - self.start) * 1000:8.1f}")
+        return "\n".join(lines)
\ No newline at end of file
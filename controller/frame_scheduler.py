@@ -0,0 +1,48 @@
+import pygame
+
+
+class FrameScheduler:
+    """
+    Paces the game loop by what is on screen
+
+    While a piece is dragged or slides to its square, frames are drawn at a
+    fixed high rate so the motion looks smooth. Otherwise nothing changes
+    without input or a background result, so the loop sleeps on the event
+    queue and draws only when woken.
+    """
+
+    def __init__(self, active_fps=60, idle_timeout_ms=250):
+        """
+        Initialize the scheduler
+
+        Args:
+            active_fps: Frame rate while something moves
+            idle_timeout_ms: Longest sleep on the event queue while idle
+        """
+        self.active_fps = active_fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.clock = pygame.time.Clock()
+        self.active = False
+
+    def begin_frame(self, active):
+        """
+        Start a frame
+
+        Args:
+            active: True if a drag or an animation is in progress
+
+        Returns:
+            Milliseconds the event handler may sleep waiting for input, or
+            None to return immediately
+        """
+        if active and not self.active:
+            # Restart the clock so the first active frame does not wait
+            # for the time spent sleeping
+            self.clock.tick()
+        self.active = active
+        return None if active else self.idle_timeout_ms
+
+    def end_frame(self):
+        """Finish a frame, waiting out the rest of it while active"""
+        if self.active:
+            self.clock.tick(self.active_fps)
\ No newline at end of file
@@ -1,11 +1,32 @@
+import os
+import time
+from collections import namedtuple
 import chess
+import pygame
+from controller.frame_profiler import PHASES, FrameProfiler
 from model.board import Board
+from model.engine import Engine
 from model.game_state import GameState
+from model.tablebase import describe_result
+from view.gui import ProfilerOverlay
+
+# A piece sliding from one (row, col) square to another, with the piece code
+# its destination showed before the move and the perf_counter() start time
+MoveAnimation = namedtuple('MoveAnimation', 'code from_square to_square under_code start_time')
 
 class GameController:
     """Main controller for the chess game"""
     
-    def __init__(self, board_view, piece_view, gui):
+    # Moves of the best line shown in the window title
+    ANALYSIS_LINE_MOVES = 6
+    
+    # Time a piece takes to slide to its square
+    ANIMATION_SECONDS = 0.15
+    
+    def __init__(self, board_view, piece_view, gui, dirty_rendering=True,
+                 computer_player=None, computer_color=chess.BLACK, opening_book=None,
+                 tablebase=None, network_client=None, profiler=None, analyzer=None,
+                 position_index=None):
         """
         Initialize the game controller
         
@@ -13,85 +34,1082 @@ class GameController:
             board_view: BoardView instance
             piece_view: PieceView instance
             gui: ChessGUI instance
+            dirty_rendering: Redraw only changed squares instead of the
+                whole board on every update (default: True)
+            computer_player: ComputerPlayer instance, or None for two players
+            computer_color: Side played by the computer (default: black)
+            opening_book: OpeningBook whose moves are highlighted, or None
+            tablebase: Tablebase ending games early with their forced result,
+                shown in the window title, or None
+            network_client: NetworkClient of a game hosted by
+                controller.game_server, or None for a local game
+            profiler: FrameProfiler timing the drawing phases (default: a
+                private one)
+            analyzer: Analyzer whose evaluation of the current position is
+                shown while analysis mode is on, or None
+            position_index: PositionIndex whose games reaching the current
+                position are summarized in the explorer panel, or None
         """
         self.board = Board()
         self.game_state = GameState()
         self.board_view = board_view
         self.piece_view = piece_view
         self.gui = gui
+        self.computer_player = computer_player
+        self.computer_color = computer_color
+        self.opening_book = opening_book
+        self.tablebase = tablebase
+        self.network_client = network_client
+        self.profiler = profiler or FrameProfiler()
+        self.profiler_overlay = None
+        self.show_profiler = False
+        self.analyzer = analyzer
+        self.analysis_on = False
+        self.analysis_result = None
+        self.analyzed_version = None
+        self.position_index = position_index
+        self.explored_version = None
+        self.book_moves_key = None
+        self.book_moves = []
+        self.caption = "Chess"
+        self.network_status = None
+        self.computer_status = None
+        # One-off message, e.g. where the frame timings went, shown until
+        # the position changes
+        self.notice = None
+        if network_client:
+            self.caption = f"Chess - {network_client.game_id} ({network_client.role})"
+        
+        # Game database being replayed, if any
+        self.pgn_database = None
+        self.game_number = 0
+        self.replay_moves = None
+        self.paused_game_log = None
+        
+        # Dirty-rectangle rendering state
+        self.dirty_rendering = dirty_rendering
+        self.dirty_squares = set()
+        self.needs_full_redraw = True
+        self.drawn_highlights = {}
+        self.drawn_version = None
+        self.drawn_snapshot = None
+        self.move_list_dirty = True
+        self.eval_dirty = False
+        self.explorer_dirty = False
+        self.drawn_arrow = None
+        self.arrow_dirty = False
+        
+        # Pieces drawn off the square grid: one dragged with the mouse and
+        # one sliding to its square after a move
+        self.animate_moves = True
+        self.animation = None
+        self.drag_position = None
+        self.drag_deselects = False
+        self.dropped_move = None
+        self.drawn_overrides = {}
+        self.drawn_sprites = []
+        self.sprites_dirty = False
+        
+        if position_index:
+            self.gui.set_explorer_visible(True)
+        
+        self._start_computer_turn()
     
     def reset_game(self):
         """Reset the game to initial state"""
+        if self.network_client:
+            # The server owns the game
+            return
+        if self.computer_player:
+            self.computer_player.cancel()
+        self.replay_moves = None
+        self.caption = "Chess"
+        self.computer_status = None
+        self.notice = None
         self.board.reset()
+        self._resume_game_log()
+        self.game_state.reset()
+        self._update_caption()
+        self.request_full_redraw()
+        self._start_computer_turn()
+    
+    def restore_game(self, record):
+        """
+        Continue a game, e.g. one recovered from an autosave log
+        
+        Args:
+            record: GameRecord of the game
+        """
+        if self.network_client:
+            return
+        if self.computer_player:
+            self.computer_player.cancel()
+        self.replay_moves = None
+        self.board.reset(record.headers.get("FEN"))
+        for move in record.moves:
+            if not self.board.push(move):
+                break
+        self._resume_game_log()
+        self.game_state.reset()
+        self.request_full_redraw()
+        self._handle_move_made()
+    
+    def load_database(self, pgn_database, game_number=0):
+        """
+        Replay games from a PGN database
+        
+        Args:
+            pgn_database: PgnDatabase instance
+            game_number: Number of the game to show first
+        """
+        self.pgn_database = pgn_database
+        self.load_game(game_number)
+    
+    def load_game(self, game_number):
+        """
+        Show the starting position of a database game
+        
+        Args:
+            game_number: Number of the game, starting at 0
+        """
+        if not self.pgn_database or not 0 <= game_number < len(self.pgn_database):
+            return
+        # Only the selected game is parsed
+        game = self.pgn_database.load_game(game_number)
+        try:
+            fen = game.board().fen() if game else None
+        except ValueError:
+            # Bad FEN header
+            fen = None
+        if fen is None:
+            # Step past the game, so the next and previous keys keep working
+            self.game_number = game_number
+            self.notice = f"Game {game_number + 1} could not be read"
+            self._update_caption()
+            return
+        if self.computer_player:
+            self.computer_player.cancel()
+        
+        if self.replay_moves is None and self.board.game_log:
+            # Browsing a game is not playing one: keep it out of the
+            # autosave log and the archive until a game is played again
+            self.paused_game_log = self.board.game_log
+            self.board.set_game_log(None)
+        
+        self.game_number = game_number
+        self.replay_moves = list(game.mainline_moves())
+        self.board.reset(fen)
+        
+        headers = self.pgn_database.get_headers(game_number)
+        self.caption = (
+            f"Chess - {headers['White']} vs {headers['Black']} {headers['Result']} "
+            f"(game {game_number + 1}/{len(self.pgn_database)})"
+        )
+        self._handle_navigation()
+    
+    def _resume_game_log(self):
+        """Log the game on the board again once a replay has ended"""
+        if self.paused_game_log:
+            self.board.set_game_log(self.paused_game_log)
+            self.paused_game_log = None
+    
+    def next_game(self):
+        """Show the next game of the database"""
+        self.load_game(self.game_number + 1)
+    
+    def previous_game(self):
+        """Show the previous game of the database"""
+        self.load_game(self.game_number - 1)
+    
+    def step_forward(self, animate=True):
+        """
+        Play the next move of the game being replayed
+        
+        Args:
+            animate: Slide the piece to its new square
+            
+        Returns:
+            True if a move was played
+        """
+        if self.replay_moves is None:
+            return False
+        
+        ply = self.board.get_ply()
+        if ply < len(self.replay_moves) and self.board.push(self.replay_moves[ply]):
+            self._handle_navigation()
+            if animate:
+                self._animate_last_move()
+            return True
+        return False
+    
+    def step_back(self):
+        """
+        Take back the last move of the game being replayed
+        
+        Returns:
+            True if a move was taken back
+        """
+        if self.replay_moves is not None and self.board.undo_move():
+            self._handle_navigation()
+            return True
+        return False
+    
+    def go_to_start(self):
+        """Jump to the starting position of the game being replayed"""
+        while self.step_back():
+            pass
+    
+    def go_to_end(self):
+        """Jump to the final position of the game being replayed"""
+        while self.step_forward(False):
+            pass
+    
+    def _handle_navigation(self):
+        """Refresh the game state after moving through a replayed game"""
+        if self.game_state.get_result_message():
+            # Remove the game over overlay
+            self.request_full_redraw()
         self.game_state.reset()
+        self.notice = None
+        self._update_caption()
+        if self.board.is_game_over():
+            self._handle_game_over()
+    
+    def _update_caption(self):
+        """Show the window title, with the tablebase result if one is known"""
+        caption = self.caption
+        result = self._describe_tablebase_result()
+        if result:
+            caption += f" - Tablebase: {result}"
+        if self.analysis_on:
+            caption += " - Analysis: " + self._describe_analysis()
+        if self.computer_status:
+            caption += f" - {self.computer_status}"
+        if self.network_status:
+            caption += f" - {self.network_status}"
+        if self.notice:
+            caption += f" - {self.notice}"
+        self.gui.set_caption(caption)
+    
+    def _describe_tablebase_result(self):
+        """
+        Describe the forced result of the position, if the tables cover it
+        
+        Returns:
+            Text such as "White mates in 7" or "Draw", or None
+        """
+        if not self.tablebase or self.board.is_game_over():
+            return None
+        probe = self.tablebase.probe(self.board.chess_board)
+        if not probe:
+            return None
+        return describe_result(self.board.chess_board, probe)
+    
+    def _describe_analysis(self):
+        """Describe the latest analysis result, e.g. "+0.35 (depth 9) e4 e5 Nf3"""
+        result = self.analysis_result
+        if not result or self.analyzed_version != self.board.version:
+            # The position changed since; the analyzer is about to restart
+            return "..."
+        score = self.analyzer.get_white_score(result)
+        if result.is_mate_score():
+            moves = (Engine.MATE_SCORE - abs(score) + 1) // 2
+            text = f"#{moves}" if score > 0 else f"#-{moves}"
+        else:
+            text = f"{score / 100:+.2f}"
+        line = self.board.chess_board.variation_san(result.pv[:self.ANALYSIS_LINE_MOVES])
+        return f"{text} (depth {result.depth}) {line}"
+    
+    def request_full_redraw(self):
+        """Repaint the whole window on the next display update"""
+        self.needs_full_redraw = True
+    
+    def resize(self, width, height):
+        """
+        Lay out the views for a new window size
+        
+        Args:
+            width: Window width in pixels
+            height: Window height in pixels
+        """
+        self.gui.resize(width, height)
+        self.board_view.set_geometry(self.gui.screen, self.gui.square_size)
+        self.piece_view.set_square_size(self.gui.square_size)
+        self.request_full_redraw()
+    
+    def toggle_profiler_overlay(self):
+        """Show or hide the frame timing overlay"""
+        self.show_profiler = not self.show_profiler
+        if self.show_profiler and self.profiler_overlay is None:
+            self.profiler_overlay = ProfilerOverlay(self.gui.small_font, PHASES)
+        self.request_full_redraw()
+    
+    def toggle_analysis(self):
+        """Start or stop analyzing the position on the board"""
+        if not self.analyzer:
+            return
+        self.analysis_on = not self.analysis_on
+        self.analysis_result = None
+        self.analyzed_version = None
+        if not self.analysis_on:
+            self.analyzer.stop()
+        
+        # The evaluation bar takes room from the move list
+        self.gui.set_eval_bar_visible(self.analysis_on)
+        self._update_caption()
+        self.request_full_redraw()
+    
+    def _update_analysis(self):
+        """Restart the analysis after position changes and take its results"""
+        if self.board.version != self.analyzed_version:
+            # make_move, reset and navigation all bump the version; the
+            # analyzer interrupts the old search without waiting for it
+            self.analyzed_version = self.board.version
+            self.analysis_result = None
+            self.eval_dirty = True
+            if self.board.is_game_over():
+                self.analyzer.stop()
+            else:
+                self.analyzer.analyze(self.board)
+            self._update_caption()
+        
+        # Never blocks; only results for the current position come back
+        result = self.analyzer.get_result()
+        if result and result.best_move:
+            self.analysis_result = result
+            self.eval_dirty = True
+            self._update_caption()
+    
+    def toggle_explorer(self):
+        """Show or hide the opening explorer"""
+        if not self.position_index:
+            return
+        self.gui.set_explorer_visible(not self.gui.show_explorer)
+        self.explored_version = None
+        self.request_full_redraw()
+    
+    def _update_explorer(self):
+        """Look up the games reaching a new position in the index"""
+        if self.board.version == self.explored_version:
+            return
+        self.explored_version = self.board.version
+        
+        chess_board = self.board.chess_board
+        explored = self.position_index.explore(chess_board)
+        rows = [
+            (chess_board.san(entry.move), entry.games, entry.white_wins, entry.draws, entry.black_wins)
+            for entry in explored if entry.move
+        ]
+        self.gui.explorer.set_moves(sum(entry.games for entry in explored), rows)
+        self.explorer_dirty = True
+    
+    def _get_book_moves(self, row, col):
+        """
+        Get the book move destinations of the piece on a square
+        
+        The book is searched once per position and square rather than on
+        every frame the piece stays selected, e.g. while it is dragged.
+        
+        Args:
+            row: Board row (0-7)
+            col: Board column (0-7)
+            
+        Returns:
+            List of tuples (row, col)
+        """
+        key = (self.board.version, row, col)
+        if key != self.book_moves_key:
+            self.book_moves_key = key
+            self.book_moves = self.opening_book.get_book_destinations(self.board, row, col)
+        return self.book_moves
+    
+    def _get_analysis_arrow(self):
+        """Get the (row, col) squares of the best move to show, or None"""
+        if not self.analysis_on or not self.analysis_result:
+            return None
+        move = self.analysis_result.best_move
+        return (
+            (7 - chess.square_rank(move.from_square), chess.square_file(move.from_square)),
+            (7 - chess.square_rank(move.to_square), chess.square_file(move.to_square))
+        )
+    
+    def _get_arrow_squares(self, arrow):
+        """Get every (row, col) square under the area of an arrow"""
+        (from_row, from_col), (to_row, to_col) = arrow
+        return [
+            (row, col)
+            for row in range(min(from_row, to_row), max(from_row, to_row) + 1)
+            for col in range(min(from_col, to_col), max(from_col, to_col) + 1)
+        ]
+    
+    def _mark_arrow_dirty(self):
+        """
+        Queue the repaints needed for the best move arrow
+        
+        The arrow is translucent, so it is only drawn again on top of
+        freshly painted squares: if it moved or any square under it
+        changed, every square under it is repainted.
+        """
+        arrow = self._get_analysis_arrow()
+        self.arrow_dirty = False
+        if arrow != self.drawn_arrow:
+            if self.drawn_arrow:
+                self.dirty_squares.update(self._get_arrow_squares(self.drawn_arrow))
+            self.drawn_arrow = arrow
+            self.arrow_dirty = arrow is not None
+        if arrow:
+            squares = self._get_arrow_squares(arrow)
+            if self.arrow_dirty or not self.dirty_squares.isdisjoint(squares):
+                self.dirty_squares.update(squares)
+                self.arrow_dirty = True
+    
+    def _get_square_overrides(self):
+        """
+        Get the pieces to show instead of those on the board
+        
+        Returns:
+            Dictionary mapping snapshot indexes to piece codes: the square
+            of a dragged piece shows empty, and the square a piece slides
+            to shows what it did before the move until the piece arrives
+        """
+        overrides = {}
+        if self.animation:
+            row, col = self.animation.to_square
+            overrides[row * 8 + col] = self.animation.under_code
+        if self.game_state.drag_square:
+            row, col = self.game_state.drag_square
+            overrides[row * 8 + col] = 0
+        return overrides
+    
+    def _get_floating_pieces(self):
+        """Get the (code, (x, y)) of every piece drawn off the square grid"""
+        size = self.gui.square_size
+        sprites = []
+        if self.animation:
+            progress = min(1.0, (time.perf_counter() - self.animation.start_time) / self.ANIMATION_SECONDS)
+            # Ease in and out
+            progress = progress * progress * (3 - 2 * progress)
+            (from_row, from_col), (to_row, to_col) = self.animation.from_square, self.animation.to_square
+            sprites.append((self.animation.code, (
+                round((from_col + (to_col - from_col) * progress) * size),
+                round((from_row + (to_row - from_row) * progress) * size)
+            )))
+        
+        if self.game_state.drag_square:
+            row, col = self.game_state.drag_square
+            _, snapshot = self.board.get_snapshot()
+            code = snapshot[row * 8 + col]
+            if code:
+                # Centered on the mouse, but kept on the board
+                limit = size * (self.gui.dimension - 1)
+                x, y = self.drag_position
+                sprites.append((code, (
+                    min(max(x - size // 2, 0), limit),
+                    min(max(y - size // 2, 0), limit)
+                )))
+        return sprites
+    
+    def _mark_sprites_dirty(self):
+        """
+        Queue the repaints needed for the pieces drawn off the grid
+        
+        Like the arrow, a floating piece is blended over the squares, so
+        it is drawn again only on freshly painted squares. Moving it
+        repaints just the squares under its old and new places.
+        """
+        sprites = self._get_floating_pieces()
+        size = self.gui.square_size
+        self.sprites_dirty = False
+        if sprites != self.drawn_sprites:
+            for _, (x, y) in self.drawn_sprites:
+                self.dirty_squares.update(self._get_squares_under(pygame.Rect(x, y, size, size)))
+            self.drawn_sprites = sprites
+            self.sprites_dirty = bool(sprites)
+        if sprites:
+            squares = []
+            for _, (x, y) in sprites:
+                squares.extend(self._get_squares_under(pygame.Rect(x, y, size, size)))
+            if self.sprites_dirty or not self.dirty_squares.isdisjoint(squares):
+                self.dirty_squares.update(squares)
+                self.sprites_dirty = True
+    
+    def _draw_floating_pieces(self):
+        """
+        Draw the pieces off the square grid on top of the board
+        
+        Returns:
+            List of pygame.Rect areas drawn
+        """
+        return [
+            self.piece_view.draw_code_at(self.gui.screen, code, position)
+            for code, position in self.drawn_sprites
+        ]
+    
+    def dump_profile(self, directory="."):
+        """
+        Write the frame timings to profile-<time>.json and .csv
+        
+        The outcome is shown in the window title.
+        
+        Args:
+            directory: Directory to write the files to
+            
+        Returns:
+            Tuple (json_path, csv_path), or None if they could not be written
+        """
+        prefix = os.path.join(directory, time.strftime("profile-%Y%m%d-%H%M%S"))
+        try:
+            paths = self.profiler.write_trace(prefix)
+        except OSError as error:
+            self.notice = f"Could not write frame timings: {error}"
+            paths = None
+        else:
+            self.notice = f"Frame timings written to {paths[0]} and {paths[1]}"
+        self._update_caption()
+        return paths
+    
+    def _get_squares_under(self, rect):
+        """Get every (row, col) square overlapping a pixel area"""
+        size = self.gui.square_size
+        last = self.gui.dimension - 1
+        return [
+            (row, col)
+            for row in range(rect.top // size, min(last, (rect.bottom - 1) // size) + 1)
+            for col in range(rect.left // size, min(last, (rect.right - 1) // size) + 1)
+        ]
+    
+    def _mark_overlay_dirty(self):
+        """Queue a repaint of everything under the profiler overlay"""
+        rect = self.profiler_overlay.rect
+        self.dirty_squares.update(self._get_squares_under(rect))
+        if self.gui.move_list and rect.colliderect(self.gui.move_list.rect):
+            self.move_list_dirty = True
+    
+    def scroll_move_list(self, mouse_pos, lines):
+        """
+        Scroll the move list panel
+        
+        Args:
+            mouse_pos: Tuple (x, y) of mouse position
+            lines: Number of lines to scroll down (negative scrolls up)
+        """
+        move_list = self.gui.move_list
+        if move_list and move_list.contains(mouse_pos) and move_list.scroll(lines):
+            self.move_list_dirty = True
     
     def handle_square_click(self, mouse_pos):
         """
-        Handle click on a board square
+        Handle click on a board square, i.e. a press and a release in place
         
         Args:
             mouse_pos: Tuple (x, y) of mouse position
         """
-        if self.game_state.game_over:
+        self.handle_mouse_down(mouse_pos)
+        self.handle_mouse_up(mouse_pos)
+    
+    def handle_mouse_down(self, mouse_pos):
+        """
+        Handle a mouse button press on the board
+        
+        Pressing a piece of the side to move selects it and picks it up;
+        pressing another square while a piece is selected moves it there.
+        
+        Args:
+            mouse_pos: Tuple (x, y) of mouse position
+        """
+        if not self._can_move():
             return
         
         board_pos = self.gui.get_clicked_position(mouse_pos)
         if not board_pos:
             return
         
+        if board_pos == self.game_state.selected_square and self._is_own_piece(board_pos):
+            # Letting go of it in place deselects it, as a second click did
+            self._start_drag(board_pos, mouse_pos, True)
+            return
+        
         row, col = board_pos
         move_complete, start_pos, end_pos = self.game_state.select_square(row, col)
         
         if move_complete and start_pos and end_pos:
-            # Attempt to make a move
-            move_made = self.board.make_move(start_pos, end_pos)
+            if self._play_move(start_pos, end_pos, True) or not self._is_own_piece(board_pos):
+                return
+            # Pressing another piece of one's own switches to it
+            self.game_state.select_square(row, col)
+        
+        if self._is_own_piece(board_pos):
+            self._start_drag(board_pos, mouse_pos, False)
+    
+    def handle_mouse_motion(self, mouse_pos):
+        """
+        Handle the mouse moving, carrying a dragged piece along
+        
+        Args:
+            mouse_pos: Tuple (x, y) of mouse position
+        """
+        if self.game_state.drag_square:
+            self.drag_position = mouse_pos
+    
+    def handle_mouse_up(self, mouse_pos):
+        """
+        Handle a mouse button release, dropping a dragged piece
+        
+        Args:
+            mouse_pos: Tuple (x, y) of mouse position
+        """
+        drag_square = self.game_state.end_drag()
+        if not drag_square:
+            return
+        
+        board_pos = self.gui.get_clicked_position(mouse_pos)
+        if board_pos == drag_square:
+            if self.drag_deselects:
+                self.game_state.select_square(*board_pos)
+            return
+        
+        # Off the board the piece goes back and stays selected
+        if not board_pos or not self._can_move():
+            return
+        
+        move_complete, start_pos, end_pos = self.game_state.select_square(*board_pos)
+        if move_complete and start_pos and end_pos:
+            # The piece is already where it was dropped
+            self._play_move(start_pos, end_pos, False)
+    
+    def _can_move(self):
+        """Check if the player at this window may move now"""
+        return not (self.game_state.game_over or self._is_computer_turn() or not self._is_local_turn())
+    
+    def _is_own_piece(self, board_pos):
+        """Check if a (row, col) square holds a piece of the side to move"""
+        piece = self.board.get_piece_at(*board_pos)
+        return piece is not None and piece.color == self.board.get_current_player()
+    
+    def _start_drag(self, board_pos, mouse_pos, deselects):
+        """
+        Pick up the piece on a square
+        
+        Args:
+            board_pos: Tuple (row, col) of the piece
+            mouse_pos: Tuple (x, y) of mouse position
+            deselects: Deselect the piece if it is let go of in place
+        """
+        self.game_state.start_drag(*board_pos)
+        self.drag_position = mouse_pos
+        self.drag_deselects = deselects
+    
+    def _play_move(self, start_pos, end_pos, animate):
+        """
+        Play a move of the player at this window
+        
+        Args:
+            start_pos: Tuple (row, col) of the piece to move
+            end_pos: Tuple (row, col) of its destination
+            animate: Slide the piece to its new square
+            
+        Returns:
+            True if the move was legal
+        """
+        if self.network_client:
+            # The move is shown once the server sends it back
+            move = self.board.build_move(start_pos, end_pos)
+            if not self.board.is_legal(move) or not self.network_client.send_move(move):
+                return False
+            self.dropped_move = None if animate else move
+            return True
+        
+        # Attempt to make a move
+        if not self.board.make_move(start_pos, end_pos):
+            return False
+        if animate:
+            self._animate_last_move()
+        self._handle_move_made()
+        return True
+    
+    def _animate_last_move(self):
+        """Slide the piece of the move just played from its old square"""
+        move_stack = self.board.chess_board.move_stack
+        if not self.animate_moves or not move_stack:
+            return
+        move = move_stack[-1]
+        to_square = (7 - chess.square_rank(move.to_square), chess.square_file(move.to_square))
+        index = to_square[0] * 8 + to_square[1]
+        _, snapshot = self.board.get_snapshot()
+        
+        # Until the piece arrives its square shows what it did before,
+        # e.g. the piece being captured
+        under_code = self.drawn_snapshot[index] if self.drawn_snapshot else 0
+        self.animation = MoveAnimation(
+            snapshot[index],
+            (7 - chess.square_rank(move.from_square), chess.square_file(move.from_square)),
+            to_square,
+            under_code,
+            time.perf_counter()
+        )
+    
+    def is_animating(self):
+        """Check if a piece is being dragged or sliding to its square"""
+        return self.game_state.drag_square is not None or self.animation is not None
+    
+    def update(self):
+        """Apply results produced by background workers"""
+        if self.network_client:
+            state = self.network_client.get_state()
+            if state:
+                self._apply_remote_state(state)
             
-            if move_made:
-                # Check for game over conditions
-                if self.board.is_game_over():
-                    self._handle_game_over()
-    
-    def _handle_game_over(self):
-        """Handle game over conditions"""
-        message = ""
-        
-        if self.board.is_checkmate():
-            winner = "Black" if self.board.get_current_player() else "White"
-            message = f"Checkmate! {winner} wins!"
-        elif self.board.is_stalemate():
-            message = "Stalemate! Draw!"
+            # A lost connection or a rejected move is shown in the title
+            status = self.network_client.get_status()
+            if status != self.network_status:
+                self.network_status = status
+                self._update_caption()
+        
+        if self.computer_player:
+            result = self.computer_player.get_result()
+            if result and result.best_move and self._is_computer_turn():
+                self._play_computer_move(result)
+            error = self.computer_player.get_error()
+            if error:
+                self.computer_status = f"Computer: search failed ({error})"
+                self._update_caption()
+        
+        if self.analysis_on:
+            self._update_analysis()
+        
+        if self.gui.show_explorer:
+            # A binary search in the memory-mapped index, well within a frame
+            self._update_explorer()
+    
+    def _play_computer_move(self, result):
+        """
+        Play the move found by the computer and show its search statistics
+        
+        Args:
+            result: SearchResult of the computer's search
+        """
+        move = result.best_move
+        if not self.board.is_legal(move):
+            # E.g. a result for a position that was left meanwhile; without
+            # a new search the computer would never move again
+            self.computer_status = f"Computer: {move.uci()} is illegal here, thinking again"
+            self._update_caption()
+            self.computer_player.start_search(self.board)
+            return
+        
+        san = self.board.chess_board.san(move)
+        if not result.nodes:
+            # Played from the opening book without a search
+            self.computer_status = f"Computer: {san} (book)"
         else:
-            # Other draw conditions
-            message = "Game over! Draw!"
+            self.computer_status = (
+                f"Computer: {san} (depth {result.depth}, score {result.score / 100:+.2f}, {result.nps} nps)"
+            )
+        self.board.push(move)
+        self._animate_last_move()
+        self._handle_move_made()
+    
+    def _apply_remote_state(self, state):
+        """
+        Show a game state received from the server
         
-        self.game_state.set_game_over(True, message)
+        Args:
+            state: State message dictionary from controller.game_server
+        """
+        moves = [chess.Move.from_uci(move) for move in state["moves"]]
+        played = self.board.chess_board.move_stack
+        if played != moves[:len(played)]:
+            # The local history diverged, e.g. after reconnecting
+            self.board.reset()
+            played = []
+        new_moves = moves[len(played):]
+        for move in new_moves:
+            if not self.board.push(move):
+                break
+        if new_moves:
+            # A move dropped here is already on its square
+            if len(new_moves) == 1 and new_moves[0] != self.dropped_move:
+                self._animate_last_move()
+            self.dropped_move = None
+        
+        self.caption = f"Chess - {state['game']} ({self.network_client.role})"
+        self._update_caption()
+        if state["result"] != "*" and not self.game_state.game_over:
+            self.game_state.set_game_over(True, state["message"] or self.board.describe_outcome())
+            self.request_full_redraw()
+    
+    def _is_local_turn(self):
+        """Check if this window may move in a network game"""
+        if not self.network_client:
+            return True
+        return (
+            self.network_client.is_connected() and
+            self.board.get_current_player() == self.network_client.color
+        )
+    
+    def _is_computer_turn(self):
+        """Check if the computer is to move in a running game"""
+        return (
+            self.computer_player is not None and
+            self.replay_moves is None and
+            not self.game_state.game_over and
+            self.board.get_current_player() == self.computer_color
+        )
+    
+    def _start_computer_turn(self):
+        """Let the computer start thinking if it is its turn"""
+        if self._is_computer_turn():
+            self.computer_player.start_search(self.board)
+    
+    def _handle_move_made(self):
+        """Check the new position and hand over the turn"""
+        self.notice = None
+        self._update_caption()
+        
+        # Check for game over conditions
+        if self.board.is_game_over():
+            self._handle_game_over()
+            return
+        
+        # Declare the forced result as soon as the tables cover it; the
+        # server decides when network games end
+        result = None if self.network_client else self._describe_tablebase_result()
+        if result:
+            self._handle_game_over(f"Tablebase: {result}!")
+        else:
+            self._start_computer_turn()
+    
+    def _handle_game_over(self, message=None):
+        """
+        Handle game over conditions
+        
+        Args:
+            message: Result message (default: how the game on the board ended)
+        """
+        self.game_state.set_game_over(True, message or self.board.describe_outcome())
+        
+        # The overlay covers the whole window
+        self.request_full_redraw()
     
     def update_display(self):
-        """Update the game display"""
-        # Draw the board
-        self.board_view.draw_squares()
+        """
+        Update the game display
         
-        # Get legal moves from selected square
+        Returns:
+            True if anything was drawn, False if the display was already current
+        """
+        # Get legal moves and book moves from selected square
         legal_moves = []
+        book_moves = []
         if self.game_state.selected_square:
+            start = self.profiler.now()
             row, col = self.game_state.selected_square
             legal_moves = self.board.get_legal_moves_from(row, col)
+            if self.opening_book:
+                book_moves = self._get_book_moves(row, col)
+            self.profiler.record("legal_moves", start)
+        
+        highlights = self.board_view.get_highlight_colors(
+            self.game_state.selected_square,
+            legal_moves,
+            book_moves
+        )
+        
+        # Squares whose highlight appeared, vanished or changed color
+        for square in highlights.keys() | self.drawn_highlights.keys():
+            if highlights.get(square) != self.drawn_highlights.get(square):
+                self.dirty_squares.add(square)
+        self.drawn_highlights = highlights
+        
+        # Squares whose piece changed since the last drawn position,
+        # including those a dragged or sliding piece has left or reached
+        if self.animation and time.perf_counter() - self.animation.start_time >= self.ANIMATION_SECONDS:
+            self.animation = None
+        version, snapshot = self.board.get_snapshot()
+        overrides = self._get_square_overrides()
+        if overrides:
+            snapshot = snapshot[:]
+            for index, code in overrides.items():
+                snapshot[index] = code
+        if version != self.drawn_version or overrides != self.drawn_overrides:
+            if self.drawn_snapshot is None:
+                self.needs_full_redraw = True
+            else:
+                for index in range(64):
+                    if snapshot[index] != self.drawn_snapshot[index]:
+                        self.dirty_squares.add(divmod(index, 8))
+            self.drawn_version = version
+            self.drawn_snapshot = snapshot
+            self.drawn_overrides = overrides
+        
+        # Moves appended to or taken back from the move list
+        move_list = self.gui.move_list
+        if move_list and move_list.sync(self.board.get_san_log()):
+            self.move_list_dirty = True
+        
+        if self.show_profiler:
+            # Keep the numbers current
+            self._mark_overlay_dirty()
         
-        # Highlight selected square and legal moves
+        # Last, since they depend on all the other dirty squares. Each
+        # may add squares under the other, so repeat until neither does
+        while True:
+            count = len(self.dirty_squares)
+            self._mark_sprites_dirty()
+            self._mark_arrow_dirty()
+            if len(self.dirty_squares) == count:
+                break
+        
+        if not self.dirty_rendering or self.needs_full_redraw:
+            self._draw_full(legal_moves, book_moves, snapshot)
+        elif self.dirty_squares or self.move_list_dirty or self.eval_dirty or self.explorer_dirty:
+            if self.game_state.get_result_message():
+                # Partial redraws would paint over the overlay
+                self._draw_full(legal_moves, book_moves, snapshot)
+            else:
+                self._draw_dirty(highlights, snapshot)
+        else:
+            return False
+        
+        self.dirty_squares.clear()
+        self.needs_full_redraw = False
+        self.move_list_dirty = False
+        self.eval_dirty = False
+        self.explorer_dirty = False
+        return True
+    
+    def _draw_analysis(self, draw_arrow, draw_eval_bar):
+        """
+        Draw the best move arrow and the evaluation bar
+        
+        Args:
+            draw_arrow: Draw the arrow (its squares were just repainted)
+            draw_eval_bar: Draw the evaluation bar
+            
+        Returns:
+            List of pygame.Rect areas drawn
+        """
+        rects = []
+        if draw_arrow and self.drawn_arrow:
+            rects.append(self.board_view.draw_arrow(*self.drawn_arrow))
+        
+        bar_rect = self.gui.eval_bar_rect
+        if draw_eval_bar and bar_rect:
+            result = self.analysis_result
+            if result:
+                score = self.analyzer.get_white_score(result)
+                rects.append(self.board_view.draw_eval_bar(bar_rect, score, result.is_mate_score()))
+            else:
+                rects.append(self.board_view.draw_eval_bar(bar_rect, 0))
+        return rects
+    
+    def _is_eval_bar_covered(self):
+        """Check if a dirty square was painted over the evaluation bar"""
+        bar_rect = self.gui.eval_bar_rect
+        if not bar_rect or bar_rect.left >= self.gui.square_size * self.gui.dimension:
+            return False
+        return any(col == 0 for row, col in self.dirty_squares)
+    
+    def _draw_full(self, legal_moves, book_moves, snapshot):
+        """
+        Redraw the whole window
+        
+        Args:
+            legal_moves: List of tuples (row, col) for legal moves
+            book_moves: List of tuples (row, col) for book moves
+            snapshot: Board snapshot of 64 piece codes
+        """
+        profiler = self.profiler
+        start = profiler.now()
+        
+        # Draw the board
+        self.board_view.draw_squares()
+        
+        # Highlight selected square, legal moves and book moves
         self.board_view.highlight_selected_and_moves(
             self.game_state.selected_square, 
-            legal_moves
+            legal_moves,
+            book_moves
         )
+        start = profiler.record("squares", start)
         
         # Draw pieces
-        for row in range(8):
-            for col in range(8):
-                piece = self.board.get_piece_at(row, col)
-                if piece:
-                    self.piece_view.draw_piece(self.gui.screen, piece, row, col)
+        self.piece_view.draw_snapshot(self.gui.screen, snapshot)
+        start = profiler.record("pieces", start)
+        
+        if self.gui.move_list:
+            self.gui.move_list.draw(self.gui.screen)
+            if self.gui.show_explorer:
+                self.gui.explorer.draw(self.gui.screen)
+            start = profiler.record("panel", start)
+        
+        if self.analysis_on:
+            self._draw_analysis(True, True)
+            start = profiler.record("analysis", start)
+        
+        if self.drawn_sprites:
+            self._draw_floating_pieces()
+            start = profiler.record("sprites", start)
         
         # Draw game over message if applicable
         self.gui.draw_game_over_message(self.game_state.get_result_message())
         
+        if self.show_profiler:
+            self.profiler_overlay.draw(self.gui.screen, profiler)
+            start = profiler.record("overlay", start)
+        
         # Update display
-        self.gui.update_display()
\ No newline at end of file
+        self.gui.update_display()
+        profiler.record("flip", start)
+    
+    def _draw_dirty(self, highlights, snapshot):
+        """
+        Redraw only the squares that changed since the last update
+        
+        Args:
+            highlights: Dictionary mapping (row, col) to highlight color
+            snapshot: Board snapshot of 64 piece codes
+        """
+        profiler = self.profiler
+        start = profiler.now()
+        
+        rects = []
+        for row, col in self.dirty_squares:
+            rects.append(self.board_view.draw_square(row, col))
+            
+            color = highlights.get((row, col))
+            if color:
+                self.board_view.highlight_square(row, col, color)
+        start = profiler.record("squares", start)
+        
+        # Squares do not overlap, so pieces can go on after all squares
+        for row, col in self.dirty_squares:
+            code = snapshot[row * 8 + col]
+            if code:
+                self.piece_view.draw_code(self.gui.screen, code, row, col)
+        start = profiler.record("pieces", start)
+        
+        if self.move_list_dirty or self.explorer_dirty:
+            if self.move_list_dirty:
+                rects.append(self.gui.move_list.draw(self.gui.screen))
+            if self.explorer_dirty and self.gui.show_explorer:
+                rects.append(self.gui.explorer.draw(self.gui.screen))
+            start = profiler.record("panel", start)
+        
+        if self.analysis_on:
+            rects.extend(self._draw_analysis(
+                self.arrow_dirty, self.eval_dirty or self._is_eval_bar_covered()
+            ))
+            start = profiler.record("analysis", start)
+        
+        if self.sprites_dirty:
+            rects.extend(self._draw_floating_pieces())
+            start = profiler.record("sprites", start)
+        
+        if self.show_profiler:
+            rects.append(self.profiler_overlay.draw(self.gui.screen, profiler))
+            start = profiler.record("overlay", start)
+        
+        # Push only the changed areas to the screen
+        self.gui.update_display(rects)
+        profiler.record("flip", start)
\ No newline at end of file
@@ -0,0 +1,440 @@
+import argparse
+import asyncio
+import collections
+import json
+import sys
+import chess
+from model.board import Board
+from model.game_state import GameState
+
+ROLES = {"white": chess.WHITE, "black": chess.BLACK}
+
+
+def encode_message(message):
+    """Encode a message as one line of JSON"""
+    return json.dumps(message, separators=(',', ':')).encode() + b"\n"
+
+
+class ClientConnection:
+    """
+    One connected client and its outgoing messages
+
+    Replies are queued up to MAX_QUEUED_MESSAGES, and a client that lets
+    more pile up is disconnected. Game states are not queued: each game
+    keeps only its newest state per client, so a slow client skips
+    intermediate positions instead of growing the server's memory. The
+    writer waits for the socket to drain before sending more, which
+    pushes the backpressure down to TCP.
+    """
+
+    MAX_QUEUED_MESSAGES = 256
+
+    def __init__(self, reader, writer):
+        """
+        Initialize the connection
+
+        Args:
+            reader: asyncio StreamReader of the socket
+            writer: asyncio StreamWriter of the socket
+        """
+        self.reader = reader
+        self.writer = writer
+        self.messages = collections.deque()
+        self.states = {}
+        self.ready = asyncio.Event()
+        self.games = {}
+        self.closed = False
+
+    def send(self, message):
+        """
+        Queue a reply
+
+        Args:
+            message: Message dictionary
+        """
+        if self.closed:
+            return
+        if len(self.messages) >= self.MAX_QUEUED_MESSAGES:
+            self.close()
+            return
+        self.messages.append(encode_message(message))
+        self.ready.set()
+
+    def send_state(self, game_id, data):
+        """
+        Queue the state of a game, replacing any unsent older state
+
+        Args:
+            game_id: Game the state belongs to
+            data: Encoded state message
+        """
+        if not self.closed:
+            self.states[game_id] = data
+            self.ready.set()
+
+    async def write_loop(self):
+        """Send queued data until the connection closes"""
+        while not self.closed:
+            await self.ready.wait()
+            self.ready.clear()
+            data = list(self.messages)
+            data.extend(self.states.values())
+            self.messages.clear()
+            self.states.clear()
+            self.writer.writelines(data)
+            # Blocks while the client is not reading fast enough
+            await self.writer.drain()
+
+    def close(self):
+        """Stop sending and close the socket"""
+        if not self.closed:
+            self.closed = True
+            self.ready.set()
+            self.writer.close()
+
+
+class ServerGame:
+    """
+    A game hosted by the server
+
+    Moves from both players go through one queue and are applied in order
+    by the game's own task. State changes are not sent right away: the
+    first change schedules a broadcast after broadcast_interval, and every
+    change until then is included in that single message.
+    """
+
+    MOVE_QUEUE_SIZE = 16
+
+    def __init__(self, game_id, broadcast_interval):
+        """
+        Initialize the game
+
+        Args:
+            game_id: Name of the game
+            broadcast_interval: Seconds to collect changes before sending
+                the state to the players and spectators
+        """
+        self.game_id = game_id
+        self.broadcast_interval = broadcast_interval
+        self.board = Board()
+        self.game_state = GameState()
+        self.moves = []
+        self.players = {chess.WHITE: None, chess.BLACK: None}
+        self.spectators = set()
+        self.move_queue = asyncio.Queue(self.MOVE_QUEUE_SIZE)
+        self.broadcast_handle = None
+        self.task = asyncio.get_running_loop().create_task(self._process_moves())
+
+    def get_clients(self):
+        """Get every connected player and spectator"""
+        clients = [client for client in self.players.values() if client]
+        clients.extend(self.spectators)
+        return clients
+
+    def is_empty(self):
+        """Check if nobody is connected to the game"""
+        return not self.spectators and not any(self.players.values())
+
+    async def _process_moves(self):
+        """Apply queued moves one at a time (runs as the game's task)"""
+        while True:
+            client, move_text = await self.move_queue.get()
+            error = self._apply_move(client, move_text)
+            if error:
+                client.send({"type": "error", "game": self.game_id, "message": error})
+            else:
+                self.schedule_broadcast()
+
+    def _apply_move(self, client, move_text):
+        """
+        Play a move sent by a client
+
+        Args:
+            client: ClientConnection that sent the move
+            move_text: Move in UCI notation
+
+        Returns:
+            Error message, or None if the move was played
+        """
+        if self.game_state.game_over:
+            return "The game is over"
+        if self.players[self.board.get_current_player()] is not client:
+            return "Not your turn"
+        try:
+            move = chess.Move.from_uci(move_text)
+        except (TypeError, ValueError):
+            return f"Invalid move: {move_text}"
+        if not self.board.push(move):
+            return f"Illegal move: {move_text}"
+
+        self.moves.append(move.uci())
+        if self.board.is_game_over():
+            self.game_state.set_game_over(True, self.board.describe_outcome())
+        return None
+
+    def get_state(self):
+        """
+        Get the state sent to clients
+
+        Returns:
+            State message dictionary
+        """
+        outcome = self.board.get_outcome()
+        return {
+            "type": "state",
+            "game": self.game_id,
+            "moves": self.moves,
+            "fen": self.board.chess_board.fen(),
+            "result": outcome.result() if outcome else "*",
+            "message": self.game_state.get_result_message(),
+            "white": self.players[chess.WHITE] is not None,
+            "black": self.players[chess.BLACK] is not None,
+            "spectators": len(self.spectators)
+        }
+
+    def schedule_broadcast(self):
+        """Send the state to every client soon, batching further changes"""
+        if self.broadcast_handle is None:
+            self.broadcast_handle = asyncio.get_running_loop().call_later(
+                self.broadcast_interval, self.broadcast
+            )
+
+    def broadcast(self):
+        """Send the state to every client now"""
+        self.broadcast_handle = None
+        # Encoded once, whatever the number of spectators
+        data = encode_message(self.get_state())
+        for client in self.get_clients():
+            client.send_state(self.game_id, data)
+
+    def close(self):
+        """Stop the game's task and any pending broadcast"""
+        self.task.cancel()
+        if self.broadcast_handle:
+            self.broadcast_handle.cancel()
+            self.broadcast_handle = None
+
+
+class GameServer:
+    """
+    Hosts many concurrent games over TCP
+
+    Clients exchange JSON objects, one per line:
+
+        {"type": "join", "game": "<name>", "role": "white|black|any|spectator"}
+        {"type": "move", "game": "<name>", "move": "e2e4"}
+        {"type": "leave", "game": "<name>"}
+
+    The server answers joins with {"type": "joined", ...}, reports problems
+    with {"type": "error", ...} and sends {"type": "state", ...} messages
+    holding the moves, position and result whenever a game changes. Games
+    are created by their first join and dropped when the last client
+    leaves.
+    """
+
+    # Pending connections accepted at once, e.g. when a whole event joins
+    BACKLOG = 1024
+
+    def __init__(self, host="127.0.0.1", port=8765, broadcast_interval=0.05):
+        """
+        Initialize the server
+
+        Args:
+            host: Interface to listen on
+            port: TCP port to listen on (0 picks a free port)
+            broadcast_interval: Seconds to collect changes of a game before
+                sending its state
+        """
+        self.host = host
+        self.port = port
+        self.broadcast_interval = broadcast_interval
+        self.games = {}
+        self.clients = set()
+        self.client_tasks = set()
+        self.server = None
+
+    async def start(self):
+        """Start listening for connections"""
+        self.server = await asyncio.start_server(
+            self._handle_client, self.host, self.port, backlog=self.BACKLOG
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Start the server if needed and handle clients until cancelled"""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        """Disconnect every client and stop listening"""
+        for client in list(self.clients):
+            client.close()
+        # Let every handler see its closed socket and clean up
+        await asyncio.gather(*self.client_tasks, return_exceptions=True)
+        for game in self.games.values():
+            game.close()
+        self.games.clear()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def _handle_client(self, reader, writer):
+        """
+        Serve one connection until it closes
+
+        Args:
+            reader: asyncio StreamReader of the socket
+            writer: asyncio StreamWriter of the socket
+        """
+        client = ClientConnection(reader, writer)
+        self.clients.add(client)
+        task = asyncio.current_task()
+        self.client_tasks.add(task)
+        write_task = asyncio.create_task(client.write_loop())
+        try:
+            while not client.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    client.send({"type": "error", "message": "Messages must be JSON lines"})
+                    continue
+                if isinstance(message, dict):
+                    await self._handle_message(client, message)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            for game_id in list(client.games):
+                self._leave(client, game_id)
+            self.clients.discard(client)
+            self.client_tasks.discard(task)
+            client.close()
+            write_task.cancel()
+
+    async def _handle_message(self, client, message):
+        """
+        Dispatch one client message
+
+        Args:
+            client: ClientConnection that sent the message
+            message: Decoded message dictionary
+        """
+        message_type = message.get("type")
+        game_id = message.get("game")
+
+        if message_type == "join":
+            self._join(client, game_id, message.get("role", "spectator"))
+        elif message_type == "move":
+            game = self.games.get(game_id)
+            if game is None or game_id not in client.games:
+                client.send({"type": "error", "game": game_id, "message": "Not in this game"})
+                return
+            # Waits while the queue is full, which stops reading from the client
+            await game.move_queue.put((client, message.get("move")))
+        elif message_type == "leave":
+            self._leave(client, game_id)
+        else:
+            client.send({"type": "error", "message": f"Unknown message type: {message_type}"})
+
+    def _join(self, client, game_id, role):
+        """
+        Add a client to a game, creating the game if needed
+
+        Args:
+            client: ClientConnection joining
+            game_id: Name of the game
+            role: "white", "black", "any" (first free side) or "spectator"
+        """
+        if not isinstance(game_id, str) or not game_id:
+            client.send({"type": "error", "message": "A game name is required"})
+            return
+        if game_id in client.games:
+            client.send({"type": "error", "game": game_id, "message": "Already in this game"})
+            return
+
+        game = self.games.get(game_id)
+        if game is None:
+            game = ServerGame(game_id, self.broadcast_interval)
+            self.games[game_id] = game
+
+        if role == "any":
+            role = next((name for name, color in ROLES.items() if game.players[color] is None), "spectator")
+        if role in ROLES:
+            color = ROLES[role]
+            if game.players[color] is not None:
+                client.send({"type": "error", "game": game_id, "message": f"{role} is taken"})
+                if game.is_empty():
+                    self._remove_game(game_id)
+                return
+            game.players[color] = client
+        elif role == "spectator":
+            game.spectators.add(client)
+        else:
+            client.send({"type": "error", "game": game_id, "message": f"Unknown role: {role}"})
+            if game.is_empty():
+                self._remove_game(game_id)
+            return
+
+        client.games[game_id] = role
+        client.send({"type": "joined", "game": game_id, "role": role})
+        # The newcomer gets the position at once, the others with the next batch
+        client.send_state(game_id, encode_message(game.get_state()))
+        game.schedule_broadcast()
+
+    def _leave(self, client, game_id):
+        """
+        Remove a client from a game, dropping the game once it is empty
+
+        Args:
+            client: ClientConnection leaving
+            game_id: Name of the game
+        """
+        role = client.games.pop(game_id, None)
+        game = self.games.get(game_id)
+        if role is None or game is None:
+            return
+
+        if role in ROLES:
+            game.players[ROLES[role]] = None
+        else:
+            game.spectators.discard(client)
+
+        if game.is_empty():
+            self._remove_game(game_id)
+        else:
+            game.schedule_broadcast()
+
+    def _remove_game(self, game_id):
+        """Stop and forget a game"""
+        self.games.pop(game_id).close()
+
+
+def main(argv=None):
+    """Command-line entry point for the game server"""
+    parser = argparse.ArgumentParser(description="Host chess games for network clients")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--broadcast-interval", type=float, default=0.05,
+                        help="seconds to batch game changes before sending them")
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.host, args.port, args.broadcast_interval)
+
+    async def serve():
+        await server.start()
+        print(f"Serving games on {server.host}:{server.port}", file=sys.stderr)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
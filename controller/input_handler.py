@@ -12,36 +12,69 @@ class InputHandler:
         """
         self.game_controller = game_controller
     
-    def handle_events(self):
+    def handle_events(self, timeout=None):
         """
         Process all pygame events
         
+        Args:
+            timeout: Milliseconds to sleep waiting for input when no event
+                is pending, or None to return immediately
+        
         Returns:
             False if the application should quit, True otherwise
         """
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if not events and timeout is not None:
+            # Block until input arrives instead of spinning on an idle board
+            event = pygame.event.wait(timeout)
+            if event.type != pygame.NOEVENT:
+                events = [event] + pygame.event.get()
+        
+        # Time spent waiting for input is not part of the frame
+        profiler = self.game_controller.profiler
+        start = profiler.now()
+        
+        window_size = None
+        mouse_pos = None
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
             
+            # Window contents were lost and must be repainted
+            elif event.type == pygame.VIDEOEXPOSE:
+                self.game_controller.request_full_redraw()
+            
+            # Dragging a window edge sends many sizes; only the last counts
+            elif event.type == pygame.VIDEORESIZE:
+                window_size = event.size
+            
             # Mouse input
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                self._handle_mouse_click(event.pos)
+                if event.button == pygame.BUTTON_LEFT:
+                    mouse_pos = None
+                    self.game_controller.handle_mouse_down(event.pos)
+            elif event.type == pygame.MOUSEBUTTONUP:
+                if event.button == pygame.BUTTON_LEFT:
+                    mouse_pos = None
+                    self.game_controller.handle_mouse_up(event.pos)
+            elif event.type == pygame.MOUSEMOTION:
+                mouse_pos = event.pos
+            elif event.type == pygame.MOUSEWHEEL:
+                self.game_controller.scroll_move_list(pygame.mouse.get_pos(), -event.y)
             
             # Keyboard input
             elif event.type == pygame.KEYDOWN:
                 self._handle_key_press(event.key)
         
+        # Only the latest position matters to a dragged piece
+        if mouse_pos:
+            self.game_controller.handle_mouse_motion(mouse_pos)
+        if window_size:
+            self.game_controller.resize(*window_size)
+        if events:
+            profiler.record("input", start)
         return True
     
-    def _handle_mouse_click(self, pos):
-        """
-        Handle mouse click events
-        
-        Args:
-            pos: Tuple (x, y) of mouse position
-        """
-        self.game_controller.handle_square_click(pos)
-    
     def _handle_key_press(self, key):
         """
         Handle keyboard press events
@@ -51,4 +84,32 @@ class InputHandler:
         """
         if key == pygame.K_r:  # Reset game
             self.game_controller.reset_game()
+        
+        # Replay of a loaded PGN game
+        elif key == pygame.K_RIGHT:
+            self.game_controller.step_forward()
+        elif key == pygame.K_LEFT:
+            self.game_controller.step_back()
+        elif key == pygame.K_HOME:
+            self.game_controller.go_to_start()
+        elif key == pygame.K_END:
+            self.game_controller.go_to_end()
+        elif key == pygame.K_PAGEDOWN:
+            self.game_controller.next_game()
+        elif key == pygame.K_PAGEUP:
+            self.game_controller.previous_game()
+        
+        # Background analysis with evaluation bar and best move arrow
+        elif key == pygame.K_a:
+            self.game_controller.toggle_analysis()
+        
+        # Opening explorer of the indexed games
+        elif key == pygame.K_e:
+            self.game_controller.toggle_explorer()
+        
+        # Frame timing diagnostics
+        elif key == pygame.K_F3:
+            self.game_controller.toggle_profiler_overlay()
+        elif key == pygame.K_F4:
+            self.game_controller.dump_profile()
         # Add more keyboard controls as needed
\ No newline at end of file
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import threading
+import chess
+
+class NetworkClient:
+    """
+    Connection to a controller.game_server game, for a thin pygame client
+
+    The socket is served by an asyncio loop on a background thread. Only
+    the newest game state is kept, so the window always catches up in one
+    step however many updates arrived since the last frame.
+    """
+
+    def __init__(self, host, port, game_id, role="any", on_update=None):
+        """
+        Connect and join a game
+
+        Args:
+            host: Server host name
+            port: Server TCP port
+            game_id: Name of the game to join
+            role: "white", "black", "any" or "spectator"
+            on_update: Function called from the network thread when a new
+                state arrives, e.g. to wake up the event loop
+        """
+        self.host = host
+        self.port = port
+        self.game_id = game_id
+        self.role = role
+        self.on_update = on_update
+        self.lock = threading.Lock()
+        self.state = None
+        self.error = None
+        self.notice = None
+        self.writer = None
+        self.loop = asyncio.new_event_loop()
+        self.connected = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.connected.wait()
+        if self.writer is None:
+            raise ConnectionError(self.error or f"Could not connect to {host}:{port}")
+
+    @property
+    def color(self):
+        """Side played by this client, or None for spectators"""
+        if self.role == "white":
+            return chess.WHITE
+        if self.role == "black":
+            return chess.BLACK
+        return None
+
+    def _run(self):
+        """Run the network loop (runs on the network thread)"""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        finally:
+            self.loop.close()
+
+    async def _serve(self):
+        """Connect, join the game and read messages until disconnected"""
+        try:
+            reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as e:
+            self.error = str(e)
+            return
+        finally:
+            self.connected.set()
+
+        self._write({"type": "join", "game": self.game_id, "role": self.role})
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._handle_message(json.loads(line))
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.writer.close()
+            with self.lock:
+                self.error = self.error or "Disconnected from server"
+            if self.on_update:
+                self.on_update()
+
+    def _handle_message(self, message):
+        """
+        Store a server message (runs on the network thread)
+
+        Args:
+            message: Decoded message dictionary
+        """
+        message_type = message.get("type")
+        if message_type == "joined":
+            self.role = message["role"]
+        elif message_type == "state":
+            with self.lock:
+                self.state = message
+                self.notice = None
+        elif message_type == "error":
+            with self.lock:
+                self.notice = f"Server: {message.get('message')}"
+        else:
+            return
+        if self.on_update:
+            self.on_update()
+
+    def _write(self, message):
+        """Send a message (runs on the network thread)"""
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(message).encode() + b"\n")
+
+    def is_connected(self):
+        """Check if the connection to the server is still up"""
+        with self.lock:
+            return self.error is None and self.thread.is_alive()
+
+    def get_status(self):
+        """
+        Get the connection problem or server notice to show, if any
+
+        Returns:
+            Status text, or None while all is well
+        """
+        with self.lock:
+            return self.error or self.notice
+
+    def send_move(self, move):
+        """
+        Send a move to the server
+
+        Args:
+            move: python-chess Move
+
+        Returns:
+            True if the move was sent, False if the connection is gone
+        """
+        if not self.is_connected():
+            return False
+        message = {"type": "move", "game": self.game_id, "move": move.uci()}
+        try:
+            self.loop.call_soon_threadsafe(self._write, message)
+        except RuntimeError:
+            # The loop closed since the check
+            return False
+        return True
+
+    def get_state(self):
+        """
+        Take the newest game state without blocking
+
+        Returns:
+            State message dictionary, or None if nothing new arrived
+        """
+        with self.lock:
+            state, self.state = self.state, None
+        return state
+
+    def close(self):
+        """Disconnect from the server"""
+        if self.thread.is_alive():
+            try:
+                self.loop.call_soon_threadsafe(self.writer.close)
+            except RuntimeError:
+                # Already disconnected and shutting down
+                pass
+            self.thread.join(1.0)
\ No newline at end of file
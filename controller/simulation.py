@@ -0,0 +1,144 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import chess
+from model.board import Board
+from model.policies import create_policy
+
+class GameSimulator:
+    """Plays games between move policies without any display"""
+
+    def __init__(self, white, black, max_plies=500, seed=None):
+        """
+        Initialize the simulator
+
+        Args:
+            white: Policy specification for white (see create_policy)
+            black: Policy specification for black
+            max_plies: Number of plies after which a game is abandoned
+            seed: Base seed; game N uses seeds derived from seed + N
+        """
+        self.white = white
+        self.black = black
+        self.max_plies = max_plies
+        self.seed = seed
+
+    def play_game(self, game_id):
+        """
+        Play a single game
+
+        Args:
+            game_id: Number of the game, used for seeding and reporting
+
+        Returns:
+            Dictionary with the moves, outcome, plies and time of the game
+        """
+        seed = None if self.seed is None else (self.seed + game_id) * 2
+        policies = {
+            chess.WHITE: create_policy(self.white, seed),
+            chess.BLACK: create_policy(self.black, None if seed is None else seed + 1)
+        }
+
+        board = Board()
+        moves = []
+        result = "*"
+        termination = "max_plies"
+        start_time = time.perf_counter()
+
+        while len(moves) < self.max_plies:
+            if board.is_game_over():
+                outcome = board.get_outcome()
+                result = outcome.result()
+                termination = outcome.termination.name.lower()
+                break
+
+            turn = board.get_current_player()
+            move = policies[turn].choose_move(board)
+            if move is None:
+                termination = "no_move"
+                break
+            if not board.push(move):
+                # An illegal move forfeits the game
+                result = "0-1" if turn == chess.WHITE else "1-0"
+                termination = "illegal_move"
+                break
+            moves.append(move.uci())
+
+        return {
+            "game": game_id,
+            "white": self.white,
+            "black": self.black,
+            "result": result,
+            "termination": termination,
+            "plies": len(moves),
+            "moves": moves,
+            "time": round(time.perf_counter() - start_time, 6)
+        }
+
+
+def run_simulation(simulator, games, output, workers=None):
+    """
+    Play many games across a process pool and stream the results
+
+    Each finished game is written to the output as one JSON line as soon
+    as it completes, so results appear in completion order.
+
+    Args:
+        simulator: GameSimulator instance describing the games
+        games: Number of games to play
+        output: Text stream receiving JSONL results
+        workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        Dictionary counting games by result
+    """
+    workers = workers or os.cpu_count() or 1
+    summary = {"1-0": 0, "0-1": 0, "1/2-1/2": 0, "*": 0}
+
+    def record(result):
+        summary[result["result"]] += 1
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+
+    if workers == 1:
+        for game_id in range(games):
+            record(simulator.play_game(game_id))
+        return summary
+
+    chunksize = max(1, min(64, games // (workers * 8)))
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(simulator.play_game, range(games), chunksize):
+            record(result)
+    return summary
+
+
+def main(argv=None):
+    """Command-line entry point for headless self-play"""
+    parser = argparse.ArgumentParser(description="Play headless chess games and stream results as JSONL")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--white", default="random", help="white policy: random, scripted:<uci,...>, greedy, search[:depth] or book:<path.bin>")
+    parser.add_argument("--black", default="random", help="black policy (same forms as --white)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-plies", type=int, default=500, help="abandon games after this many plies")
+    parser.add_argument("--seed", type=int, default=None, help="base seed for reproducible runs")
+    parser.add_argument("--output", default="-", help="JSONL output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    simulator = GameSimulator(args.white, args.black, args.max_plies, args.seed)
+    start_time = time.perf_counter()
+
+    if args.output == "-":
+        summary = run_simulation(simulator, args.games, sys.stdout, args.workers)
+    else:
+        with open(args.output, "w") as output:
+            summary = run_simulation(simulator, args.games, output, args.workers)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"{args.games} games in {elapsed:.1f}s: {summary}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
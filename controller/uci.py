@@ -0,0 +1,507 @@
+import queue
+import sys
+import threading
+import time
+from collections import deque
+import chess
+from model.board import Board
+from model.engine import Engine
+from model.perft import PERFT_POSITIONS, divide
+
+ENGINE_NAME = "ChessApp"
+ENGINE_AUTHOR = "ChessApp contributors"
+
+# Depth of every bench search; deep enough to exercise the move ordering
+# and hash table, shallow enough to finish in seconds
+BENCH_DEPTH = 4
+
+
+def allocate_time(remaining_ms, increment_ms=0, moves_to_go=None):
+    """
+    Decide how long to think about a move under a clock
+
+    Args:
+        remaining_ms: Time left on the clock in milliseconds
+        increment_ms: Time added after every move in milliseconds
+        moves_to_go: Moves until the next time control, or None for
+            sudden death
+
+    Returns:
+        Time budget in seconds
+    """
+    # Sudden death is treated as 30 more moves; never plan to use the
+    # last 50 ms, which go to communication
+    budget = remaining_ms / (moves_to_go or 30) + increment_ms * 0.8
+    budget = min(budget, remaining_ms - 50)
+    return max(budget, 10) / 1000
+
+
+def format_score(result):
+    """
+    Format a search score as a UCI "score" value
+
+    Args:
+        result: SearchResult
+
+    Returns:
+        "cp <centipawns>" or "mate <moves>", negative when mated
+    """
+    if result.is_mate_score():
+        moves = (Engine.MATE_SCORE - abs(result.score) + 1) // 2
+        return f"mate {moves if result.score > 0 else -moves}"
+    return f"cp {result.score}"
+
+
+class UciEngine:
+    """
+    Universal Chess Interface front-end over stdin and stdout
+
+    Commands are read by a reader thread into a queue, so the command
+    loop is never blocked on input and "stop", "isready" and "quit" are
+    answered while a search runs on its own thread; other commands sent
+    during a search are held back and run in order once it has sent its
+    best move. Positions are kept in
+    a model.board.Board, so the moves a GUI sends are checked by the same
+    move logic as in the game.
+
+    Besides the standard commands, "perft <depth>" prints the leaf nodes
+    below every move and "bench [depth]" searches a fixed set of positions
+    with a fresh engine; both print node counts that only change when the
+    move generation or search changes, and their throughput.
+    """
+
+    # How often held-back commands check whether the search has ended
+    POLL_INTERVAL = 0.01
+
+    # Commands answered at once, even while searching
+    IMMEDIATE_COMMANDS = ("uci", "isready", "quit")
+
+    OPTIONS = [
+        "option name Hash type spin default 16 min 1 max 1024",
+        "option name Threads type spin default 1 min 1 max 64",
+        "option name Player type string default search",
+        "option name BookFile type string default <empty>",
+        "option name TablebasePath type string default <empty>",
+        "option name Backend type combo default python-chess var python-chess var bitboard",
+    ]
+
+    def __init__(self, output=sys.stdout):
+        """
+        Initialize the front-end
+
+        Args:
+            output: Text stream receiving the engine's replies
+        """
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.board = Board()
+        self.hash_size_mb = 16
+        self.threads = 1
+        self.player = "search"
+        self.book = None
+        self.tablebase = None
+        self.engine = None
+        self.policy = None
+        self.search_thread = None
+        self.search_infinite = False
+        self.stop_event = None
+        self.commands = queue.Queue()
+        self.deferred = deque()
+
+    def send(self, line):
+        """Write one line to the GUI"""
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def run(self, stream=None):
+        """
+        Serve commands until "quit" or the end of the input
+
+        Args:
+            stream: Text stream of commands (default: standard input)
+        """
+        if stream is None:
+            # A private stream on the same descriptor: worker processes
+            # close sys.stdin when they start, which would block on the
+            # lock the reader holds while waiting for input
+            stream = open(sys.stdin.fileno(), closefd=False)
+        reader = threading.Thread(target=self._read_commands, args=(stream,), daemon=True)
+        reader.start()
+        try:
+            while True:
+                if self.deferred and not self._is_searching():
+                    # The search is over; run what waited for it, in order
+                    line = self.deferred.popleft()
+                else:
+                    try:
+                        line = self.commands.get(timeout=self.POLL_INTERVAL if self.deferred else None)
+                    except queue.Empty:
+                        continue
+                    if self._must_wait(line):
+                        self.deferred.append(line)
+                        continue
+                if line is None or not self.execute(line):
+                    break
+        finally:
+            self.close()
+
+    def _is_searching(self):
+        """Check if a search is running"""
+        return self.search_thread is not None and self.search_thread.is_alive()
+
+    def _must_wait(self, line):
+        """
+        Check if a command has to wait until the running search is over
+
+        Args:
+            line: Command line, or None for the end of the input
+
+        Returns:
+            True if the command must be held back
+        """
+        if line is None:
+            # Finish the work sent before the input ended; only an infinite
+            # search is cut short, as nothing could stop it any more
+            return bool(self.deferred) or (self._is_searching() and not self.search_infinite)
+        tokens = line.split()
+        command = tokens[0] if tokens else ""
+        if command in self.IMMEDIATE_COMMANDS:
+            return False
+        if command == "stop":
+            # A stop sent after a held-back "go" is meant for that search
+            return bool(self.deferred)
+        return bool(self.deferred) or self._is_searching()
+
+    def _read_commands(self, stream):
+        """Queue every input line, then None at the end of the input"""
+        for line in stream:
+            self.commands.put(line)
+        self.commands.put(None)
+
+    def execute(self, line):
+        """
+        Execute one command
+
+        Args:
+            line: Command line
+
+        Returns:
+            False after "quit", True otherwise
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+
+        if command == "quit":
+            self.stop()
+            return False
+        try:
+            self._dispatch(command, arguments)
+        except (ValueError, IndexError, OSError) as error:
+            # A malformed command or a missing file must not end the engine
+            self.send(f"info string error in {command}: {error}")
+        return True
+
+    def _dispatch(self, command, arguments):
+        """
+        Run a command other than "quit"
+
+        Raises:
+            ValueError: If an argument is malformed, e.g. a move or a FEN
+            IndexError: If an argument is missing
+            OSError: If a file named by an option cannot be opened
+        """
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            for option in self.OPTIONS:
+                self.send(option)
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "stop":
+            self.stop()
+        elif self._is_searching():
+            # run() holds everything else back until the search is over, so
+            # this only happens to commands executed directly
+            self.send(f"info string ignored {command} while searching")
+        elif command == "setoption":
+            self._set_option(arguments)
+        elif command == "ucinewgame":
+            if self.engine:
+                self.engine.tt.clear()
+            self.board.reset()
+        elif command == "position":
+            self._set_position(arguments)
+        elif command == "go":
+            if arguments[:1] == ["perft"]:
+                self.perft(int(arguments[1]))
+            else:
+                self._go(arguments)
+        elif command == "perft":
+            self.perft(int(arguments[0]) if arguments else 1)
+        elif command == "bench":
+            self.bench(int(arguments[0]) if arguments else BENCH_DEPTH)
+        elif command == "d":
+            self.send(str(self.board.chess_board))
+            self.send(f"Fen: {self.board.chess_board.fen()}")
+        else:
+            self.send(f"info string unknown command {command}")
+
+    def _set_option(self, arguments):
+        """Handle "setoption name <name> [value <value>]" """
+        text = " ".join(arguments)
+        name, _, value = text.partition(" value ")
+        name = name.removeprefix("name ").strip().lower()
+        value = value.strip()
+        if value == "<empty>":
+            value = ""
+
+        if name == "hash":
+            self.hash_size_mb = int(value)
+            self._close_engine()
+        elif name == "threads":
+            self.threads = int(value)
+            self._close_engine()
+        elif name == "player":
+            from model.policies import create_policy
+            self.player = value or "search"
+            self.policy = None if self.player == "search" else create_policy(self.player)
+        elif name == "bookfile":
+            from model.opening_book import OpeningBook
+            if self.book:
+                self.book.close()
+            self.book = OpeningBook(value) if value else None
+        elif name == "backend":
+            self.board.set_backend(value)
+        elif name == "tablebasepath":
+            from model.tablebase import Tablebase
+            if self.tablebase:
+                self.tablebase.close()
+            self.tablebase = Tablebase(value) if value else None
+            self._close_engine()
+        else:
+            self.send(f"info string unknown option {name}")
+
+    def _set_position(self, arguments):
+        """Handle "position [startpos | fen <fen>] [moves <move>...]" """
+        if "moves" in arguments:
+            split = arguments.index("moves")
+            setup, moves = arguments[:split], arguments[split + 1:]
+        else:
+            setup, moves = arguments, []
+
+        if setup[:1] == ["fen"]:
+            self.board.reset(" ".join(setup[1:]))
+        else:
+            self.board.reset()
+        for uci in moves:
+            if not self.board.push(chess.Move.from_uci(uci)):
+                self.send(f"info string illegal move {uci}")
+                break
+
+    def _get_engine(self):
+        """Get the search engine, creating it for the current options"""
+        if self.engine is None:
+            if self.threads > 1:
+                from model.parallel_search import ParallelSearch
+                self.engine = ParallelSearch(
+                    self.threads, self.hash_size_mb,
+                    self.tablebase.directory if self.tablebase else None
+                )
+            else:
+                self.engine = Engine(self.hash_size_mb, tablebase=self.tablebase)
+        return self.engine
+
+    def _close_engine(self):
+        """Drop the engine so the next search creates one with new options"""
+        if self.engine and hasattr(self.engine, "close"):
+            self.engine.close()
+        self.engine = None
+
+    def _go(self, arguments):
+        """Handle "go" with its time, depth and node limits"""
+        limits = {}
+        infinite = False
+        tokens = iter(arguments)
+        for token in tokens:
+            if token == "infinite":
+                infinite = True
+            elif token in ("wtime", "btime", "winc", "binc", "movestogo", "depth", "nodes", "movetime"):
+                limits[token] = int(next(tokens, ""))
+
+        white = self.board.chess_board.turn == chess.WHITE
+        time_limit = None
+        if "movetime" in limits:
+            time_limit = limits["movetime"] / 1000
+        elif ("wtime" if white else "btime") in limits:
+            time_limit = allocate_time(
+                limits["wtime" if white else "btime"],
+                limits.get("winc" if white else "binc", 0),
+                limits.get("movestogo")
+            )
+        if infinite:
+            time_limit = None
+
+        self.stop_event = threading.Event()
+        self.search_infinite = infinite
+        self.search_thread = threading.Thread(
+            target=self._search,
+            args=(self.board.copy(), time_limit, limits.get("depth"), limits.get("nodes"), infinite),
+            daemon=True
+        )
+        self.search_thread.start()
+
+    def _search(self, board, time_limit, max_depth, node_limit, infinite):
+        """Search on the search thread and report the best move"""
+        best_move = None
+        ponder_move = None
+
+        try:
+            book_move = self.book.choose_move(board) if self.book else None
+            if book_move:
+                best_move = book_move
+            elif self.policy:
+                best_move = self.policy.choose_move(board)
+            else:
+                reported = []
+
+                def send_info(result):
+                    self._send_info(result)
+                    reported.append(result.nodes)
+
+                result = self._get_engine().search(
+                    board, time_limit, max_depth, self.stop_event,
+                    info_callback=send_info, node_limit=node_limit
+                )
+                # Report the nodes of an aborted last iteration too
+                if result.nodes not in reported[-1:]:
+                    self._send_info(result)
+                best_move = result.best_move
+                ponder_move = result.pv[1] if len(result.pv) > 1 else None
+        except Exception as error:
+            # The GUI waits for a best move whatever happens; a failed
+            # search (e.g. a dead worker process) gives the null move
+            message = str(error).partition("\n")[0] or repr(error)
+            self.send(f"info string search failed: {message}")
+            if isinstance(error, RuntimeError):
+                # Start the next search on fresh worker processes
+                self._close_engine()
+
+        # Under "go infinite" the best move may only be sent after "stop"
+        if infinite:
+            self.stop_event.wait()
+        if best_move is None:
+            self.send("bestmove 0000")
+        elif ponder_move:
+            self.send(f"bestmove {best_move.uci()} ponder {ponder_move.uci()}")
+        else:
+            self.send(f"bestmove {best_move.uci()}")
+
+    def _send_info(self, result):
+        """Stream an "info" line for a search result"""
+        if not result.depth:
+            return
+        pv = " ".join(move.uci() for move in result.pv)
+        self.send(
+            f"info depth {result.depth} score {format_score(result)} nodes {result.nodes} "
+            f"nps {result.nps} time {int(result.elapsed * 1000)} pv {pv}"
+        )
+
+    def stop(self):
+        """Stop the running search and wait for its best move"""
+        if self.search_thread:
+            self.stop_event.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+    def perft(self, depth):
+        """
+        Count the leaf nodes below every move of the current position
+
+        Args:
+            depth: Depth in plies, at least 1
+
+        Returns:
+            Total number of leaf nodes
+        """
+        start_time = time.perf_counter()
+        counts = divide(self.board, max(depth, 1))
+        elapsed = time.perf_counter() - start_time
+        for move, nodes in counts.items():
+            self.send(f"{move}: {nodes}")
+        total = sum(counts.values())
+        self.send("")
+        self.send(f"Nodes searched: {total}")
+        self.send(f"Time (ms): {int(elapsed * 1000)}")
+        self.send(f"Nodes/second: {int(total / elapsed) if elapsed > 0 else 0}")
+        return total
+
+    def bench(self, depth=BENCH_DEPTH):
+        """
+        Search the perft test positions to a fixed depth
+
+        A new single-threaded engine with an empty table searches every
+        position without a time limit, so the node count is the same on
+        every machine and run.
+
+        Args:
+            depth: Search depth in plies
+
+        Returns:
+            Total number of nodes searched
+        """
+        engine = Engine(self.hash_size_mb)
+        board = Board()
+        total_nodes = 0
+        total_time = 0.0
+        for name, fen, _ in PERFT_POSITIONS:
+            board.reset(fen)
+            result = engine.search(board, max_depth=depth)
+            total_nodes += result.nodes
+            total_time += result.elapsed
+            self.send(
+                f"info string {name}: depth {result.depth} bestmove {result.best_move.uci()} "
+                f"nodes {result.nodes} time {int(result.elapsed * 1000)}"
+            )
+        self.send("")
+        self.send(f"Total time (ms) : {int(total_time * 1000)}")
+        self.send(f"Nodes searched  : {total_nodes}")
+        self.send(f"Nodes/second    : {int(total_nodes / total_time) if total_time > 0 else 0}")
+        return total_nodes
+
+    def close(self):
+        """Stop searching and release the engine, book and tables"""
+        self.stop()
+        self._close_engine()
+        if self.book:
+            self.book.close()
+            self.book = None
+        if self.tablebase:
+            self.tablebase.close()
+            self.tablebase = None
+
+
+def main(argv=None):
+    """
+    Command-line entry point
+
+    Without arguments the UCI protocol is served on stdin and stdout;
+    otherwise the arguments are run as one command, e.g. "bench" or
+    "perft 5", and the program exits.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    uci_engine = UciEngine()
+    if argv:
+        try:
+            uci_engine.execute(" ".join(argv))
+        finally:
+            uci_engine.close()
+    else:
+        uci_engine.run()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
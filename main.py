@@ -1,42 +1,193 @@
+import argparse
 import sys
-import pygame
-from model.board import Board
-from model.game_state import GameState
-from view.piece_view import PieceView
-from view.board_view import BoardView
-from view.gui import ChessGUI
-from controller.game_controller import GameController
-from controller.input_handler import InputHandler
+import time
+
+# Taken before the heavy imports, so the startup report covers them
+STARTED_AT = time.perf_counter()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Chess")
+    parser.add_argument("--computer", choices=["white", "black"],
+                        help="let the computer play this side")
+    parser.add_argument("--think-time", type=float, default=2.0,
+                        help="computer thinking time per move in seconds")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="search processes for the computer (Lazy SMP with a shared hash table)")
+    parser.add_argument("--pgn", help="PGN file to replay (arrow keys step, page keys switch games)")
+    parser.add_argument("--game", type=int, default=1, help="number of the PGN game to show first")
+    parser.add_argument("--book", help="Polyglot opening book (.bin) for the computer and book move highlights")
+    parser.add_argument("--tablebases", help="directory of endgame tables from model.tablebase_generator")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="play a game hosted by controller.game_server")
+    parser.add_argument("--room", default="default", help="name of the server game to join")
+    parser.add_argument("--side", choices=["white", "black", "any", "spectator"], default="any",
+                        help="side to take in the server game")
+    parser.add_argument("--autosave", default="autosave.log",
+                        help="log of the current game, restored after a crash ('' to disable)")
+    parser.add_argument("--archive", help="binary record file that finished and abandoned games are appended to")
+    parser.add_argument("--explorer", help="position index from model.position_index for the opening explorer")
+    parser.add_argument("--startup-report", action="store_true", help="print how long each startup step took")
+    args = parser.parse_args()
+    
+    # pygame and python-chess are imported only once the arguments are
+    # valid, and optional features only when enabled
+    from controller.frame_profiler import FrameProfiler, StartupTimer
+    from controller.frame_scheduler import FrameScheduler
+    startup = StartupTimer(STARTED_AT)
+    import chess
+    from view.piece_view import PieceView
+    from view.board_view import BoardView
+    from view.gui import ChessGUI
+    from view.sprite_atlas import SpriteAtlas
+    from controller.analyzer import Analyzer
+    from controller.game_controller import GameController
+    from controller.input_handler import InputHandler
+    startup.mark("imports")
+    
     # Configuration
     WIDTH, HEIGHT = 512, 512
+    MOVE_LIST_WIDTH = 160
     DIMENSION = 8
     MAX_FPS = 15
+    ACTIVE_FPS = 60
+    DIRTY_RENDERING = True
+    IDLE_TIMEOUT_MS = 250
     
     # Initialize components
-    gui = ChessGUI(WIDTH, HEIGHT, DIMENSION)
-    board_view = BoardView(gui.screen, gui.square_size, DIMENSION)
-    piece_view = PieceView(gui.square_size)
+    gui = ChessGUI(WIDTH + MOVE_LIST_WIDTH, HEIGHT, DIMENSION, MOVE_LIST_WIDTH, resizable=True)
+    startup.mark("display")
+    
+    # Sprites pre-scaled for the recently used window sizes, baked to disk
+    # so that later starts skip decoding and scaling the images
+    atlas = SpriteAtlas((BoardView.WHITE, BoardView.GRAY), DIMENSION)
+    board_view = BoardView(gui.screen, gui.square_size, DIMENSION, atlas)
+    sprite_source = atlas.last_source
+    piece_view = PieceView(gui.square_size, atlas)
+    startup.mark("sprites", sprite_source)
+    
+    # Memory-map the opening book; lookups only touch the pages they need
+    opening_book = None
+    if args.book:
+        from model.opening_book import OpeningBook
+        opening_book = OpeningBook(args.book)
+    tablebase = None
+    if args.tablebases:
+        from model.tablebase import Tablebase
+        tablebase = Tablebase(args.tablebases)
+    position_index = None
+    if args.explorer:
+        from model.position_index import PositionIndex
+        position_index = PositionIndex(args.explorer)
+    
+    # Initialize computer opponent, searching off the render thread
+    computer_player = None
+    computer_color = chess.BLACK
+    if args.computer:
+        from controller.computer_player import ComputerPlayer
+        computer_player = ComputerPlayer(
+            args.think_time,
+            on_result=gui.post_wakeup_event,
+            book=opening_book,
+            tablebase=tablebase,
+            workers=args.workers
+        )
+        computer_color = chess.WHITE if args.computer == "white" else chess.BLACK
+    
+    # Join a server game; the window then only shows it and sends moves
+    network_client = None
+    if args.connect:
+        from controller.network_client import NetworkClient
+        host, _, port = args.connect.rpartition(":")
+        network_client = NetworkClient(
+            host or "127.0.0.1", int(port), args.room, args.side,
+            on_update=gui.post_wakeup_event
+        )
+    
+    # Analysis mode ('A'), searching in its own process
+    analyzer = Analyzer(on_update=gui.post_wakeup_event, tablebase_directory=args.tablebases)
+    
+    # Per-phase frame timings (F3 shows them, F4 writes them to disk)
+    profiler = FrameProfiler()
     
     # Initialize controller
-    game_controller = GameController(board_view, piece_view, gui)
+    game_controller = GameController(
+        board_view, piece_view, gui, DIRTY_RENDERING,
+        computer_player, computer_color, opening_book, tablebase,
+        network_client, profiler, analyzer, position_index
+    )
     input_handler = InputHandler(game_controller)
     
-    # Game loop
+    # Continue a game interrupted by a crash, then log every move
+    autosave_log = None
+    if args.autosave and not network_client:
+        from model.autosave_log import AutosaveLog
+        autosave_log = AutosaveLog(args.autosave, args.archive)
+        record = autosave_log.recover()
+        if record:
+            game_controller.restore_game(record)
+        game_controller.board.set_game_log(autosave_log)
+    
+    # Open the game database, indexing it on first use
+    pgn_database = None
+    if args.pgn:
+        from model.pgn_database import PgnDatabase
+        pgn_database = PgnDatabase(args.pgn)
+        game_controller.load_database(pgn_database, args.game - 1)
+    startup.mark("setup")
+    
+    # Show the board before anything that can wait
+    game_controller.update()
+    game_controller.update_display()
+    startup.mark("first frame")
+    gui.load_fonts()
+    startup.mark("fonts")
+    if args.startup_report:
+        print(startup.report())
+    
+    # Game loop: fast while a piece moves, asleep on input otherwise
+    scheduler = FrameScheduler(ACTIVE_FPS, IDLE_TIMEOUT_MS)
     running = True
     while running:
-        # Handle events
-        running = input_handler.handle_events()
+        # Handle events, sleeping on input while the board is idle
+        if DIRTY_RENDERING:
+            running = input_handler.handle_events(scheduler.begin_frame(game_controller.is_animating()))
+        else:
+            running = input_handler.handle_events()
+        
+        # Apply background results and update display
+        start = profiler.now()
+        game_controller.update()
+        profiler.record("update", start)
+        if game_controller.update_display():
+            profiler.record("frame", start)
         
-        # Update display
-        game_controller.update_display()
+        # The idle timeout wakes the loop, so moves reach the disk even
+        # while the player thinks
+        if autosave_log:
+            autosave_log.sync_if_due()
         
         # Control frame rate
-        gui.tick(MAX_FPS)
+        if DIRTY_RENDERING:
+            scheduler.end_frame()
+        else:
+            gui.tick(MAX_FPS)
     
     # Clean up
+    if pgn_database:
+        pgn_database.close()
+    if opening_book:
+        opening_book.close()
+    if tablebase:
+        tablebase.close()
+    if position_index:
+        position_index.close()
+    if network_client:
+        network_client.close()
+    if computer_player:
+        computer_player.close()
+    analyzer.close()
+    if autosave_log:
+        autosave_log.close()
     gui.quit()
     sys.exit()
 
@@ -0,0 +1,213 @@
+import os
+import struct
+import time
+import zlib
+import chess
+from model.game_record import GameRecord, decode_move, encode_move, write_records
+
+# File layout (little-endian): LOG_MAGIC, then entries of ENTRY_HEADER
+# (kind and payload length), the payload and the CRC-32 of both
+LOG_MAGIC = b'CHESSLG1'
+ENTRY_HEADER = struct.Struct('<BH')
+ENTRY_CRC = struct.Struct('<I')
+
+# Entry kinds and their payloads
+START = 1  # FEN of the start position (UTF-8)
+MOVE = 2   # 16-bit move code from model.game_record
+UNDO = 3   # nothing
+
+
+class AutosaveLog:
+    """
+    Append-only log of the game being played, for recovery after a crash
+
+    A Board with this log attached appends one small entry per move, take
+    back or reset. Every entry carries its own CRC, so a write torn by a
+    crash is detected on the next start and everything before it is
+    recovered. Entries are written straight through to the operating
+    system, which already survives a crash of the process; to also survive
+    a power failure the file is fsync-ed, but batched to at most once every
+    SYNC_INTERVAL seconds or SYNC_BATCH entries, so playing quickly does
+    not wait on the disk for every move. Entries still waiting when play
+    pauses are synced by sync_if_due(), which the owner calls regularly,
+    e.g. from its main loop.
+
+    The log only ever holds the current game. Starting a new one rewrites
+    it, after appending the previous game to an optional archive in the
+    binary record format.
+    """
+
+    SYNC_BATCH = 16
+    SYNC_INTERVAL = 2.0
+
+    def __init__(self, path, archive_path=None):
+        """
+        Open the log; call recover() before the first new entry
+
+        Args:
+            path: Path of the log file
+            archive_path: Record file that every game with at least one
+                move is appended to when a new game starts, or None
+        """
+        self.path = path
+        self.archive_path = archive_path
+        self.log_file = None
+        self.start_fen = chess.STARTING_FEN
+        self.moves = []
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+    def recover(self):
+        """
+        Read the game left in the log by the previous session
+
+        The game becomes the logged one, so it is archived when the next
+        game starts unless that game continues it.
+
+        Returns:
+            GameRecord of the logged game, or None if the log is missing,
+            holds no moves or the game was already over
+        """
+        try:
+            with open(self.path, 'rb') as log_file:
+                data = log_file.read()
+        except OSError:
+            return None
+        if not data.startswith(LOG_MAGIC):
+            return None
+
+        start_fen = chess.STARTING_FEN
+        moves = []
+        offset = len(LOG_MAGIC)
+        while offset + ENTRY_HEADER.size <= len(data):
+            kind, length = ENTRY_HEADER.unpack_from(data, offset)
+            end = offset + ENTRY_HEADER.size + length
+            if end + ENTRY_CRC.size > len(data):
+                break
+            (crc,) = ENTRY_CRC.unpack_from(data, end)
+            if zlib.crc32(data[offset:end]) != crc:
+                # Torn write; nothing after it can be trusted
+                break
+            payload = data[offset + ENTRY_HEADER.size:end]
+            if kind == START:
+                start_fen = payload.decode('utf-8')
+                moves = []
+            elif kind == MOVE:
+                moves.append(decode_move(struct.unpack('<H', payload)[0]))
+            elif kind == UNDO and moves:
+                moves.pop()
+            offset = end + ENTRY_CRC.size
+
+        self.start_fen = start_fen
+        self.moves = moves
+        if not moves:
+            return None
+        board = self._get_board()
+        if board.is_game_over():
+            return None
+        return GameRecord.from_board(board)
+
+    def start_game(self, fen=chess.STARTING_FEN, moves=()):
+        """
+        Begin logging a game, archiving the previous one
+
+        The log is rewritten in a temporary file that replaces it in one
+        step, so a crash leaves either the old or the new game.
+
+        Args:
+            fen: FEN of the start position
+            moves: python-chess Move objects already played from it
+        """
+        moves = list(moves)
+        if fen != self.start_fen or moves[:len(self.moves)] != self.moves:
+            # Not a continuation of the logged game, e.g. a recovered one
+            self._archive_game()
+        self.start_fen = fen
+        self.moves = moves
+
+        entries = [LOG_MAGIC, self._encode_entry(START, fen.encode('utf-8'))]
+        entries.extend(self._encode_entry(MOVE, struct.pack('<H', encode_move(move))) for move in self.moves)
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, 'wb') as log_file:
+            log_file.write(b''.join(entries))
+            log_file.flush()
+            os.fsync(log_file.fileno())
+        if self.log_file:
+            self.log_file.close()
+        os.replace(temporary_path, self.path)
+
+        # Unbuffered, so every entry reaches the operating system at once
+        self.log_file = open(self.path, 'ab', buffering=0)
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+    def append_move(self, move):
+        """
+        Log a move
+
+        Args:
+            move: python-chess Move object
+        """
+        self.moves.append(move)
+        self._append(MOVE, struct.pack('<H', encode_move(move)))
+
+    def append_undo(self):
+        """Log the take back of the last move"""
+        if self.moves:
+            self.moves.pop()
+        self._append(UNDO, b'')
+
+    def _encode_entry(self, kind, payload):
+        """Get the bytes of an entry including its CRC"""
+        entry = ENTRY_HEADER.pack(kind, len(payload)) + payload
+        return entry + ENTRY_CRC.pack(zlib.crc32(entry))
+
+    def _append(self, kind, payload):
+        """Write an entry and fsync if the batch is full or old enough"""
+        if self.log_file is None:
+            # First entry of the session; write out the whole game
+            self.start_game(self.start_fen, self.moves)
+            return
+        # One write call per entry, so a crash can only tear the last one
+        self.log_file.write(self._encode_entry(kind, payload))
+        self.unsynced += 1
+        now = time.monotonic()
+        if self.unsynced >= self.SYNC_BATCH or now - self.synced_at >= self.SYNC_INTERVAL:
+            self.sync()
+
+    def sync_if_due(self):
+        """
+        Sync entries that have waited SYNC_INTERVAL seconds
+
+        Cheap when nothing is waiting, so it can be called every frame.
+        """
+        if self.unsynced and time.monotonic() - self.synced_at >= self.SYNC_INTERVAL:
+            self.sync()
+
+    def sync(self):
+        """Force the logged entries to disk"""
+        if self.log_file and self.unsynced:
+            os.fsync(self.log_file.fileno())
+            self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+    def _archive_game(self):
+        """Append the logged game to the archive if it has moves"""
+        if not self.archive_path or not self.moves:
+            return
+        record = GameRecord.from_board(self._get_board(), {"Date": time.strftime("%Y.%m.%d")})
+        write_records(self.archive_path, [record], append=True)
+
+    def _get_board(self):
+        """Get a python-chess Board with the logged game played out"""
+        board = chess.Board(self.start_fen)
+        for move in self.moves:
+            board.push(move)
+        return board
+
+    def close(self):
+        """Sync and close the log; the game stays in it for recovery"""
+        if self.log_file:
+            self.sync()
+            self.log_file.close()
+            self.log_file = None
\ No newline at end of file
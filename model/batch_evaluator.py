@@ -0,0 +1,359 @@
+import numpy as np
+import chess
+from model.engine import Engine
+
+# Plane order: white pawn to king, then black pawn to king
+PLANE_PIECES = [(color, piece_type) for color in (chess.WHITE, chess.BLACK) for piece_type in chess.PIECE_TYPES]
+BLACK_PLANES = len(chess.PIECE_TYPES)
+
+# Shifts as (bit shift, squares kept afterwards); positive shifts move
+# towards h8, and the masks drop squares that wrapped around a board edge
+NOT_A = ~chess.BB_FILE_A & chess.BB_ALL
+NOT_H = ~chess.BB_FILE_H & chess.BB_ALL
+NOT_AB = ~(chess.BB_FILE_A | chess.BB_FILE_B) & chess.BB_ALL
+NOT_GH = ~(chess.BB_FILE_G | chess.BB_FILE_H) & chess.BB_ALL
+DIAGONAL_SHIFTS = [(9, NOT_A), (7, NOT_H), (-7, NOT_A), (-9, NOT_H)]
+STRAIGHT_SHIFTS = [(8, chess.BB_ALL), (-8, chess.BB_ALL), (1, NOT_A), (-1, NOT_H)]
+SLIDER_SHIFTS = {
+    chess.BISHOP: DIAGONAL_SHIFTS,
+    chess.ROOK: STRAIGHT_SHIFTS,
+    chess.QUEEN: DIAGONAL_SHIFTS + STRAIGHT_SHIFTS
+}
+KNIGHT_SHIFTS = [
+    (17, NOT_A), (15, NOT_H), (10, NOT_AB), (6, NOT_GH),
+    (-6, NOT_AB), (-10, NOT_GH), (-15, NOT_A), (-17, NOT_H)
+]
+FILE_MASKS = np.array(chess.BB_FILES, dtype=np.uint64)
+RANK_MASKS = np.array(chess.BB_RANKS, dtype=np.uint64)
+
+
+def _chess_board(board):
+    """Get the python-chess Board of a Board or python-chess Board"""
+    return getattr(board, "chess_board", board)
+
+
+def board_bitboards(boards):
+    """
+    Get the piece bitboards of positions
+
+    Args:
+        boards: Sequence of Board or python-chess Board instances
+
+    Returns:
+        uint64 array of shape (N, 12) following PLANE_PIECES
+    """
+    # Eight attribute reads per position; the twelve planes are split off
+    # with array operations
+    raw = np.array(
+        [(chess_board.pawns, chess_board.knights, chess_board.bishops, chess_board.rooks,
+          chess_board.queens, chess_board.kings,
+          chess_board.occupied_co[chess.WHITE], chess_board.occupied_co[chess.BLACK])
+         for chess_board in map(_chess_board, boards)],
+        dtype=np.uint64
+    ).reshape(len(boards), 8)
+    pieces = raw[:, :BLACK_PLANES]
+    return np.concatenate((pieces & raw[:, 6:7], pieces & raw[:, 7:8]), axis=1)
+
+
+def board_planes(boards):
+    """
+    Stack positions into piece bitplanes
+
+    Args:
+        boards: Sequence of Board or python-chess Board instances
+
+    Returns:
+        uint8 array of shape (N, 12, 64), 1 where the plane's piece stands;
+        planes follow PLANE_PIECES and squares are python-chess squares
+        (a1 = 0, h8 = 63)
+    """
+    return bitboards_to_planes(board_bitboards(boards))
+
+
+def bitboards_to_planes(bitboards):
+    """Unpack (N, 12) uint64 bitboards into (N, 12, 64) uint8 planes"""
+    little_endian = np.ascontiguousarray(bitboards, dtype='<u8')
+    # Bit n of each little-endian bitboard is square n
+    return np.unpackbits(little_endian.view(np.uint8), axis=-1, bitorder='little').reshape(
+        len(bitboards), len(PLANE_PIECES), 64
+    )
+
+
+def planes_to_bitboards(planes):
+    """Pack (N, 12, 64) planes into (N, 12) uint64 bitboards"""
+    packed = np.packbits(np.asarray(planes, dtype=bool), axis=-1, bitorder='little')
+    return np.ascontiguousarray(packed).view('<u8').reshape(len(planes), len(PLANE_PIECES)).astype(np.uint64)
+
+
+def side_to_move(boards):
+    """Get a boolean array, True where white is to move"""
+    return np.array([_chess_board(board).turn == chess.WHITE for board in boards], dtype=bool)
+
+
+def _shift(bitboards, shift, mask):
+    """Shift uint64 bitboards towards h8 (or a1 if negative) and mask them"""
+    if shift > 0:
+        return (bitboards << np.uint64(shift)) & np.uint64(mask)
+    return (bitboards >> np.uint64(-shift)) & np.uint64(mask)
+
+
+def _count(bitboards):
+    """Count the squares of uint64 bitboards"""
+    return np.bitwise_count(bitboards).astype(np.int32)
+
+
+class BatchEvaluator:
+    """
+    Scores many positions at once with vectorized NumPy operations
+
+    Positions are read into an (N, 12) array of piece bitboards, the
+    packed form of the (N, 12, 64) bitplanes of board_planes, and every
+    term is computed for the whole batch in a handful of array operations:
+
+    - material and piece-square placement, with the same values and tables
+      as Engine.evaluate (including the endgame king table), as dot
+      products of the bitplanes with weight tables
+    - mobility: squares reached by knights, bishops, rooks and queens that
+      are not blocked by their own side, by shifting the bitboards
+    - pawn structure: doubled, isolated and passed pawns
+
+    Scores are in centipawns, from the side to move's point of view like
+    Engine.evaluate.
+    """
+
+    MOBILITY_WEIGHTS = {chess.KNIGHT: 4, chess.BISHOP: 5, chess.ROOK: 2, chess.QUEEN: 1}
+    DOUBLED_PAWN_PENALTY = 10
+    ISOLATED_PAWN_PENALTY = 15
+    # Passed pawn bonus by rank from the pawn's own side
+    PASSED_PAWN_BONUS = [0, 5, 10, 20, 35, 60, 100, 0]
+
+    def __init__(self, mobility=True, pawn_structure=True):
+        """
+        Initialize the evaluator
+
+        Args:
+            mobility: Include the mobility term
+            pawn_structure: Include the pawn structure term
+        """
+        self.mobility = mobility
+        self.pawn_structure = pawn_structure
+
+        tables = {
+            chess.PAWN: Engine.PAWN_TABLE,
+            chess.KNIGHT: Engine.KNIGHT_TABLE,
+            chess.BISHOP: Engine.BISHOP_TABLE,
+            chess.ROOK: Engine.ROOK_TABLE,
+            chess.QUEEN: Engine.QUEEN_TABLE,
+            chess.KING: Engine.KING_TABLE
+        }
+        self.material_weights = np.zeros((len(PLANE_PIECES), 64), dtype=np.float32)
+        self.placement_weights = np.zeros((len(PLANE_PIECES), 64), dtype=np.float32)
+        for plane, (color, piece_type) in enumerate(PLANE_PIECES):
+            sign = 1 if color == chess.WHITE else -1
+            table = tables[piece_type]
+            self.material_weights[plane] = sign * Engine.PIECE_VALUES[piece_type]
+            # Tables are listed a8 first from white's point of view
+            for square in chess.SQUARES:
+                self.placement_weights[plane, square] = sign * table[square ^ 56 if color else square]
+
+        # Swapped in for the king planes of positions in the endgame
+        self.endgame_king_weights = np.zeros((2, 64), dtype=np.float32)
+        for square in chess.SQUARES:
+            self.endgame_king_weights[0, square] = Engine.KING_ENDGAME_TABLE[square ^ 56]
+            self.endgame_king_weights[1, square] = -Engine.KING_ENDGAME_TABLE[square]
+
+        self.white_passed_bonus = np.array(self.PASSED_PAWN_BONUS, dtype=np.int32)
+        self.black_passed_bonus = self.white_passed_bonus[::-1].copy()
+
+    def evaluate(self, boards):
+        """
+        Score positions
+
+        Args:
+            boards: Sequence of Board or python-chess Board instances
+
+        Returns:
+            int32 array of N scores from each side to move's point of view
+        """
+        if not len(boards):
+            return np.zeros(0, dtype=np.int32)
+        return self.evaluate_bitboards(board_bitboards(boards), side_to_move(boards))
+
+    def evaluate_planes(self, planes, white_to_move):
+        """
+        Score positions given as bitplanes
+
+        Args:
+            planes: Array of shape (N, 12, 64) as made by board_planes
+            white_to_move: Boolean array of N side-to-move flags
+
+        Returns:
+            int32 array of N scores from each side to move's point of view
+        """
+        return self.evaluate_bitboards(planes_to_bitboards(planes), white_to_move)
+
+    def evaluate_bitboards(self, bitboards, white_to_move):
+        """
+        Score positions given as bitboards
+
+        Args:
+            bitboards: uint64 array of shape (N, 12) as made by board_bitboards
+            white_to_move: Boolean array of N side-to-move flags
+
+        Returns:
+            int32 array of N scores from each side to move's point of view
+        """
+        score = sum(self.evaluate_terms(bitboards).values())
+        return np.where(white_to_move, score, -score).astype(np.int32)
+
+    def evaluate_terms(self, bitboards):
+        """
+        Compute every evaluation term of a batch
+
+        Args:
+            bitboards: uint64 array of shape (N, 12) as made by
+                board_bitboards (see planes_to_bitboards for planes)
+
+        Returns:
+            Dictionary mapping term names ("material", "placement",
+            "mobility", "pawn_structure") to int32 arrays of N scores from
+            white's point of view
+        """
+        planes = bitboards_to_planes(bitboards).astype(np.float32)
+        counts = _count(bitboards)
+
+        terms = {
+            "material": np.einsum('npk,pk->n', planes, self.material_weights),
+            "placement": np.einsum('npk,pk->n', planes, self.placement_weights)
+        }
+
+        # Same endgame rule as Engine.evaluate
+        white_king = chess.KING - 1
+        black_king = BLACK_PLANES + white_king
+        queens = counts[:, chess.QUEEN - 1] + counts[:, BLACK_PLANES + chess.QUEEN - 1]
+        minors_and_rooks = sum(
+            counts[:, color_offset + piece_type - 1]
+            for color_offset in (0, BLACK_PLANES)
+            for piece_type in (chess.KNIGHT, chess.BISHOP, chess.ROOK)
+        )
+        endgame = (queens == 0) | (minors_and_rooks <= 2)
+        king_planes = planes[:, [white_king, black_king]]
+        middlegame_kings = np.einsum('npk,pk->n', king_planes, self.placement_weights[[white_king, black_king]])
+        endgame_kings = np.einsum('npk,pk->n', king_planes, self.endgame_king_weights)
+        terms["placement"] += np.where(endgame, endgame_kings - middlegame_kings, 0)
+
+        if self.mobility:
+            terms["mobility"] = self._mobility(bitboards)
+        if self.pawn_structure:
+            terms["pawn_structure"] = self._pawn_structure(bitboards)
+
+        return {name: np.rint(values).astype(np.int32) for name, values in terms.items()}
+
+    def _mobility(self, bitboards):
+        """
+        Count the weighted squares each side's pieces reach
+
+        Args:
+            bitboards: uint64 array of shape (N, 12)
+
+        Returns:
+            Array of N mobility scores from white's point of view
+        """
+        white = np.bitwise_or.reduce(bitboards[:, :BLACK_PLANES], axis=1)
+        black = np.bitwise_or.reduce(bitboards[:, BLACK_PLANES:], axis=1)
+        empty = ~(white | black)
+        score = np.zeros(len(bitboards), dtype=np.int32)
+
+        for color_offset, own, sign in ((0, white, 1), (BLACK_PLANES, black, -1)):
+            not_own = ~own
+
+            # Every knight jump is a distinct shift, so summing the shifts
+            # counts each knight's targets separately
+            knights = bitboards[:, color_offset + chess.KNIGHT - 1]
+            count = sum(_count(_shift(knights, shift, mask) & not_own) for shift, mask in KNIGHT_SHIFTS)
+            score += sign * self.MOBILITY_WEIGHTS[chess.KNIGHT] * count
+
+            # Sliders walk every ray until they hit a piece; rays of the
+            # same side never cross one another, so one frontier per
+            # direction serves all pieces of a type
+            for piece_type, shifts in SLIDER_SHIFTS.items():
+                sliders = bitboards[:, color_offset + piece_type - 1]
+                if not sliders.any():
+                    continue
+                count = np.zeros(len(bitboards), dtype=np.int32)
+                for shift, mask in shifts:
+                    frontier = sliders
+                    for _ in range(7):
+                        frontier = _shift(frontier, shift, mask)
+                        count += _count(frontier & not_own)
+                        frontier &= empty
+                        if not frontier.any():
+                            break
+                score += sign * self.MOBILITY_WEIGHTS[piece_type] * count
+
+        return score
+
+    def _pawn_structure(self, bitboards):
+        """
+        Score doubled, isolated and passed pawns
+
+        Args:
+            bitboards: uint64 array of shape (N, 12)
+
+        Returns:
+            Array of N pawn structure scores from white's point of view
+        """
+        white_pawns = bitboards[:, chess.PAWN - 1]
+        black_pawns = bitboards[:, BLACK_PLANES + chess.PAWN - 1]
+
+        def file_penalties(pawns):
+            per_file = _count(pawns[:, None] & FILE_MASKS)
+            occupied = per_file > 0
+            neighbours = np.zeros_like(occupied)
+            neighbours[:, 1:] |= occupied[:, :-1]
+            neighbours[:, :-1] |= occupied[:, 1:]
+            doubled = np.maximum(per_file - 1, 0).sum(axis=1)
+            isolated = (per_file * ~neighbours).sum(axis=1)
+            return self.DOUBLED_PAWN_PENALTY * doubled + self.ISOLATED_PAWN_PENALTY * isolated
+
+        def front_span(pawns, step):
+            # Squares ahead of the pawns on their own and adjacent files
+            files = pawns | _shift(pawns, 1, NOT_A) | _shift(pawns, -1, NOT_H)
+            span = _shift(files, step, chess.BB_ALL)
+            for _ in range(6):
+                span |= _shift(span, step, chess.BB_ALL)
+            return span
+
+        # A pawn is passed when no enemy pawn can block or capture it; the
+        # enemy pawns' front spans cover exactly the squares behind them
+        white_passed = white_pawns & ~front_span(black_pawns, -8)
+        black_passed = black_pawns & ~front_span(white_pawns, 8)
+        passed = (
+            (_count(white_passed[:, None] & RANK_MASKS) * self.white_passed_bonus).sum(axis=1) -
+            (_count(black_passed[:, None] & RANK_MASKS) * self.black_passed_bonus).sum(axis=1)
+        )
+
+        return passed - file_penalties(white_pawns) + file_penalties(black_pawns)
+
+    def evaluate_moves(self, board, moves=None):
+        """
+        Score the positions reached by a list of moves in one batch
+
+        Args:
+            board: Board or python-chess Board of the current position
+            moves: python-chess Moves to score (default: every legal move)
+
+        Returns:
+            Tuple (moves, scores) with scores as an int32 array from the
+            point of view of the side making the moves
+        """
+        chess_board = _chess_board(board)
+        if moves is None:
+            moves = list(chess_board.legal_moves)
+        children = []
+        for move in moves:
+            child = chess_board.copy(stack=False)
+            child.push(move)
+            children.append(child)
+        # Children are scored for the opponent, who moves next
+        return moves, -self.evaluate(children)
\ No newline at end of file
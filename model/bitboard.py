@@ -0,0 +1,666 @@
+import os
+import struct
+import sys
+from array import array
+import chess
+
+# Moves are plain ints: the 16-bit code of model.game_record (to-square in
+# bits 0-5, from-square in bits 6-11, promotion piece type in bits 12-14)
+# plus a flag in bits 16-17 telling make_move what else the move does
+SQUARE_MASK = 0x3F
+FROM_SHIFT = 6
+PROMOTION_SHIFT = 12
+FLAG_SHIFT = 16
+EN_PASSANT = 1 << FLAG_SHIFT
+CASTLING = 2 << FLAG_SHIFT
+DOUBLE_PUSH = 3 << FLAG_SHIFT
+CODE_MASK = (1 << FLAG_SHIFT) - 1
+
+# Castling rights bits
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+
+BB_ALL = (1 << 64) - 1
+NO_SQUARE = -1
+
+ROOK_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+KNIGHT_STEPS = ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+KING_STEPS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+# Slider tables are cached here after the first build (layout: magic and
+# entry count, then the attacks of every relevant occupancy in the order
+# _subsets enumerates them, rooks before bishops, as u64)
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "slider_attacks.bin")
+CACHE_MAGIC = b'ATTACKS1'
+CACHE_HEADER = struct.Struct('<8sI')
+
+
+def _step_attacks(square, steps):
+    """Get the squares reached by single steps from a square"""
+    file, rank = square & 7, square >> 3
+    attacks = 0
+    for file_step, rank_step in steps:
+        if 0 <= file + file_step < 8 and 0 <= rank + rank_step < 8:
+            attacks |= 1 << (square + rank_step * 8 + file_step)
+    return attacks
+
+
+def _ray_attacks(square, occupied, directions):
+    """Get the squares a slider attacks, stopping at the first blocker"""
+    attacks = 0
+    for file_step, rank_step in directions:
+        file, rank = (square & 7) + file_step, (square >> 3) + rank_step
+        while 0 <= file < 8 and 0 <= rank < 8:
+            bit = 1 << (rank * 8 + file)
+            attacks |= bit
+            if occupied & bit:
+                break
+            file += file_step
+            rank += rank_step
+    return attacks
+
+
+def _relevant_mask(square, directions):
+    """Get the squares whose occupancy can change a slider's attacks"""
+    mask = 0
+    for file_step, rank_step in directions:
+        file, rank = (square & 7) + file_step, (square >> 3) + rank_step
+        # The last square of a ray is attacked whether occupied or not
+        while 0 <= file + file_step < 8 and 0 <= rank + rank_step < 8:
+            mask |= 1 << (rank * 8 + file)
+            file += file_step
+            rank += rank_step
+    return mask
+
+
+def _subsets(mask):
+    """Enumerate every subset of a bitboard (carry-rippler order)"""
+    subset = 0
+    while True:
+        yield subset
+        subset = (subset - mask) & mask
+        if not subset:
+            return
+
+
+ROOK_MASKS = [_relevant_mask(square, ROOK_DIRECTIONS) for square in chess.SQUARES]
+BISHOP_MASKS = [_relevant_mask(square, BISHOP_DIRECTIONS) for square in chess.SQUARES]
+
+
+def _load_slider_tables(path=CACHE_PATH):
+    """
+    Build or load the slider attack tables
+
+    Every square gets a dictionary from the occupancy of its relevant
+    squares to the attacked squares, so a lookup is one mask and one
+    dictionary access; in Python this beats the multiply and shift of
+    magic bitboards. Building walks every ray of about 107,000
+    occupancies, so the attacks are cached to disk and later imports only
+    enumerate the occupancies again.
+
+    Args:
+        path: Path of the cache file
+
+    Returns:
+        Tuple (rook tables, bishop tables), lists of dictionaries indexed
+        by square
+    """
+    layout = [(ROOK_MASKS, ROOK_DIRECTIONS), (BISHOP_MASKS, BISHOP_DIRECTIONS)]
+    count = sum(1 << bin(mask).count("1") for masks, _ in layout for mask in masks)
+
+    values = None
+    try:
+        with open(path, 'rb') as cache_file:
+            data = cache_file.read()
+        magic, cached_count = CACHE_HEADER.unpack_from(data)
+        if magic == CACHE_MAGIC and cached_count == count and len(data) == CACHE_HEADER.size + 8 * count:
+            values = array('Q')
+            values.frombytes(data[CACHE_HEADER.size:])
+    except (OSError, struct.error):
+        pass
+
+    tables = []
+    offset = 0
+    for masks, directions in layout:
+        piece_tables = []
+        for square, mask in enumerate(masks):
+            occupancies = list(_subsets(mask))
+            if values is not None:
+                attacks = values[offset:offset + len(occupancies)]
+            else:
+                attacks = [_ray_attacks(square, occupancy, directions) for occupancy in occupancies]
+            piece_tables.append(dict(zip(occupancies, attacks)))
+            offset += len(occupancies)
+        tables.append(piece_tables)
+
+    if values is None:
+        values = array('Q', (attacks for piece_tables in tables for table in piece_tables for attacks in table.values()))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary_path = path + ".tmp"
+            with open(temporary_path, 'wb') as cache_file:
+                cache_file.write(CACHE_HEADER.pack(CACHE_MAGIC, count))
+                values.tofile(cache_file)
+            os.replace(temporary_path, path)
+        except OSError as error:
+            # A read-only install still works, it just builds every time
+            print(f"Could not cache the attack tables: {error}", file=sys.stderr)
+    return tables[0], tables[1]
+
+
+KNIGHT_ATTACKS = [_step_attacks(square, KNIGHT_STEPS) for square in chess.SQUARES]
+KING_ATTACKS = [_step_attacks(square, KING_STEPS) for square in chess.SQUARES]
+# Squares attacked by a pawn of each color (indexed by chess.BLACK/WHITE)
+PAWN_ATTACKS = [
+    [_step_attacks(square, ((-1, -1), (1, -1))) for square in chess.SQUARES],
+    [_step_attacks(square, ((-1, 1), (1, 1))) for square in chess.SQUARES]
+]
+ROOK_TABLES, BISHOP_TABLES = _load_slider_tables()
+ROOK_RAYS = [table[0] for table in ROOK_TABLES]
+BISHOP_RAYS = [table[0] for table in BISHOP_TABLES]
+
+
+def _between_and_line(a, b):
+    """Get the squares strictly between two squares and the whole line through them"""
+    for rays, directions in ((ROOK_RAYS, ROOK_DIRECTIONS), (BISHOP_RAYS, BISHOP_DIRECTIONS)):
+        if rays[a] & 1 << b:
+            between = _ray_attacks(a, 1 << b, directions) & _ray_attacks(b, 1 << a, directions)
+            line = (rays[a] & rays[b]) | 1 << a | 1 << b
+            return between, line
+    return 0, 0
+
+
+BETWEEN = [[0] * 64 for _ in chess.SQUARES]
+LINE = [[0] * 64 for _ in chess.SQUARES]
+for _a in chess.SQUARES:
+    for _b in chess.SQUARES:
+        if _a != _b:
+            BETWEEN[_a][_b], LINE[_a][_b] = _between_and_line(_a, _b)
+
+# Castling rights kept when a piece moves from or to a square
+CASTLING_KEPT = [15] * 64
+CASTLING_KEPT[chess.E1] = 15 & ~(WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLING_KEPT[chess.H1] = 15 & ~WHITE_KINGSIDE
+CASTLING_KEPT[chess.A1] = 15 & ~WHITE_QUEENSIDE
+CASTLING_KEPT[chess.E8] = 15 & ~(BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLING_KEPT[chess.H8] = 15 & ~BLACK_KINGSIDE
+CASTLING_KEPT[chess.A8] = 15 & ~BLACK_QUEENSIDE
+
+# Rook move of every castling, by the king's destination
+CASTLING_ROOKS = {
+    chess.G1: (chess.H1, chess.F1),
+    chess.C1: (chess.A1, chess.D1),
+    chess.G8: (chess.H8, chess.F8),
+    chess.C8: (chess.A8, chess.D8)
+}
+
+# Per color: (right, squares that must be empty, squares the king
+# crosses, king move)
+CASTLING_MOVES = [
+    [
+        (BLACK_KINGSIDE, chess.BB_F8 | chess.BB_G8, (chess.F8, chess.G8),
+         chess.G8 | chess.E8 << FROM_SHIFT | CASTLING),
+        (BLACK_QUEENSIDE, chess.BB_B8 | chess.BB_C8 | chess.BB_D8, (chess.D8, chess.C8),
+         chess.C8 | chess.E8 << FROM_SHIFT | CASTLING)
+    ],
+    [
+        (WHITE_KINGSIDE, chess.BB_F1 | chess.BB_G1, (chess.F1, chess.G1),
+         chess.G1 | chess.E1 << FROM_SHIFT | CASTLING),
+        (WHITE_QUEENSIDE, chess.BB_B1 | chess.BB_C1 | chess.BB_D1, (chess.D1, chess.C1),
+         chess.C1 | chess.E1 << FROM_SHIFT | CASTLING)
+    ]
+]
+
+PROMOTION_PIECES = (chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT)
+
+
+def move_to_uci(move):
+    """
+    Get the UCI string of a move
+
+    Args:
+        move: Move int
+
+    Returns:
+        UCI string such as "e2e4" or "e7e8q"
+    """
+    promotion = move >> PROMOTION_SHIFT & 7
+    text = chess.SQUARE_NAMES[move >> FROM_SHIFT & SQUARE_MASK] + chess.SQUARE_NAMES[move & SQUARE_MASK]
+    return text + chess.piece_symbol(promotion) if promotion else text
+
+
+def move_to_chess(move):
+    """
+    Convert a move int to a python-chess Move
+
+    Args:
+        move: Move int
+
+    Returns:
+        python-chess Move object
+    """
+    promotion = move >> PROMOTION_SHIFT & 7
+    return chess.Move(move >> FROM_SHIFT & SQUARE_MASK, move & SQUARE_MASK, promotion or None)
+
+
+class BitboardPosition:
+    """
+    Compact chess position for fast move generation
+
+    The position is a bitboard per color and piece type plus a square
+    array of piece codes (piece type, plus 8 for white) for finding what a
+    move captures. Moves are ints, legal moves are generated directly
+    (pinned pieces stay on their pin line, in check only blocks and
+    captures are tried), and make_move/unmake_move change the position in
+    place with an undo stack instead of copying it. Standard chess only;
+    no repetition or fifty-move bookkeeping beyond the halfmove clock.
+    """
+
+    def __init__(self):
+        """Initialize an empty position; use from_chess_board to set one up"""
+        # Indexed by chess.BLACK/WHITE, then by piece type
+        self.pieces = [[0] * 7, [0] * 7]
+        self.occupied_co = [0, 0]
+        self.squares = [0] * 64
+        self.turn = chess.WHITE
+        self.castling = 0
+        self.ep_square = NO_SQUARE
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.stack = []
+
+    @classmethod
+    def from_chess_board(cls, chess_board):
+        """
+        Set up the position of a python-chess Board
+
+        Args:
+            chess_board: python-chess Board (standard chess)
+
+        Returns:
+            BitboardPosition
+        """
+        position = cls()
+        for square, piece in chess_board.piece_map().items():
+            position.put_piece(square, piece.color, piece.piece_type)
+        position.turn = int(chess_board.turn)
+        for right, color, kingside in (
+            (WHITE_KINGSIDE, chess.WHITE, True), (WHITE_QUEENSIDE, chess.WHITE, False),
+            (BLACK_KINGSIDE, chess.BLACK, True), (BLACK_QUEENSIDE, chess.BLACK, False)
+        ):
+            has_right = (chess_board.has_kingside_castling_rights(color) if kingside
+                         else chess_board.has_queenside_castling_rights(color))
+            if has_right:
+                position.castling |= right
+        if chess_board.ep_square is not None:
+            position.ep_square = chess_board.ep_square
+        position.halfmove_clock = chess_board.halfmove_clock
+        position.fullmove_number = chess_board.fullmove_number
+        return position
+
+    @classmethod
+    def from_fen(cls, fen=chess.STARTING_FEN):
+        """Set up the position of a FEN string"""
+        return cls.from_chess_board(chess.Board(fen))
+
+    def copy(self):
+        """
+        Get an independent copy of the position
+
+        Returns:
+            BitboardPosition with the same position and undo stack
+        """
+        position = BitboardPosition()
+        position.pieces = [list(self.pieces[0]), list(self.pieces[1])]
+        position.occupied_co = list(self.occupied_co)
+        position.squares = list(self.squares)
+        position.turn = self.turn
+        position.castling = self.castling
+        position.ep_square = self.ep_square
+        position.halfmove_clock = self.halfmove_clock
+        position.fullmove_number = self.fullmove_number
+        position.stack = list(self.stack)
+        return position
+
+    def put_piece(self, square, color, piece_type):
+        """Place a piece on an empty square"""
+        bit = 1 << square
+        self.pieces[color][piece_type] |= bit
+        self.occupied_co[color] |= bit
+        self.squares[square] = piece_type | color << 3
+
+    def king_square(self, color):
+        """Get the square of a color's king"""
+        return self.pieces[color][chess.KING].bit_length() - 1
+
+    def attackers(self, color, square, occupied):
+        """
+        Get the pieces of a color attacking a square
+
+        Args:
+            color: Color of the attackers
+            square: Attacked square
+            occupied: Occupied squares blocking sliders
+
+        Returns:
+            Bitboard of the attacking pieces
+        """
+        pieces = self.pieces[color]
+        queens = pieces[chess.QUEEN]
+        return (
+            KNIGHT_ATTACKS[square] & pieces[chess.KNIGHT] |
+            KING_ATTACKS[square] & pieces[chess.KING] |
+            PAWN_ATTACKS[color ^ 1][square] & pieces[chess.PAWN] |
+            ROOK_TABLES[square][occupied & ROOK_MASKS[square]] & (pieces[chess.ROOK] | queens) |
+            BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]] & (pieces[chess.BISHOP] | queens)
+        )
+
+    def is_check(self):
+        """Check if the side to move is in check"""
+        occupied = self.occupied_co[0] | self.occupied_co[1]
+        return bool(self.attackers(self.turn ^ 1, self.king_square(self.turn), occupied))
+
+    def generate_legal_moves(self):
+        """
+        Generate every legal move
+
+        Returns:
+            List of move ints
+        """
+        us = self.turn
+        them = us ^ 1
+        own = self.pieces[us]
+        enemy = self.pieces[them]
+        own_occupied = self.occupied_co[us]
+        enemy_occupied = self.occupied_co[them]
+        occupied = own_occupied | enemy_occupied
+        king = own[chess.KING].bit_length() - 1
+        attackers = self.attackers
+        moves = []
+        append = moves.append
+
+        # King steps, checked against the occupancy without the king so
+        # that it cannot step back along a checking ray
+        without_king = occupied ^ 1 << king
+        targets = KING_ATTACKS[king] & ~own_occupied
+        while targets:
+            bit = targets & -targets
+            to_square = bit.bit_length() - 1
+            if not attackers(them, to_square, without_king):
+                append(to_square | king << FROM_SHIFT)
+            targets ^= bit
+
+        checkers = attackers(them, king, occupied)
+        if checkers & (checkers - 1):
+            # Double check: only the king can move
+            return moves
+        if checkers:
+            target_mask = BETWEEN[king][checkers.bit_length() - 1] | checkers
+        else:
+            target_mask = BB_ALL
+            for right, empty, crossed, move in CASTLING_MOVES[us]:
+                if (self.castling & right and not occupied & empty and
+                        not attackers(them, crossed[0], occupied) and
+                        not attackers(them, crossed[1], occupied)):
+                    append(move)
+
+        # Pieces pinned to the king may only move along the pin line
+        pinned = 0
+        enemy_queens = enemy[chess.QUEEN]
+        snipers = (ROOK_RAYS[king] & (enemy[chess.ROOK] | enemy_queens) |
+                   BISHOP_RAYS[king] & (enemy[chess.BISHOP] | enemy_queens))
+        while snipers:
+            bit = snipers & -snipers
+            blockers = BETWEEN[king][bit.bit_length() - 1] & occupied
+            if blockers and not blockers & (blockers - 1) and blockers & own_occupied:
+                pinned |= blockers
+            snipers ^= bit
+
+        line = LINE[king]
+        allowed = ~own_occupied & target_mask
+        own_queens = own[chess.QUEEN]
+        for pieces, tables, masks in (
+            (own[chess.KNIGHT], None, None),
+            (own[chess.BISHOP] | own_queens, BISHOP_TABLES, BISHOP_MASKS),
+            (own[chess.ROOK] | own_queens, ROOK_TABLES, ROOK_MASKS)
+        ):
+            if tables is None:
+                # A pinned knight can never move
+                pieces &= ~pinned
+            while pieces:
+                bit = pieces & -pieces
+                from_square = bit.bit_length() - 1
+                if tables is None:
+                    targets = KNIGHT_ATTACKS[from_square] & allowed
+                else:
+                    targets = tables[from_square][occupied & masks[from_square]] & allowed
+                    if bit & pinned:
+                        targets &= line[from_square]
+                origin = from_square << FROM_SHIFT
+                while targets:
+                    target = targets & -targets
+                    append(target.bit_length() - 1 | origin)
+                    targets ^= target
+                pieces ^= bit
+
+        self._generate_pawn_moves(moves, own[chess.PAWN], pinned, line, occupied, enemy_occupied, target_mask)
+        return moves
+
+    def _generate_pawn_moves(self, moves, pawns, pinned, line, occupied, enemy_occupied, target_mask):
+        """Append the legal pawn moves; unpinned pawns are moved set-wise"""
+        us = self.turn
+        append = moves.append
+        empty = ~occupied
+        if us == chess.WHITE:
+            forward, double_rank, last_rank = 8, chess.BB_RANK_3, chess.BB_RANK_8
+        else:
+            forward, double_rank, last_rank = -8, chess.BB_RANK_6, chess.BB_RANK_1
+
+        groups = [(pawns & ~pinned, BB_ALL)]
+        pinned_pawns = pawns & pinned
+        while pinned_pawns:
+            bit = pinned_pawns & -pinned_pawns
+            groups.append((bit, line[bit.bit_length() - 1]))
+            pinned_pawns ^= bit
+
+        for group, mask in groups:
+            mask &= target_mask
+            if forward > 0:
+                single = group << 8 & empty
+                double = (single & double_rank) << 8 & empty
+                left = (group & ~chess.BB_FILE_A) << 7 & enemy_occupied
+                right = (group & ~chess.BB_FILE_H) << 9 & enemy_occupied
+            else:
+                single = group >> 8 & empty
+                double = (single & double_rank) >> 8 & empty
+                left = (group & ~chess.BB_FILE_A) >> 9 & enemy_occupied
+                right = (group & ~chess.BB_FILE_H) >> 7 & enemy_occupied
+
+            for targets, step, flag in (
+                (single & mask, forward, 0),
+                (double & mask, 2 * forward, DOUBLE_PUSH),
+                (left & mask, forward - 1, 0),
+                (right & mask, forward + 1, 0)
+            ):
+                while targets:
+                    bit = targets & -targets
+                    to_square = bit.bit_length() - 1
+                    move = to_square | (to_square - step) << FROM_SHIFT | flag
+                    if bit & last_rank:
+                        for piece_type in PROMOTION_PIECES:
+                            append(move | piece_type << PROMOTION_SHIFT)
+                    else:
+                        append(move)
+                    targets ^= bit
+
+        # En passant can expose the king along the rank of both pawns, so
+        # each candidate is simply tried
+        if self.ep_square != NO_SQUARE:
+            candidates = PAWN_ATTACKS[us ^ 1][self.ep_square] & pawns
+            while candidates:
+                bit = candidates & -candidates
+                move = self.ep_square | (bit.bit_length() - 1) << FROM_SHIFT | EN_PASSANT
+                self.make_move(move)
+                occupied_after = self.occupied_co[0] | self.occupied_co[1]
+                if not self.attackers(self.turn, self.king_square(us), occupied_after):
+                    append(move)
+                self.unmake_move()
+                candidates ^= bit
+
+    def make_move(self, move):
+        """
+        Play a legal move
+
+        Args:
+            move: Move int from generate_legal_moves or encode_move
+        """
+        to_square = move & SQUARE_MASK
+        from_square = move >> FROM_SHIFT & SQUARE_MASK
+        flag = move & ~CODE_MASK
+        us = self.turn
+        them = us ^ 1
+        squares = self.squares
+        piece = squares[from_square]
+        captured = squares[to_square]
+        self.stack.append((move, captured, self.castling, self.ep_square, self.halfmove_clock))
+
+        own = self.pieces[us]
+        from_bit = 1 << from_square
+        to_bit = 1 << to_square
+        own[piece & 7] ^= from_bit | to_bit
+        self.occupied_co[us] ^= from_bit | to_bit
+        squares[to_square] = piece
+        squares[from_square] = 0
+
+        if captured:
+            self.pieces[them][captured & 7] ^= to_bit
+            self.occupied_co[them] ^= to_bit
+        promotion = move >> PROMOTION_SHIFT & 7
+        if promotion:
+            own[chess.PAWN] ^= to_bit
+            own[promotion] ^= to_bit
+            squares[to_square] = promotion | us << 3
+
+        self.ep_square = NO_SQUARE
+        if flag:
+            if flag == DOUBLE_PUSH:
+                self.ep_square = (from_square + to_square) >> 1
+            elif flag == EN_PASSANT:
+                captured_square = to_square - 8 if us == chess.WHITE else to_square + 8
+                captured_bit = 1 << captured_square
+                self.pieces[them][chess.PAWN] ^= captured_bit
+                self.occupied_co[them] ^= captured_bit
+                squares[captured_square] = 0
+            else:
+                rook_from, rook_to = CASTLING_ROOKS[to_square]
+                rook_bits = 1 << rook_from | 1 << rook_to
+                own[chess.ROOK] ^= rook_bits
+                self.occupied_co[us] ^= rook_bits
+                squares[rook_to] = squares[rook_from]
+                squares[rook_from] = 0
+
+        self.castling &= CASTLING_KEPT[from_square] & CASTLING_KEPT[to_square]
+        if captured or piece & 7 == chess.PAWN:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if us == chess.BLACK:
+            self.fullmove_number += 1
+        self.turn = them
+
+    def unmake_move(self):
+        """Take back the last move played with make_move"""
+        move, captured, self.castling, self.ep_square, self.halfmove_clock = self.stack.pop()
+        to_square = move & SQUARE_MASK
+        from_square = move >> FROM_SHIFT & SQUARE_MASK
+        flag = move & ~CODE_MASK
+        them = self.turn
+        us = them ^ 1
+        self.turn = us
+        if us == chess.BLACK:
+            self.fullmove_number -= 1
+
+        squares = self.squares
+        own = self.pieces[us]
+        from_bit = 1 << from_square
+        to_bit = 1 << to_square
+        promotion = move >> PROMOTION_SHIFT & 7
+        if promotion:
+            own[promotion] ^= to_bit
+            own[chess.PAWN] ^= to_bit
+            squares[to_square] = chess.PAWN | us << 3
+        piece = squares[to_square]
+        own[piece & 7] ^= from_bit | to_bit
+        self.occupied_co[us] ^= from_bit | to_bit
+        squares[from_square] = piece
+        squares[to_square] = captured
+
+        if captured:
+            self.pieces[them][captured & 7] ^= to_bit
+            self.occupied_co[them] ^= to_bit
+        if flag == EN_PASSANT:
+            captured_square = to_square - 8 if us == chess.WHITE else to_square + 8
+            captured_bit = 1 << captured_square
+            self.pieces[them][chess.PAWN] ^= captured_bit
+            self.occupied_co[them] ^= captured_bit
+            squares[captured_square] = chess.PAWN | them << 3
+        elif flag == CASTLING:
+            rook_from, rook_to = CASTLING_ROOKS[to_square]
+            rook_bits = 1 << rook_from | 1 << rook_to
+            own[chess.ROOK] ^= rook_bits
+            self.occupied_co[us] ^= rook_bits
+            squares[rook_from] = squares[rook_to]
+            squares[rook_to] = 0
+
+    def encode_move(self, chess_move):
+        """
+        Convert a python-chess Move to a move int for this position
+
+        Args:
+            chess_move: python-chess Move, assumed legal
+
+        Returns:
+            Move int including the flag make_move needs
+        """
+        from_square = chess_move.from_square
+        to_square = chess_move.to_square
+        move = to_square | from_square << FROM_SHIFT | (chess_move.promotion or 0) << PROMOTION_SHIFT
+        piece_type = self.squares[from_square] & 7
+        if piece_type == chess.PAWN:
+            if abs(to_square - from_square) == 16:
+                move |= DOUBLE_PUSH
+            elif to_square == self.ep_square:
+                move |= EN_PASSANT
+        elif piece_type == chess.KING and abs(to_square - from_square) == 2:
+            move |= CASTLING
+        return move
+
+    def perft(self, depth):
+        """
+        Count the leaf nodes of the legal move tree
+
+        The last ply is counted without playing its moves.
+
+        Args:
+            depth: Depth in plies
+
+        Returns:
+            Number of leaf nodes
+        """
+        if depth <= 0:
+            return 1
+        moves = self.generate_legal_moves()
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        make_move = self.make_move
+        unmake_move = self.unmake_move
+        perft = self.perft
+        for move in moves:
+            make_move(move)
+            nodes += perft(depth - 1)
+            unmake_move()
+        return nodes
\ No newline at end of file
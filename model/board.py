@@ -1,16 +1,160 @@
 import chess
-from model.piece import Piece
+from array import array
+from model.piece import Piece, piece_code
 
 class Board:
-    """Represents the chess board and its state"""
+    """
+    Represents the chess board and its state
     
-    def __init__(self):
-        """Initialize a new chess board"""
-        self.chess_board = chess.Board()
+    The game is kept in a python-chess Board. With the "bitboard" backend
+    the legal moves come from a model.bitboard.BitboardPosition mirror
+    that follows every push and take back, and perft runs on it directly.
+    Changes made to chess_board behind the Board's back are not mirrored.
+    """
+    
+    BACKENDS = ("python-chess", "bitboard")
+    
+    def __init__(self, backend="python-chess"):
+        """
+        Initialize a new chess board
         
-    def reset(self):
-        """Reset the board to the starting position"""
+        Args:
+            backend: Move generator, one of BACKENDS
+        """
         self.chess_board = chess.Board()
+        self._san_log = []
+        self.version = 0
+        self._move_index = None
+        self._snapshot = None
+        self._snapshot_version = None
+        self._position = None
+        self.game_log = None
+        self.set_backend(backend)
+        
+    def reset(self, fen=None):
+        """
+        Reset the board to the starting position
+        
+        Args:
+            fen: FEN of a custom starting position (default: standard start)
+        """
+        self.chess_board = chess.Board(fen) if fen else chess.Board()
+        self._san_log = []
+        self._position = None
+        self._position_changed()
+        if self.game_log:
+            self.game_log.start_game(self.chess_board.fen())
+    
+    def set_game_log(self, game_log):
+        """
+        Log every move, take back and reset from now on
+        
+        Args:
+            game_log: AutosaveLog (or None to stop logging); it is
+                rewritten with the game played so far
+        """
+        self.game_log = game_log
+        if game_log:
+            game_log.start_game(self.chess_board.root().fen(), self.chess_board.move_stack)
+    
+    def set_backend(self, backend):
+        """
+        Switch the move generator
+        
+        Args:
+            backend: One of BACKENDS
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown board backend: {backend}")
+        self.backend = backend
+        self._position = None
+        self._move_index = None
+    
+    def get_position(self):
+        """
+        Get the bitboard mirror of the current position
+        
+        Returns:
+            model.bitboard.BitboardPosition; it is updated in place by
+            push and undo_move, so it must be restored after use
+        """
+        if self._position is None:
+            # The attack tables are only loaded when a bitboard is needed
+            from model.bitboard import BitboardPosition
+            self._position = BitboardPosition.from_chess_board(self.chess_board)
+        return self._position
+    
+    def copy(self):
+        """
+        Get an independent copy of the board
+        
+        Returns:
+            New Board instance with the same position and move history
+        """
+        board = Board(self.backend)
+        board.chess_board = self.chess_board.copy()
+        board._san_log = list(self._san_log)
+        if self._position is not None:
+            board._position = self._position.copy()
+        return board
+    
+    def _position_changed(self):
+        """Invalidate everything cached for the previous position"""
+        self.version += 1
+        self._move_index = None
+    
+    def get_snapshot(self):
+        """
+        Get a compact snapshot of the piece placement
+        
+        The snapshot is a flat array of 64 piece codes indexed by
+        row * 8 + col, with 0 for empty squares (see model.piece.piece_code).
+        It is regenerated only when the position changes; until then the
+        same array object is returned, so it must not be modified.
+        
+        Returns:
+            Tuple (version, array of 64 piece codes)
+        """
+        if self._snapshot_version != self.version:
+            snapshot = array('B', bytes(64))
+            for square, chess_piece in self.chess_board.piece_map().items():
+                # Flip the rank so that index 0 is a8, the top-left square
+                snapshot[square ^ 56] = piece_code(chess_piece.color, chess_piece.piece_type)
+            self._snapshot = snapshot
+            self._snapshot_version = self.version
+        return self.version, self._snapshot
+    
+    def _get_move_index(self):
+        """
+        Get the legal move index for the current position
+        
+        The index is generated once per position and dropped by
+        _position_changed(), so repeated lookups do not walk the legal
+        move generator.
+        
+        Returns:
+            Dictionary mapping from-square to a tuple of (list of
+            destination (row, col) tuples, dictionary of legal moves
+            to their destination)
+        """
+        if self._move_index is None:
+            index = {}
+            if self.backend == "bitboard":
+                from model.bitboard import move_to_chess
+                legal_moves = map(move_to_chess, self.get_position().generate_legal_moves())
+            else:
+                legal_moves = self.chess_board.legal_moves
+            for move in legal_moves:
+                destinations, moves = index.setdefault(move.from_square, ([], {}))
+                destination = (7 - chess.square_rank(move.to_square), chess.square_file(move.to_square))
+                
+                # Promotions share a destination square
+                if destination not in destinations:
+                    destinations.append(destination)
+                moves[move] = destination
+            
+            self._move_index = index
+        return self._move_index
         
     def get_piece_at(self, row, col):
         """
@@ -23,9 +167,8 @@ class Board:
         Returns:
             Piece object or None if empty
         """
-        square = chess.square(col, 7 - row)
-        chess_piece = self.chess_board.piece_at(square)
-        return Piece(chess_piece) if chess_piece else None
+        _, snapshot = self.get_snapshot()
+        return Piece.from_code(snapshot[row * 8 + col])
     
     def get_legal_moves_from(self, row, col):
         """
@@ -39,15 +182,17 @@ class Board:
             List of tuples (row, col) for legal destination squares
         """
         square = chess.square(col, 7 - row)
-        legal_moves = []
+        entry = self._get_move_index().get(square)
+        return list(entry[0]) if entry else []
+    
+    def get_legal_moves(self):
+        """
+        Get all legal moves in the current position
         
-        for move in self.chess_board.legal_moves:
-            if move.from_square == square:
-                dest_row = 7 - chess.square_rank(move.to_square)
-                dest_col = chess.square_file(move.to_square)
-                legal_moves.append((dest_row, dest_col))
-                
-        return legal_moves
+        Returns:
+            List of python-chess Move objects in generation order
+        """
+        return [move for _, moves in self._get_move_index().values() for move in moves]
     
     def make_move(self, start_pos, end_pos, promotion_piece=chess.QUEEN):
         """
@@ -61,6 +206,21 @@ class Board:
         Returns:
             True if move was made, False if invalid
         """
+        # Make move if legal
+        return self.push(self.build_move(start_pos, end_pos, promotion_piece))
+    
+    def build_move(self, start_pos, end_pos, promotion_piece=chess.QUEEN):
+        """
+        Build the move between two squares without checking or playing it
+        
+        Args:
+            start_pos: Tuple (row, col) of starting position
+            end_pos: Tuple (row, col) of ending position
+            promotion_piece: Piece type for promotion (default: Queen)
+            
+        Returns:
+            python-chess Move object
+        """
         start_row, start_col = start_pos
         end_row, end_col = end_pos
         
@@ -79,12 +239,55 @@ class Board:
                 move = chess.Move(start_square, end_square)
         else:
             move = chess.Move(start_square, end_square)
+        return move
+    
+    def is_legal(self, move):
+        """Check if a move is legal in the current position"""
+        entry = self._get_move_index().get(move.from_square)
+        return bool(entry) and move in entry[1]
+    
+    def push(self, move):
+        """
+        Play a move if it is legal in the current position
         
-        # Make move if legal
-        if move in self.chess_board.legal_moves:
-            self.chess_board.push(move)
-            return True
-        return False
+        Args:
+            move: python-chess Move object
+            
+        Returns:
+            True if move was made, False if invalid
+        """
+        if not self.is_legal(move):
+            return False
+        
+        self.chess_board.push(move)
+        if self._position is not None:
+            self._position.make_move(self._position.encode_move(move))
+        self._position_changed()
+        if self.game_log:
+            self.game_log.append_move(move)
+        return True
+    
+    def undo_move(self):
+        """
+        Take back the last move
+        
+        Returns:
+            True if a move was taken back, False if there was none
+        """
+        if not self.chess_board.move_stack:
+            return False
+        self.chess_board.pop()
+        del self._san_log[len(self.chess_board.move_stack):]
+        if self._position is not None:
+            if self._position.stack:
+                self._position.unmake_move()
+            else:
+                # Mirrored after this move was played; set it up again
+                self._position = None
+        self._position_changed()
+        if self.game_log:
+            self.game_log.append_undo()
+        return True
     
     def is_checkmate(self):
         """Check if the current position is checkmate"""
@@ -102,10 +305,60 @@ class Board:
         """Check if the game is over"""
         return self.chess_board.is_game_over()
     
+    def get_outcome(self):
+        """
+        Get the outcome of a finished game
+        
+        Returns:
+            python-chess Outcome object, or None if the game is not over
+        """
+        return self.chess_board.outcome()
+    
+    def describe_outcome(self):
+        """
+        Describe how a finished game ended
+        
+        Returns:
+            Result message such as "Checkmate! White wins!"
+        """
+        if self.is_checkmate():
+            winner = "Black" if self.get_current_player() else "White"
+            return f"Checkmate! {winner} wins!"
+        if self.is_stalemate():
+            return "Stalemate! Draw!"
+        # Other draw conditions
+        return "Game over! Draw!"
+    
+    def get_ply(self):
+        """Get the number of moves played so far"""
+        return len(self.chess_board.move_stack)
+    
     def get_current_player(self):
         """Get the current player (True for white, False for black)"""
         return self.chess_board.turn
     
+    def get_san_log(self):
+        """
+        Get the moves played so far in standard algebraic notation
+        
+        SAN depends on the position before each move, so it is worked out
+        here for the moves played since the last call, by taking them back
+        and replaying them, instead of on every push; searches, perft and
+        the server never pay for it.
+        
+        Returns:
+            List of SAN strings, owned by the board (do not modify)
+        """
+        san_log = self._san_log
+        missing = len(self.chess_board.move_stack) - len(san_log)
+        if missing > 0:
+            chess_board = self.chess_board
+            moves = [chess_board.pop() for _ in range(missing)]
+            for move in reversed(moves):
+                san_log.append(chess_board.san(move))
+                chess_board.push(move)
+        return san_log
+    
     def get_move_history(self):
         """Get the history of moves in standard algebraic notation"""
-        return [self.chess_board.san(move) for move in self.chess_board.move_stack]
\ No newline at end of file
+        return list(self.get_san_log())
\ No newline at end of file
@@ -0,0 +1,533 @@
+import time
+import chess
+from model.transposition import (
+    TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND, encode_move, decode_move
+)
+from model.zobrist import zobrist_key, zobrist_key_after
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget or a stop request is hit"""
+
+
+class SearchResult:
+    """Outcome of one search iteration"""
+
+    def __init__(self, best_move, score, depth, pv, nodes, elapsed):
+        """
+        Initialize a search result
+
+        Args:
+            best_move: Best python-chess Move found, or None without legal moves
+            score: Score in centipawns from the side to move's point of view
+            depth: Completed search depth in plies
+            pv: List of python-chess Moves in the principal variation
+            nodes: Number of nodes searched so far
+            elapsed: Seconds spent searching so far
+        """
+        self.best_move = best_move
+        self.score = score
+        self.depth = depth
+        self.pv = pv
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def nps(self):
+        """Get the search speed in nodes per second"""
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+    def is_mate_score(self):
+        """Check if the score announces a forced mate"""
+        return abs(self.score) >= Engine.MATE_SCORE - Engine.MAX_PLY
+
+
+class Engine:
+    """Alpha-beta chess engine searching python-chess positions"""
+
+    MATE_SCORE = 100000
+    INFINITY = 1000000
+    MAX_PLY = 64
+    CHECK_INTERVAL = 1023
+
+    PIECE_VALUES = [0, 100, 320, 330, 500, 900, 20000]
+
+    # Piece-square tables from white's point of view, a8 first
+    PAWN_TABLE = [
+        0,   0,   0,   0,   0,   0,   0,   0,
+        50,  50,  50,  50,  50,  50,  50,  50,
+        10,  10,  20,  30,  30,  20,  10,  10,
+        5,   5,  10,  25,  25,  10,   5,   5,
+        0,   0,   0,  20,  20,   0,   0,   0,
+        5,  -5, -10,   0,   0, -10,  -5,   5,
+        5,  10,  10, -20, -20,  10,  10,   5,
+        0,   0,   0,   0,   0,   0,   0,   0
+    ]
+    KNIGHT_TABLE = [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20,   0,   0,   0,   0, -20, -40,
+        -30,   0,  10,  15,  15,  10,   0, -30,
+        -30,   5,  15,  20,  20,  15,   5, -30,
+        -30,   0,  15,  20,  20,  15,   0, -30,
+        -30,   5,  10,  15,  15,  10,   5, -30,
+        -40, -20,   0,   5,   5,   0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50
+    ]
+    BISHOP_TABLE = [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,  10,  10,   5,   0, -10,
+        -10,   5,   5,  10,  10,   5,   5, -10,
+        -10,   0,  10,  10,  10,  10,   0, -10,
+        -10,  10,  10,  10,  10,  10,  10, -10,
+        -10,   5,   0,   0,   0,   0,   5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20
+    ]
+    ROOK_TABLE = [
+        0,   0,   0,   0,   0,   0,   0,   0,
+        5,  10,  10,  10,  10,  10,  10,   5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        0,   0,   0,   5,   5,   0,   0,   0
+    ]
+    QUEEN_TABLE = [
+        -20, -10, -10,  -5,  -5, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,   5,   5,   5,   0, -10,
+        -5,   0,   5,   5,   5,   5,   0,  -5,
+        0,   0,   5,   5,   5,   5,   0,  -5,
+        -10,   5,   5,   5,   5,   5,   0, -10,
+        -10,   0,   5,   0,   0,   0,   0, -10,
+        -20, -10, -10,  -5,  -5, -10, -10, -20
+    ]
+    KING_TABLE = [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20,  20,   0,   0,   0,   0,  20,  20,
+        20,  30,  10,   0,   0,  10,  30,  20
+    ]
+    KING_ENDGAME_TABLE = [
+        -50, -40, -30, -20, -20, -30, -40, -50,
+        -30, -20, -10,   0,   0, -10, -20, -30,
+        -30, -10,  20,  30,  30,  20, -10, -30,
+        -30, -10,  30,  40,  40,  30, -10, -30,
+        -30, -10,  30,  40,  40,  30, -10, -30,
+        -30, -10,  20,  30,  30,  20, -10, -30,
+        -30, -30,   0,   0,   0,   0, -30, -30,
+        -50, -30, -30, -30, -30, -30, -30, -50
+    ]
+
+    def __init__(self, hash_size_mb=16, transposition_table=None, tablebase=None):
+        """
+        Initialize the engine
+        
+        Args:
+            hash_size_mb: Memory cap of the transposition table in megabytes
+            transposition_table: TranspositionTable to use instead of
+                allocating a private one
+            tablebase: Tablebase whose positions are scored exactly instead
+                of searched, or None
+        """
+        self.tt = transposition_table or TranspositionTable(hash_size_mb)
+        self.tablebase = tablebase
+        self.piece_tables = [
+            None,
+            self.PAWN_TABLE,
+            self.KNIGHT_TABLE,
+            self.BISHOP_TABLE,
+            self.ROOK_TABLE,
+            self.QUEEN_TABLE,
+            self.KING_TABLE
+        ]
+        self.nodes = 0
+        self.deadline = None
+        self.node_limit = None
+        self.stop_event = None
+        self.killers = []
+        self.history = []
+        self.pv_table = []
+        self.previous_pv = []
+        self.position_keys = []
+
+    def search(self, board, time_limit=None, max_depth=None, stop_event=None,
+               info_callback=None, node_limit=None, start_depth=1):
+        """
+        Search a position with iterative deepening
+
+        The search stops when max_depth is completed, the time budget or
+        node limit is exhausted, or stop_event is set, and returns the
+        result of the deepest completed iteration.
+
+        Args:
+            board: Board instance to search (it is not modified)
+            time_limit: Time budget in seconds, or None for no limit
+            max_depth: Maximum depth in plies, or None for no limit
+            stop_event: threading.Event that aborts the search when set
+            info_callback: Function called with a SearchResult after
+                every completed iteration
+            node_limit: Maximum number of nodes, or None for no limit
+            start_depth: Depth of the first iteration (helpers of a
+                parallel search start deeper than the main worker)
+
+        Returns:
+            SearchResult for the deepest completed iteration
+        """
+        chess_board = board.chess_board.copy()
+        start_time = time.perf_counter()
+        max_depth = min(max_depth or self.MAX_PLY, self.MAX_PLY - 1)
+
+        self.nodes = 0
+        self.deadline = start_time + time_limit if time_limit else None
+        self.node_limit = node_limit
+        self.stop_event = stop_event
+        self.killers = [[None, None] for _ in range(self.MAX_PLY + 1)]
+        self.history = [[0] * 64 for _ in range(64)]
+        self.pv_table = [[] for _ in range(self.MAX_PLY + 1)]
+        self.previous_pv = []
+        self.position_keys = self._get_game_keys(chess_board)
+        self.tt.new_search()
+
+        legal_moves = list(chess_board.legal_moves)
+        result = SearchResult(legal_moves[0] if legal_moves else None, 0, 0, [], 0, 0.0)
+        if not legal_moves:
+            return result
+
+        # Endgames covered by the tablebase are played without searching
+        if self.tablebase:
+            entry = self.tablebase.get_best_move(chess_board)
+            if entry:
+                move, outcome, plies = entry
+                return SearchResult(
+                    move, self._tablebase_score(outcome, plies, 0), 0, [move], 0,
+                    time.perf_counter() - start_time
+                )
+
+        for depth in range(min(start_depth, max_depth), max_depth + 1):
+            try:
+                score = self._negamax(chess_board, depth, -self.INFINITY, self.INFINITY, 0)
+            except SearchTimeout:
+                break
+
+            pv = list(self.pv_table[0])
+            self.previous_pv = pv
+            result = SearchResult(pv[0], score, depth, pv, self.nodes, time.perf_counter() - start_time)
+            if info_callback:
+                info_callback(result)
+
+            # A found mate cannot get any better
+            if result.is_mate_score():
+                break
+            # The next iteration would not finish in the remaining time
+            if self.deadline and time.perf_counter() - start_time > time_limit / 2:
+                break
+
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+    def _get_game_keys(self, chess_board):
+        """
+        Get position keys of the game since the last irreversible move
+
+        Args:
+            chess_board: python-chess Board with its move stack
+
+        Returns:
+            List of position keys, oldest first, ending with the current one
+        """
+        keys = []
+        history = chess_board.copy()
+        for _ in range(min(history.halfmove_clock, len(history.move_stack))):
+            history.pop()
+            keys.append(zobrist_key(history))
+        keys.reverse()
+        keys.append(zobrist_key(chess_board))
+        return keys
+
+    def _check_limits(self):
+        """Abort the search if a limit has been hit"""
+        if self.deadline and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        if self.node_limit and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        if self.stop_event and self.stop_event.is_set():
+            raise SearchTimeout()
+
+    def _is_draw(self, chess_board):
+        """Check for draws by the fifty-move rule, repetition or material"""
+        if chess_board.halfmove_clock >= 100:
+            return True
+        # Any repetition inside the search is scored as a draw
+        key = self.position_keys[-1]
+        keys = self.position_keys[-chess_board.halfmove_clock - 1:-1]
+        if key in keys:
+            return True
+        return chess_board.is_insufficient_material()
+
+    def _negamax(self, chess_board, depth, alpha, beta, ply):
+        """
+        Search a position with principal variation alpha-beta
+
+        Args:
+            chess_board: python-chess Board to search
+            depth: Remaining depth in plies
+            alpha: Lower score bound
+            beta: Upper score bound
+            ply: Distance from the root in plies
+
+        Returns:
+            Score in centipawns from the side to move's point of view
+        """
+        self.nodes += 1
+        if not self.nodes & self.CHECK_INTERVAL:
+            self._check_limits()
+
+        self.pv_table[ply] = []
+        if ply > 0 and self._is_draw(chess_board):
+            return 0
+
+        if (ply > 0 and self.tablebase and
+                chess.popcount(chess_board.occupied) <= self.tablebase.max_pieces):
+            probe = self.tablebase.probe(chess_board)
+            if probe:
+                return self._tablebase_score(probe[0], probe[1], ply)
+
+        in_check = chess_board.is_check()
+        if in_check:
+            depth += 1
+        if depth <= 0 or ply >= self.MAX_PLY - 1:
+            return self._quiescence(chess_board, alpha, beta, ply)
+
+        key = self.position_keys[-1]
+        hash_move = None
+        entry = self.tt.probe(key)
+        if entry:
+            move_code, tt_score, tt_depth, bound = entry
+            hash_move = decode_move(move_code)
+
+            # Only null-window nodes take cutoffs, keeping the PV intact
+            if tt_depth >= depth and beta - alpha == 1:
+                tt_score = self._score_from_tt(tt_score, ply)
+                if bound == EXACT:
+                    return tt_score
+                if bound == LOWER_BOUND and tt_score >= beta:
+                    return tt_score
+                if bound == UPPER_BOUND and tt_score <= alpha:
+                    return tt_score
+
+        moves = list(chess_board.legal_moves)
+        if not moves:
+            return -self.MATE_SCORE + ply if in_check else 0
+
+        if hash_move not in moves:
+            hash_move = self.previous_pv[ply] if ply < len(self.previous_pv) else None
+        moves = self._order_moves(chess_board, moves, ply, hash_move)
+
+        original_alpha = alpha
+        best_score = -self.INFINITY
+        best_move = None
+        for index, move in enumerate(moves):
+            self.position_keys.append(zobrist_key_after(chess_board, key, move))
+            chess_board.push(move)
+            try:
+                if index == 0:
+                    score = -self._negamax(chess_board, depth - 1, -beta, -alpha, ply + 1)
+                else:
+                    # Null-window search, re-searched if it beats alpha
+                    score = -self._negamax(chess_board, depth - 1, -alpha - 1, -alpha, ply + 1)
+                    if alpha < score < beta:
+                        score = -self._negamax(chess_board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                self.position_keys.pop()
+                chess_board.pop()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv_table[ply] = [move] + self.pv_table[ply + 1]
+
+                    if alpha >= beta:
+                        if not chess_board.is_capture(move):
+                            self._store_killer(move, ply)
+                            self.history[move.from_square][move.to_square] += depth * depth
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, self._score_to_tt(best_score, ply), bound, encode_move(best_move))
+
+        return best_score
+
+    def _tablebase_score(self, outcome, plies, ply):
+        """
+        Convert a tablebase result to a search score
+
+        Args:
+            outcome: 1 if the side to move mates, -1 if it gets mated, 0 for a draw
+            plies: Plies to mate with best play
+            ply: Distance from the root in plies
+
+        Returns:
+            Score from the side to move's point of view
+        """
+        if outcome > 0:
+            return self.MATE_SCORE - ply - plies
+        if outcome < 0:
+            return -self.MATE_SCORE + ply + plies
+        return 0
+
+    def _score_to_tt(self, score, ply):
+        """Make mate scores relative to the stored position instead of the root"""
+        if score >= self.MATE_SCORE - self.MAX_PLY:
+            return score + ply
+        if score <= -self.MATE_SCORE + self.MAX_PLY:
+            return score - ply
+        return score
+
+    def _score_from_tt(self, score, ply):
+        """Make a stored mate score relative to the root again"""
+        if score >= self.MATE_SCORE - self.MAX_PLY:
+            return score - ply
+        if score <= -self.MATE_SCORE + self.MAX_PLY:
+            return score + ply
+        return score
+
+    def _quiescence(self, chess_board, alpha, beta, ply):
+        """
+        Search captures until the position is quiet
+
+        Args:
+            chess_board: python-chess Board to search
+            alpha: Lower score bound
+            beta: Upper score bound
+            ply: Distance from the root in plies
+
+        Returns:
+            Score in centipawns from the side to move's point of view
+        """
+        self.nodes += 1
+        if not self.nodes & self.CHECK_INTERVAL:
+            self._check_limits()
+
+        self.pv_table[ply] = []
+        in_check = chess_board.is_check()
+
+        if in_check:
+            # Standing pat is not an option, every evasion is searched
+            moves = list(chess_board.legal_moves)
+            if not moves:
+                return -self.MATE_SCORE + ply
+            best_score = -self.INFINITY
+        else:
+            best_score = self.evaluate(chess_board)
+            if best_score >= beta or ply >= self.MAX_PLY - 1:
+                return best_score
+            alpha = max(alpha, best_score)
+            moves = list(chess_board.generate_legal_captures())
+
+        for move in self._order_moves(chess_board, moves, ply, None):
+            chess_board.push(move)
+            try:
+                score = -self._quiescence(chess_board, -beta, -alpha, ply + 1)
+            finally:
+                chess_board.pop()
+
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        return best_score
+
+    def _order_moves(self, chess_board, moves, ply, pv_move):
+        """
+        Sort moves so that the most promising ones are searched first
+
+        The principal variation move comes first, then captures by
+        most valuable victim / least valuable attacker (MVV-LVA), then
+        promotions, killer moves and quiet moves by history score.
+
+        Args:
+            chess_board: python-chess Board the moves belong to
+            moves: List of legal python-chess Moves
+            ply: Distance from the root in plies
+            pv_move: Hash or principal variation move to try first, or None
+
+        Returns:
+            New list of the moves in search order
+        """
+        killers = self.killers[ply]
+        scored = []
+        for move in moves:
+            if move == pv_move:
+                score = 1 << 30
+            elif chess_board.is_capture(move):
+                victim = chess_board.piece_type_at(move.to_square) or chess.PAWN
+                attacker = chess_board.piece_type_at(move.from_square)
+                score = (1 << 28) + victim * 16 - attacker
+            elif move.promotion:
+                score = (1 << 27) + move.promotion
+            elif move == killers[0]:
+                score = (1 << 26) + 1
+            elif move == killers[1]:
+                score = 1 << 26
+            else:
+                score = self.history[move.from_square][move.to_square]
+            scored.append((score, move))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored]
+
+    def _store_killer(self, move, ply):
+        """Remember a quiet move that caused a cutoff at this ply"""
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+    def evaluate(self, chess_board):
+        """
+        Statically evaluate a position
+
+        Args:
+            chess_board: python-chess Board to evaluate
+
+        Returns:
+            Score in centipawns from the side to move's point of view
+        """
+        queens = chess_board.queens
+        minors = chess_board.knights | chess_board.bishops
+
+        # Kings head for the centre once the queens or most minors are gone
+        endgame = not queens or chess.popcount(minors | chess_board.rooks) <= 2
+
+        score = 0
+        for piece_type in chess.PIECE_TYPES:
+            value = self.PIECE_VALUES[piece_type]
+            table = self.piece_tables[piece_type]
+            if piece_type == chess.KING and endgame:
+                table = self.KING_ENDGAME_TABLE
+
+            mask = chess_board.pieces_mask(piece_type, chess.WHITE)
+            for square in chess.scan_forward(mask):
+                score += value + table[square ^ 56]
+
+            mask = chess_board.pieces_mask(piece_type, chess.BLACK)
+            for square in chess.scan_forward(mask):
+                score -= value + table[square]
+
+        return score if chess_board.turn == chess.WHITE else -score
\ No newline at end of file
@@ -0,0 +1,328 @@
+import argparse
+import mmap
+import os
+import struct
+import zlib
+import chess
+
+# File layout (little-endian): FILE_MAGIC, then the games back to back.
+# Every game is a RECORD_HEADER of CRC-32, ply count, tag text length and
+# result code, followed by the tag text (one tab-separated "name value"
+# line per PGN tag, UTF-8) and one 16-bit code per move. The CRC covers
+# everything after itself.
+FILE_MAGIC = b'CHESSGR1'
+RECORD_HEADER = struct.Struct('<IHHB')
+
+RESULTS = ("*", "1-0", "0-1", "1/2-1/2")
+
+# Move codes: to-square in bits 0-5, from-square in bits 6-11 and the
+# promotion piece type in bits 12-14 (0 when there is none)
+SQUARE_MASK = 0x3F
+FROM_SHIFT = 6
+PROMOTION_SHIFT = 12
+
+
+class GameRecordError(ValueError):
+    """Raised for truncated or corrupted game records"""
+
+
+def encode_move(move):
+    """
+    Pack a move into 16 bits
+
+    Args:
+        move: python-chess Move object
+
+    Returns:
+        Move code as an int
+    """
+    return move.to_square | move.from_square << FROM_SHIFT | (move.promotion or 0) << PROMOTION_SHIFT
+
+
+def decode_move(code):
+    """
+    Unpack a 16-bit move code
+
+    Args:
+        code: Move code from encode_move
+
+    Returns:
+        python-chess Move object
+    """
+    promotion = code >> PROMOTION_SHIFT
+    return chess.Move(code >> FROM_SHIFT & SQUARE_MASK, code & SQUARE_MASK, promotion or None)
+
+
+class GameRecord:
+    """
+    A game as PGN tags, a start position and a list of moves
+
+    The start position is kept in the "FEN" tag as in PGN, so a record
+    without it starts from the standard position.
+    """
+
+    def __init__(self, headers=None, moves=(), result="*"):
+        """
+        Initialize the record
+
+        Args:
+            headers: Dictionary of PGN tags (default: none)
+            moves: python-chess Move objects from the start position
+            result: PGN result string, one of RESULTS
+        """
+        self.headers = dict(headers or {})
+        self.moves = list(moves)
+        self.result = result if result in RESULTS else "*"
+
+    @classmethod
+    def from_board(cls, chess_board, headers=None):
+        """
+        Record the game played on a board
+
+        Args:
+            chess_board: python-chess Board with the moves played
+            headers: Dictionary of PGN tags (default: none)
+
+        Returns:
+            GameRecord whose result is set if the game is over
+        """
+        headers = dict(headers or {})
+        root = chess_board.root()
+        if root.fen() != chess.STARTING_FEN:
+            headers["SetUp"] = "1"
+            headers["FEN"] = root.fen()
+        return cls(headers, chess_board.move_stack, chess_board.result())
+
+    @classmethod
+    def from_pgn_game(cls, game):
+        """
+        Record a parsed PGN game (main line only)
+
+        Args:
+            game: python-chess Game object
+
+        Returns:
+            GameRecord
+        """
+        return cls(game.headers, game.mainline_moves(), game.headers.get("Result", "*"))
+
+    def get_start_board(self):
+        """Get a python-chess Board set up at the start position"""
+        fen = self.headers.get("FEN")
+        return chess.Board(fen) if fen else chess.Board()
+
+    def get_board(self):
+        """
+        Get a python-chess Board with all moves played
+
+        Raises:
+            GameRecordError: If a move is illegal
+        """
+        board = self.get_start_board()
+        for move in self.moves:
+            if not board.is_legal(move):
+                raise GameRecordError(f"Illegal move {move.uci()} in position {board.fen()}")
+            board.push(move)
+        return board
+
+    def to_pgn_game(self):
+        """
+        Convert to a python-chess Game
+
+        Returns:
+            python-chess Game object
+        """
+        # chess.pgn pulls in asyncio, so it is only imported where PGN is
+        # handled; the autosave log and record reading never need it
+        import chess.pgn
+        game = chess.pgn.Game.from_board(self.get_board())
+        for name, value in self.headers.items():
+            game.headers[name] = value
+        game.headers["Result"] = self.result
+        return game
+
+    def encode(self):
+        """
+        Serialize the record
+
+        Returns:
+            Record bytes including its header
+        """
+        tags = "".join(
+            f"{name}\t{value}\n".replace("\r", " ")
+            for name, value in self.headers.items() if name != "Result"
+        ).encode('utf-8')
+        if len(tags) > 0xFFFF or len(self.moves) > 0xFFFF:
+            raise GameRecordError("Game too long for a record")
+        moves = struct.pack(f'<{len(self.moves)}H', *map(encode_move, self.moves))
+        body = struct.pack('<HHB', len(self.moves), len(tags), RESULTS.index(self.result)) + tags + moves
+        return struct.pack('<I', zlib.crc32(body)) + body
+
+    @classmethod
+    def decode(cls, buffer, offset=0):
+        """
+        Deserialize a record
+
+        Args:
+            buffer: Bytes-like object holding the record
+            offset: Offset of the record in the buffer
+
+        Returns:
+            Tuple (GameRecord, offset just past the record)
+
+        Raises:
+            GameRecordError: If the record is truncated or its CRC does
+                not match
+        """
+        if offset + RECORD_HEADER.size > len(buffer):
+            raise GameRecordError(f"Truncated record header at offset {offset}")
+        crc, ply_count, tags_length, result = RECORD_HEADER.unpack_from(buffer, offset)
+        end = offset + RECORD_HEADER.size + tags_length + 2 * ply_count
+        if end > len(buffer):
+            raise GameRecordError(f"Truncated record at offset {offset}")
+        if zlib.crc32(buffer[offset + 4:end]) != crc or result >= len(RESULTS):
+            raise GameRecordError(f"Corrupted record at offset {offset}")
+
+        tags_start = offset + RECORD_HEADER.size
+        headers = {}
+        for line in bytes(buffer[tags_start:tags_start + tags_length]).decode('utf-8').splitlines():
+            name, _, value = line.partition("\t")
+            headers[name] = value
+        codes = struct.unpack_from(f'<{ply_count}H', buffer, tags_start + tags_length)
+        return cls(headers, map(decode_move, codes), RESULTS[result]), end
+
+
+def write_records(path, records, append=False):
+    """
+    Write game records to a file
+
+    Args:
+        path: Path of the record file
+        records: Iterable of GameRecord objects
+        append: Add to an existing file instead of replacing it
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    with open(path, 'ab' if append else 'wb') as record_file:
+        if record_file.tell() == 0:
+            record_file.write(FILE_MAGIC)
+        for record in records:
+            record_file.write(record.encode())
+            count += 1
+    return count
+
+
+def read_records(path):
+    """
+    Read all game records of a file
+
+    The file is memory-mapped and decoded record by record, so huge
+    archives are never loaded into memory at once.
+
+    Args:
+        path: Path of the record file
+
+    Yields:
+        GameRecord objects in file order
+
+    Raises:
+        GameRecordError: If the file is not a record file or a record is
+            damaged
+    """
+    with open(path, 'rb') as record_file:
+        if os.fstat(record_file.fileno()).st_size < len(FILE_MAGIC):
+            raise GameRecordError(f"{path} is not a game record file")
+        with mmap.mmap(record_file.fileno(), 0, access=mmap.ACCESS_READ) as record_map:
+            if record_map[:len(FILE_MAGIC)] != FILE_MAGIC:
+                raise GameRecordError(f"{path} is not a game record file")
+            offset = len(FILE_MAGIC)
+            while offset < len(record_map):
+                record, offset = GameRecord.decode(record_map, offset)
+                yield record
+
+
+def read_games(path):
+    """
+    Read the games of a PGN file or a model.game_record file
+
+    Args:
+        path: Path of the file; ".pgn" files are parsed as PGN
+
+    Yields:
+        GameRecord objects
+    """
+    if not path.lower().endswith(".pgn"):
+        yield from read_records(path)
+        return
+    import chess.pgn
+    with open(path, encoding='utf-8', errors='replace') as pgn_file:
+        while True:
+            game = chess.pgn.read_game(pgn_file)
+            if game is None:
+                break
+            yield GameRecord.from_pgn_game(game)
+
+
+def pgn_to_records(pgn_path, record_path):
+    """
+    Convert every game of a PGN file to a record file
+
+    Args:
+        pgn_path: Path of the PGN file
+        record_path: Path of the record file to write
+
+    Returns:
+        Number of games converted
+    """
+    import chess.pgn
+
+    def parse_games():
+        with open(pgn_path, encoding='utf-8', errors='replace') as pgn_file:
+            while True:
+                game = chess.pgn.read_game(pgn_file)
+                if game is None:
+                    break
+                yield GameRecord.from_pgn_game(game)
+
+    return write_records(record_path, parse_games())
+
+
+def records_to_pgn(record_path, pgn_path):
+    """
+    Convert every game of a record file to PGN
+
+    Args:
+        record_path: Path of the record file
+        pgn_path: Path of the PGN file to write
+
+    Returns:
+        Number of games converted
+    """
+    import chess.pgn
+    count = 0
+    with open(pgn_path, 'w', encoding='utf-8') as pgn_file:
+        exporter = chess.pgn.FileExporter(pgn_file)
+        for record in read_records(record_path):
+            record.to_pgn_game().accept(exporter)
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert games between PGN and the binary record format")
+    parser.add_argument("direction", choices=["to-records", "to-pgn"])
+    parser.add_argument("source", help="file to read")
+    parser.add_argument("target", help="file to write")
+    args = parser.parse_args()
+
+    if args.direction == "to-records":
+        count = pgn_to_records(args.source, args.target)
+    else:
+        count = records_to_pgn(args.source, args.target)
+    print(f"Converted {count} games: {os.path.getsize(args.source)} -> {os.path.getsize(args.target)} bytes")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
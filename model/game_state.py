@@ -5,6 +5,7 @@ class GameState:
         """Initialize a new game state"""
         self.active_player_clicks = []
         self.selected_square = None
+        self.drag_square = None
         self.game_over = False
         self.result_message = ""
         
@@ -12,6 +13,7 @@ class GameState:
         """Reset the game state"""
         self.active_player_clicks = []
         self.selected_square = None
+        self.drag_square = None
         self.game_over = False
         self.result_message = ""
     
@@ -55,6 +57,30 @@ class GameState:
         
         return selection_complete, start_pos, end_pos
     
+    def start_drag(self, row, col):
+        """
+        Pick up the piece on the selected square
+        
+        The selection stays, so dropping the piece back on its square
+        leaves the two-click flow where it was.
+        
+        Args:
+            row: Board row (0-7)
+            col: Board column (0-7)
+        """
+        self.drag_square = (row, col)
+    
+    def end_drag(self):
+        """
+        Let go of the dragged piece
+        
+        Returns:
+            Square (row, col) the piece was dragged from, or None
+        """
+        square = self.drag_square
+        self.drag_square = None
+        return square
+    
     def set_game_over(self, is_over, message=""):
         """
         Set game over state with optional message
@@ -0,0 +1,171 @@
+import mmap
+import os
+import random
+import struct
+import chess
+import chess.polyglot
+
+class OpeningBook:
+    """
+    Polyglot opening book read straight from a memory-mapped file
+
+    A Polyglot book is a sequence of 16-byte big-endian entries (key,
+    move, weight, learn) sorted by the Polyglot Zobrist key of the
+    position. Lookups binary-search the mapped file, so opening a book is
+    instant whatever its size, only the pages touched by a lookup are ever
+    read, and no Python object is created for entries that are not asked
+    for. Processes mapping the same book share its pages.
+    """
+
+    ENTRY = struct.Struct('>QHHI')
+    KEY = struct.Struct('>Q')
+
+    def __init__(self, path):
+        """
+        Open a book
+
+        Args:
+            path: Path of the Polyglot .bin file
+        """
+        self.path = path
+        self.book_file = open(path, 'rb')
+        size = os.fstat(self.book_file.fileno()).st_size
+        if size % self.ENTRY.size:
+            self.book_file.close()
+            raise ValueError(f"{path} is not a Polyglot book (size {size} is not a multiple of 16)")
+
+        self.entry_count = size // self.ENTRY.size
+        self.book_map = None
+        if size:
+            self.book_map = mmap.mmap(self.book_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """Release the memory map and file"""
+        if self.book_map is not None:
+            self.book_map.close()
+            self.book_map = None
+        if self.book_file is not None:
+            self.book_file.close()
+            self.book_file = None
+
+    def __len__(self):
+        """Get the number of entries"""
+        return self.entry_count
+
+    def _find_first(self, key):
+        """
+        Find the first entry whose key is not less than a key
+
+        Args:
+            key: 64-bit Polyglot key
+
+        Returns:
+            Entry index (entry_count if every key is smaller)
+        """
+        unpack_key = self.KEY.unpack_from
+        book_map = self.book_map
+        low, high = 0, self.entry_count
+        while low < high:
+            middle = (low + high) // 2
+            if unpack_key(book_map, middle * 16)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get_moves(self, board):
+        """
+        Get the book moves of a position
+
+        Args:
+            board: Board instance
+
+        Returns:
+            List of tuples (python-chess Move, weight) for the legal book
+            moves, in book order
+        """
+        if not self.entry_count:
+            return []
+
+        chess_board = board.chess_board
+        key = chess.polyglot.zobrist_hash(chess_board)
+        moves = []
+        index = self._find_first(key)
+        while index < self.entry_count:
+            entry_key, raw_move, weight, _ = self.ENTRY.unpack_from(self.book_map, index * 16)
+            if entry_key != key:
+                break
+            move = self._decode_move(chess_board, raw_move)
+            if move is not None and weight:
+                moves.append((move, weight))
+            index += 1
+        return moves
+
+    @staticmethod
+    def _decode_move(chess_board, raw_move):
+        """
+        Convert a Polyglot move to a legal python-chess move
+
+        Polyglot stores castling as the king capturing its own rook.
+
+        Args:
+            chess_board: python-chess Board of the position
+            raw_move: 16-bit Polyglot move
+
+        Returns:
+            python-chess Move, or None if it is not legal in the position
+        """
+        to_square = raw_move & 63
+        from_square = (raw_move >> 6) & 63
+        promotion = (raw_move >> 12) & 7
+        move = chess.Move(from_square, to_square, promotion + 1 if promotion else None)
+
+        if (not chess_board.chess960 and
+                chess_board.piece_type_at(from_square) == chess.KING and
+                chess_board.color_at(to_square) == chess_board.turn):
+            # King takes own rook: move the king two squares instead
+            step = 2 if to_square > from_square else -2
+            move = chess.Move(from_square, from_square + step)
+
+        return move if chess_board.is_legal(move) else None
+
+    def choose_move(self, board, rng=random):
+        """
+        Pick a book move at random, in proportion to the book weights
+
+        Args:
+            board: Board instance
+            rng: Random number generator (default: the random module)
+
+        Returns:
+            python-chess Move, or None if the position is not in the book
+        """
+        moves = self.get_moves(board)
+        if not moves:
+            return None
+        total = sum(weight for _, weight in moves)
+        pick = rng.randrange(total)
+        for move, weight in moves:
+            pick -= weight
+            if pick < 0:
+                return move
+        return moves[-1][0]
+
+    def get_book_destinations(self, board, row, col):
+        """
+        Get the destination squares of the book moves of one piece
+
+        Args:
+            board: Board instance
+            row: Board row (0-7) of the piece
+            col: Board column (0-7) of the piece
+
+        Returns:
+            List of tuples (row, col)
+        """
+        from_square = chess.square(col, 7 - row)
+        return [
+            (7 - chess.square_rank(move.to_square), chess.square_file(move.to_square))
+            for move, _ in self.get_moves(board)
+            if move.from_square == from_square
+        ]
\ No newline at end of file
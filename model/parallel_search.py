@@ -0,0 +1,272 @@
+import multiprocessing
+import os
+import time
+import traceback
+from collections import Counter
+from multiprocessing import connection, shared_memory
+import chess
+from model.board import Board
+from model.engine import Engine, SearchResult
+from model.tablebase import Tablebase
+from model.transposition import TranspositionTable
+
+
+def _worker_main(index, pipe, table_name, stop_event, tablebase_directory):
+    """
+    Serve search jobs in a worker process
+
+    Args:
+        index: Worker number, 0 for the main worker
+        pipe: Connection to the parent process
+        table_name: Name of the shared memory block of the hash table
+        stop_event: multiprocessing.Event that aborts the running search
+        tablebase_directory: Directory of endgame tables, or None
+    """
+    table_memory = shared_memory.SharedMemory(name=table_name)
+    tablebase = Tablebase(tablebase_directory) if tablebase_directory else None
+    engine = Engine(
+        transposition_table=TranspositionTable(buffer=table_memory.buf),
+        tablebase=tablebase
+    )
+
+    def send_info(result):
+        pipe.send(("info", index, result))
+
+    try:
+        while True:
+            job = pipe.recv()
+            if job is None:
+                break
+            fen, moves, time_limit, max_depth, node_limit, generation = job
+
+            board = Board()
+            board.chess_board = chess.Board(fen)
+            for move in moves:
+                board.chess_board.push_uci(move)
+            # Engine.search advances the generation; every worker must end
+            # up on the same one so none of them ages the others' entries
+            engine.tt.generation = (generation - 1) & 0xFF
+
+            try:
+                result = engine.search(
+                    board, time_limit, max_depth, stop_event,
+                    info_callback=send_info if index == 0 else None,
+                    node_limit=node_limit,
+                    # Half the helpers run one iteration ahead so that the
+                    # workers spread over two depths
+                    start_depth=1 + index % 2
+                )
+                pipe.send(("result", index, result))
+            except Exception:
+                pipe.send(("error", index, traceback.format_exc()))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        engine.tt = None
+        if tablebase:
+            tablebase.close()
+        table_memory.close()
+
+
+class ParallelSearch:
+    """
+    Lazy SMP search over several worker processes
+
+    Every worker runs the ordinary alpha-beta Engine on the same position.
+    They share one transposition table placed in shared memory, so each
+    worker profits from the positions the others have already searched
+    and they quickly diverge into different parts of the tree. Half of the
+    helpers start one iteration deeper, which spreads them further apart.
+    The table stores each entry xor-ed with its key, so entries torn by
+    concurrent writes are simply not found.
+
+    The result is merged from the workers: among the results of the
+    deepest completed iteration the best move is chosen by votes weighted
+    by score, its principal variation is taken from the worker that found
+    it, and the node counts are summed.
+
+    The object offers the same search() as Engine, so it can replace the
+    engine of a computer player.
+    """
+
+    JOIN_TIMEOUT = 2.0
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, workers=None, hash_size_mb=64, tablebase_directory=None):
+        """
+        Start the worker processes
+
+        Args:
+            workers: Number of worker processes (default: one per CPU)
+            hash_size_mb: Size of the shared transposition table in megabytes
+            tablebase_directory: Directory of endgame tables for the
+                workers to open, or None
+        """
+        self.workers = workers or os.cpu_count() or 1
+        bucket_count = TranspositionTable.get_bucket_count(hash_size_mb)
+        # New shared memory is zero-filled, i.e. an empty table
+        self.table_memory = shared_memory.SharedMemory(
+            create=True, size=bucket_count * TranspositionTable.BUCKET_BYTES
+        )
+        self.tt = TranspositionTable(buffer=self.table_memory.buf)
+        self.stop_event = multiprocessing.Event()
+        self.generation = 0
+        self.worker_results = []
+
+        self.pipes = []
+        self.processes = []
+        for index in range(self.workers):
+            parent_pipe, child_pipe = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(index, child_pipe, self.table_memory.name, self.stop_event, tablebase_directory),
+                daemon=True
+            )
+            process.start()
+            child_pipe.close()
+            self.pipes.append(parent_pipe)
+            self.processes.append(process)
+
+    def search(self, board, time_limit=None, max_depth=None, stop_event=None,
+               info_callback=None, node_limit=None):
+        """
+        Search a position on every worker
+
+        Args:
+            board: Board instance to search (it is not modified)
+            time_limit: Time budget in seconds, or None for no limit
+            max_depth: Maximum depth in plies, or None for no limit
+            stop_event: threading.Event that aborts the search when set
+            info_callback: Function called with the SearchResult of every
+                iteration completed by the main worker
+            node_limit: Maximum number of nodes per worker, or None
+
+        Returns:
+            Merged SearchResult
+        """
+        chess_board = board.chess_board
+        root = chess_board.root()
+        moves = [move.uci() for move in chess_board.move_stack]
+        self.generation = (self.generation + 1) & 0xFF
+        self.tt.generation = self.generation
+        self.stop_event.clear()
+        start_time = time.perf_counter()
+
+        job = (root.fen(), moves, time_limit, max_depth, node_limit, self.generation)
+        for index, pipe in enumerate(self.pipes):
+            try:
+                pipe.send(job)
+            except OSError as error:
+                # A worker lost in an earlier search
+                self._drain(self.pipes[:index])
+                raise RuntimeError(f"Search worker {index} died: {error!r}") from error
+
+        results = [None] * self.workers
+        pending = set(self.pipes)
+        while pending:
+            for pipe in connection.wait(list(pending), self.POLL_INTERVAL):
+                try:
+                    kind, index, payload = pipe.recv()
+                except (EOFError, OSError) as error:
+                    # The worker died, e.g. killed for lack of memory
+                    pending.discard(pipe)
+                    self._drain(pending)
+                    index = self.pipes.index(pipe)
+                    raise RuntimeError(f"Search worker {index} died: {error!r}") from error
+                if kind == "info":
+                    if info_callback:
+                        info_callback(payload)
+                    continue
+                if kind == "error":
+                    pending.discard(pipe)
+                    self._drain(pending)
+                    raise RuntimeError(f"Search worker {index} failed:\n{payload}")
+                results[index] = payload
+                pending.discard(pipe)
+                if index == 0:
+                    # The main worker decides when the search is over
+                    self.stop_event.set()
+
+            if stop_event and stop_event.is_set():
+                self.stop_event.set()
+
+        self.worker_results = results
+        result = self._merge(results)
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+    def _drain(self, pipes):
+        """
+        Stop the search and wait for the workers still running
+
+        Their last messages are read and dropped, so none is left in a
+        pipe for the next search to mistake for its own.
+
+        Args:
+            pipes: Connections of the workers that have not answered yet
+        """
+        self.stop_event.set()
+        pending = set(pipes)
+        while pending:
+            for pipe in connection.wait(list(pending), self.POLL_INTERVAL):
+                try:
+                    kind, _, _ = pipe.recv()
+                except (EOFError, OSError):
+                    # The worker is gone; nothing more will come
+                    kind = "closed"
+                if kind != "info":
+                    pending.discard(pipe)
+
+    def _merge(self, results):
+        """
+        Merge the worker results
+
+        Args:
+            results: SearchResult of every worker
+
+        Returns:
+            SearchResult of the chosen move with the nodes of all workers
+        """
+        nodes = sum(result.nodes for result in results)
+        depth = max(result.depth for result in results)
+        deepest = [result for result in results if result.depth == depth and result.best_move]
+        if not deepest:
+            main = results[0]
+            return SearchResult(main.best_move, main.score, main.depth, main.pv, nodes, main.elapsed)
+
+        # Votes weighted by how much better than the worst candidate
+        # each worker found its move
+        lowest = min(result.score for result in deepest)
+        votes = Counter()
+        for result in deepest:
+            votes[result.best_move] += result.score - lowest + 1
+        best_move = max(votes, key=lambda move: (votes[move], move == deepest[0].best_move))
+        chosen = max(
+            (result for result in deepest if result.best_move == best_move),
+            key=lambda result: len(result.pv)
+        )
+        return SearchResult(chosen.best_move, chosen.score, depth, chosen.pv, nodes, chosen.elapsed)
+
+    def close(self):
+        """Stop the workers and release the shared table"""
+        self.stop_event.set()
+        for pipe in self.pipes:
+            try:
+                pipe.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(self.JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        for pipe in self.pipes:
+            pipe.close()
+        self.pipes = []
+        self.processes = []
+
+        if self.table_memory is not None:
+            # Views into the buffer must go before the memory can close
+            self.tt = None
+            self.table_memory.close()
+            self.table_memory.unlink()
+            self.table_memory = None
\ No newline at end of file
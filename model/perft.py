@@ -0,0 +1,107 @@
+import time
+
+# Standard perft test positions with known leaf node counts per depth
+PERFT_POSITIONS = [
+    (
+        "startpos",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        [20, 400, 8902, 197281, 4865609]
+    ),
+    (
+        "kiwipete",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        [48, 2039, 97862, 4085603]
+    ),
+    (
+        "endgame",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        [14, 191, 2812, 43238, 674624]
+    ),
+    (
+        "promotions",
+        "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+        [6, 264, 9467, 422333]
+    ),
+    (
+        "castling",
+        "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+        [44, 1486, 62379, 2103487]
+    )
+]
+
+
+def perft(board, depth):
+    """
+    Count the leaf nodes of the legal move tree
+
+    Moves are generated with Board.get_legal_moves and played with
+    Board.push and Board.undo_move, so the count exercises the same move
+    path as the game. With the "bitboard" backend the count runs on the
+    board's BitboardPosition with move ints and make/unmake instead.
+
+    Args:
+        board: Board instance (restored to its position on return)
+        depth: Depth in plies
+
+    Returns:
+        Number of leaf nodes
+    """
+    if board.backend == "bitboard":
+        return board.get_position().perft(depth)
+    if depth <= 0:
+        return 1
+
+    moves = board.get_legal_moves()
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.undo_move()
+    return nodes
+
+
+def divide(board, depth):
+    """
+    Count leaf nodes below every root move
+
+    Args:
+        board: Board instance (restored to its position on return)
+        depth: Depth in plies, at least 1
+
+    Returns:
+        Dictionary mapping UCI move strings to leaf node counts
+    """
+    counts = {}
+    if board.backend == "bitboard":
+        from model.bitboard import move_to_uci
+        position = board.get_position()
+        for move in position.generate_legal_moves():
+            position.make_move(move)
+            counts[move_to_uci(move)] = position.perft(depth - 1)
+            position.unmake_move()
+        return counts
+
+    for move in board.get_legal_moves():
+        board.push(move)
+        counts[move.uci()] = perft(board, depth - 1)
+        board.undo_move()
+    return counts
+
+
+def run_perft(board, depth):
+    """
+    Time a perft run
+
+    Args:
+        board: Board instance to count from
+        depth: Depth in plies
+
+    Returns:
+        Tuple (nodes, seconds)
+    """
+    start_time = time.perf_counter()
+    nodes = perft(board, depth)
+    return nodes, time.perf_counter() - start_time
\ No newline at end of file
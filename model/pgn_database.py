@@ -0,0 +1,204 @@
+import io
+import mmap
+import os
+import re
+import struct
+from array import array
+import chess.pgn
+
+class PgnDatabase:
+    """
+    Random access to the games of a large PGN file
+
+    The file is scanned once to build an on-disk index next to it holding
+    the byte offset and the main header fields of every game. Both files
+    are then memory-mapped, so opening a database and jumping to any game
+    costs the same no matter how many games it holds; only the game being
+    viewed is ever parsed.
+
+    Index layout (little-endian): a header of magic, PGN size, PGN
+    modification time and game count, then game count + 1 game offsets,
+    game count + 1 offsets into the header text, and the header text
+    itself with one tab-separated line of HEADER_FIELDS per game.
+    """
+
+    INDEX_MAGIC = b'PGNIDX02'
+    INDEX_HEADER = struct.Struct('<8sQQQ')
+    HEADER_FIELDS = ("Event", "Date", "White", "Black", "Result")
+
+    # An Event tag at the start of a line, blank line before it or not
+    GAME_START = re.compile(rb'^(?=\[Event\s+")', re.MULTILINE)
+    TAG_PAIR = re.compile(rb'^\[(\w+)\s+"((?:[^"\\]|\\.)*)"\][ \t\r]*$', re.MULTILINE)
+    TAG_SECTION_END = re.compile(rb'\n[ \t\r]*(?:\n|[^\[\s])')
+
+    def __init__(self, path, index_path=None):
+        """
+        Open a PGN file, building its index if missing or out of date
+
+        Args:
+            path: Path of the PGN file
+            index_path: Path of the index file (default: path + ".idx")
+        """
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        self.pgn_file = None
+        self.pgn_map = None
+        self.index_file = None
+        self.index_map = None
+
+        if not self._is_index_current():
+            self.build_index()
+        self._open()
+
+    def _get_file_signature(self):
+        """Get the size and modification time identifying the PGN file"""
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _is_index_current(self):
+        """Check if the index exists and matches the PGN file"""
+        try:
+            with open(self.index_path, 'rb') as index_file:
+                header = index_file.read(self.INDEX_HEADER.size)
+        except OSError:
+            return False
+
+        if len(header) != self.INDEX_HEADER.size:
+            return False
+        magic, size, mtime, _ = self.INDEX_HEADER.unpack(header)
+        return magic == self.INDEX_MAGIC and (size, mtime) == self._get_file_signature()
+
+    def build_index(self):
+        """Scan the PGN file once and write its offset index"""
+        size, mtime = self._get_file_signature()
+        game_offsets = array('Q')
+        header_offsets = array('Q')
+        header_text = bytearray()
+
+        with open(self.path, 'rb') as pgn_file:
+            pgn_map = _map_file(pgn_file)
+            try:
+                for match in self.GAME_START.finditer(pgn_map):
+                    start = match.end()
+                    game_offsets.append(start)
+                    header_offsets.append(len(header_text))
+                    header_text += self._read_header_line(pgn_map, start)
+                if not game_offsets and size:
+                    # Without any Event tag the whole file is a single game
+                    game_offsets.append(0)
+                    header_offsets.append(0)
+                    header_text += self._read_header_line(pgn_map, 0)
+            finally:
+                pgn_map.close()
+
+        game_offsets.append(size)
+        header_offsets.append(len(header_text))
+
+        # Write to a temporary file so a crash never leaves a partial index
+        temporary_path = self.index_path + ".tmp"
+        with open(temporary_path, 'wb') as index_file:
+            index_file.write(self.INDEX_HEADER.pack(self.INDEX_MAGIC, size, mtime, len(game_offsets) - 1))
+            game_offsets.tofile(index_file)
+            header_offsets.tofile(index_file)
+            index_file.write(header_text)
+        os.replace(temporary_path, self.index_path)
+
+    def _read_header_line(self, pgn_map, start):
+        """
+        Extract the indexed header fields of the game starting at an offset
+
+        Args:
+            pgn_map: Memory-mapped PGN file
+            start: Offset of the game's Event tag
+
+        Returns:
+            Tab-separated header fields terminated by a newline, as bytes
+        """
+        match = self.TAG_SECTION_END.search(pgn_map, start)
+        end = match.start() if match else len(pgn_map)
+
+        tags = {}
+        for name, value in self.TAG_PAIR.findall(pgn_map[start:end]):
+            tags.setdefault(name.decode('ascii'), value)
+
+        fields = [
+            tags.get(field, b'').replace(b'\t', b' ')
+            for field in self.HEADER_FIELDS
+        ]
+        return b'\t'.join(fields) + b'\n'
+
+    def _open(self):
+        """Memory-map the PGN file and its index"""
+        self.pgn_file = open(self.path, 'rb')
+        self.pgn_map = _map_file(self.pgn_file)
+        self.index_file = open(self.index_path, 'rb')
+        self.index_map = _map_file(self.index_file)
+
+        _, _, _, self.game_count = self.INDEX_HEADER.unpack_from(self.index_map)
+        self.game_offsets_start = self.INDEX_HEADER.size
+        self.header_offsets_start = self.game_offsets_start + 8 * (self.game_count + 1)
+        self.header_text_start = self.header_offsets_start + 8 * (self.game_count + 1)
+
+    def close(self):
+        """Release the memory maps and files"""
+        for resource in (self.pgn_map, self.pgn_file, self.index_map, self.index_file):
+            if resource is not None:
+                resource.close()
+        self.pgn_map = self.pgn_file = self.index_map = self.index_file = None
+
+    def __len__(self):
+        """Get the number of games"""
+        return self.game_count
+
+    def _get_range(self, table_start, number):
+        """Read entries number and number + 1 of an offset table"""
+        if not 0 <= number < self.game_count:
+            raise IndexError(f"Game {number} out of range")
+        return struct.unpack_from('<QQ', self.index_map, table_start + 8 * number)
+
+    def get_headers(self, number):
+        """
+        Get the indexed header fields of a game without parsing it
+
+        Args:
+            number: Game number, starting at 0
+
+        Returns:
+            Dictionary mapping HEADER_FIELDS names to values
+        """
+        start, end = self._get_range(self.header_offsets_start, number)
+        line = self.index_map[self.header_text_start + start:self.header_text_start + end]
+        values = line.rstrip(b'\n').decode('utf-8', 'replace').split('\t')
+        return dict(zip(self.HEADER_FIELDS, values))
+
+    def get_game_text(self, number):
+        """
+        Get the raw PGN text of a game
+
+        Args:
+            number: Game number, starting at 0
+
+        Returns:
+            PGN text of the game
+        """
+        start, end = self._get_range(self.game_offsets_start, number)
+        return self.pgn_map[start:end].decode('utf-8', 'replace')
+
+    def load_game(self, number):
+        """
+        Parse a single game
+
+        Args:
+            number: Game number, starting at 0
+
+        Returns:
+            python-chess Game object, or None if the text holds no game
+        """
+        return chess.pgn.read_game(io.StringIO(self.get_game_text(number)))
+
+
+def _map_file(file):
+    """Memory-map a whole file read-only (empty files cannot be mapped)"""
+    if os.fstat(file.fileno()).st_size == 0:
+        return mmap.mmap(-1, 1)
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
\ No newline at end of file
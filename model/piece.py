@@ -1,7 +1,24 @@
 import chess
 
 class Piece:
-    """Represents a chess piece and its properties"""
+    """
+    Represents a chess piece and its properties
+    
+    Pieces are immutable flyweights: a single shared instance exists for
+    every color and type, available through Piece.from_code and
+    Piece.from_chess_piece.
+    """
+    
+    __slots__ = ('chess_piece', 'color', 'piece_type', 'symbol', 'code')
+    
+    TYPE_CHARS = {
+        chess.PAWN: 'p',
+        chess.ROOK: 'R',
+        chess.KNIGHT: 'N',
+        chess.BISHOP: 'B',
+        chess.QUEEN: 'Q',
+        chess.KING: 'K'
+    }
     
     def __init__(self, chess_piece):
         """
@@ -11,28 +28,63 @@ class Piece:
             chess_piece: A python-chess Piece object
         """
         self.chess_piece = chess_piece
-        
-    @property
-    def color(self):
-        """Get the color of the piece (True for white, False for black)"""
-        return self.chess_piece.color
-    
-    @property
-    def piece_type(self):
-        """Get the type of the piece (PAWN, KNIGHT, etc.)"""
-        return self.chess_piece.piece_type
-    
-    @property
-    def symbol(self):
-        """Get the symbol for this piece for image loading"""
+        # Color of the piece (True for white, False for black)
+        self.color = chess_piece.color
+        # Type of the piece (PAWN, KNIGHT, etc.)
+        self.piece_type = chess_piece.piece_type
+        # Symbol for this piece for image loading
         color_char = 'w' if self.color == chess.WHITE else 'b'
-        type_char = {
-            chess.PAWN: 'p',
-            chess.ROOK: 'R',
-            chess.KNIGHT: 'N',
-            chess.BISHOP: 'B',
-            chess.QUEEN: 'Q',
-            chess.KING: 'K'
-        }[self.piece_type]
+        self.symbol = color_char + self.TYPE_CHARS[self.piece_type]
+        # Compact code used in board snapshots
+        self.code = piece_code(self.color, self.piece_type)
+    
+    @staticmethod
+    def from_code(code):
+        """
+        Get the shared piece for a snapshot code
+        
+        Args:
+            code: Piece code (0 for an empty square)
+            
+        Returns:
+            Piece object or None for an empty square
+        """
+        return PIECES[code]
+    
+    @staticmethod
+    def from_chess_piece(chess_piece):
+        """
+        Get the shared piece for a python-chess piece
         
-        return color_char + type_char
\ No newline at end of file
+        Args:
+            chess_piece: A python-chess Piece object
+            
+        Returns:
+            Piece object
+        """
+        return PIECES[piece_code(chess_piece.color, chess_piece.piece_type)]
+
+
+def piece_code(color, piece_type):
+    """
+    Get the compact code of a piece
+    
+    Codes 1-6 are white pawn to king and 7-12 black pawn to king,
+    leaving 0 for an empty square.
+    
+    Args:
+        color: Piece color (True for white, False for black)
+        piece_type: python-chess piece type (PAWN, KNIGHT, etc.)
+        
+    Returns:
+        Integer piece code
+    """
+    return piece_type if color == chess.WHITE else piece_type + 6
+
+
+# Shared piece instances indexed by piece code
+PIECES = (None,) + tuple(
+    Piece(chess.Piece(piece_type, color))
+    for color in (chess.WHITE, chess.BLACK)
+    for piece_type in chess.PIECE_TYPES
+)
\ No newline at end of file
@@ -0,0 +1,172 @@
+import random
+import chess
+from model.batch_evaluator import BatchEvaluator
+from model.engine import Engine
+from model.opening_book import OpeningBook
+
+class MovePolicy:
+    """Base class for anything that picks moves for one side of a game"""
+
+    name = "policy"
+
+    def choose_move(self, board):
+        """
+        Choose a move in the current position
+
+        Args:
+            board: Board instance positioned at the side to move
+
+        Returns:
+            python-chess Move object, or None to stop playing
+        """
+        raise NotImplementedError
+
+
+class RandomPolicy(MovePolicy):
+    """Plays a uniformly random legal move"""
+
+    name = "random"
+
+    def __init__(self, seed=None):
+        """
+        Initialize the policy
+
+        Args:
+            seed: Seed for the random number generator (default: unseeded)
+        """
+        self.rng = random.Random(seed)
+
+    def choose_move(self, board):
+        moves = board.get_legal_moves()
+        return self.rng.choice(moves) if moves else None
+
+
+class ScriptedPolicy(MovePolicy):
+    """Plays moves from a fixed script, indexed by ply"""
+
+    name = "scripted"
+
+    def __init__(self, moves, fallback=None):
+        """
+        Initialize the policy
+
+        Args:
+            moves: List of moves in UCI notation covering both sides
+            fallback: Policy used once the script runs out, or None to stop
+        """
+        self.moves = [chess.Move.from_uci(move) for move in moves]
+        self.fallback = fallback
+
+    def choose_move(self, board):
+        ply = board.get_ply()
+        if ply < len(self.moves):
+            return self.moves[ply]
+        if self.fallback:
+            return self.fallback.choose_move(board)
+        return None
+
+
+class SearchPolicy(MovePolicy):
+    """Plays the best move found by the alpha-beta engine"""
+
+    name = "search"
+
+    def __init__(self, depth=2, time_limit=None):
+        """
+        Initialize the policy
+
+        Args:
+            depth: Search depth in plies (default: 2)
+            time_limit: Time budget per move in seconds, or None for no limit
+        """
+        self.depth = depth
+        self.time_limit = time_limit
+        self.engine = Engine()
+
+    def choose_move(self, board):
+        return self.engine.search(board, self.time_limit, self.depth).best_move
+
+
+class GreedyPolicy(MovePolicy):
+    """Plays the move leading to the best static evaluation"""
+
+    name = "greedy"
+
+    def __init__(self, seed=None):
+        """
+        Initialize the policy
+
+        Args:
+            seed: Seed for breaking ties between equal moves (default: unseeded)
+        """
+        self.evaluator = BatchEvaluator()
+        self.rng = random.Random(seed)
+
+    def choose_move(self, board):
+        moves = board.get_legal_moves()
+        if not moves:
+            return None
+        # All replies are scored in one batch
+        _, scores = self.evaluator.evaluate_moves(board, moves)
+        best = scores.max()
+        return self.rng.choice([move for move, score in zip(moves, scores) if score == best])
+
+
+class BookPolicy(MovePolicy):
+    """Plays weighted random moves from an opening book"""
+
+    name = "book"
+
+    def __init__(self, book, fallback=None, seed=None):
+        """
+        Initialize the policy
+
+        Args:
+            book: OpeningBook instance
+            fallback: Policy used once the game leaves the book, or None
+                to stop
+            seed: Seed for the weighted move choice (default: unseeded)
+        """
+        self.book = book
+        self.fallback = fallback
+        self.rng = random.Random(seed)
+
+    def choose_move(self, board):
+        move = self.book.choose_move(board, self.rng)
+        if move is None and self.fallback:
+            return self.fallback.choose_move(board)
+        return move
+
+
+def create_policy(spec, seed=None):
+    """
+    Create a move policy from a command-line style specification
+
+    Supported specifications are "random", "scripted:e2e4,e7e5,..."
+    (falling back to random moves when the script runs out), "greedy"
+    (best batched one-ply evaluation), "search" or
+    "search:<depth>", and "book:<path.bin>" (falling back to a depth 2
+    search when the game leaves the book).
+
+    Args:
+        spec: Policy specification string
+        seed: Seed for any randomness in the policy
+
+    Returns:
+        MovePolicy instance
+    """
+    name, _, argument = spec.partition(':')
+
+    if name == RandomPolicy.name:
+        return RandomPolicy(seed)
+    if name == ScriptedPolicy.name:
+        moves = [move for move in argument.split(',') if move]
+        return ScriptedPolicy(moves, RandomPolicy(seed))
+    if name == GreedyPolicy.name:
+        return GreedyPolicy(seed)
+    if name == SearchPolicy.name:
+        return SearchPolicy(int(argument) if argument else 2)
+    if name == BookPolicy.name:
+        return BookPolicy(OpeningBook(argument), SearchPolicy(), seed)
+
+    raise ValueError(f"Unknown move policy: {spec}")
\ No newline at end of file
@@ -0,0 +1,267 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+import chess
+import numpy as np
+from model.game_record import RESULTS, decode_move, encode_move, read_games
+from model.zobrist import EP_KEYS, zobrist_key, zobrist_key_after
+
+# Move code of a posting for a game that ended in the position
+END_OF_GAME = 0
+
+# Result codes, the indexes of model.game_record.RESULTS
+WHITE_WIN = RESULTS.index("1-0")
+BLACK_WIN = RESULTS.index("0-1")
+DRAW = RESULTS.index("1/2-1/2")
+
+
+def position_key(chess_board, key=None):
+    """
+    Get the key a position is indexed under
+
+    This is the Polyglot hash: the Zobrist key of model.zobrist, with the
+    en passant file only hashed when an en passant capture is legal, so
+    that transpositions meet whatever the last move was.
+
+    Args:
+        chess_board: python-chess Board
+        key: model.zobrist key of the position if already known
+
+    Returns:
+        64-bit integer key
+    """
+    if key is None:
+        key = zobrist_key(chess_board)
+    if chess_board.ep_square is not None and not chess_board.has_legal_en_passant():
+        key ^= EP_KEYS[chess.square_file(chess_board.ep_square)]
+    return key
+
+
+class ExplorerMove:
+    """Statistics of one move played in an indexed position"""
+
+    def __init__(self, move, games, white_wins, draws, black_wins):
+        """
+        Initialize the statistics
+
+        Args:
+            move: python-chess Move, or None for games that ended in the
+                position
+            games: Number of games
+            white_wins: Number of those games won by white
+            draws: Number of those games drawn
+            black_wins: Number of those games won by black
+        """
+        self.move = move
+        self.games = games
+        self.white_wins = white_wins
+        self.draws = draws
+        self.black_wins = black_wins
+
+    @property
+    def white_score(self):
+        """Get white's score in percent over the decided and drawn games"""
+        finished = self.white_wins + self.draws + self.black_wins
+        if not finished:
+            return None
+        return 100 * (self.white_wins + self.draws / 2) / finished
+
+
+class PositionIndex:
+    """
+    Memory-mapped index from position keys to the games reaching them
+
+    Every position of every game becomes a posting of game number, ply and
+    the move played next. The postings are sorted by position key, so all
+    games reaching a position form one contiguous run found by binary
+    search; a lookup reads a few pages of the key column and the run
+    itself, however many games are indexed. The result of every game is
+    stored alongside, so move frequencies and scores come straight from
+    the index without touching the games.
+
+    Index layout (little-endian): a header of magic, game count and
+    posting count, the result code of every game (padded to 8 bytes),
+    then the postings as four columns: keys (u64), game numbers (u32),
+    plies (u16) and move codes (u16, see model.game_record; END_OF_GAME
+    where the game ended).
+    """
+
+    MAGIC = b'CHESSPI1'
+    HEADER = struct.Struct('<8sQQ')
+
+    def __init__(self, path):
+        """
+        Open an index built by build()
+
+        Args:
+            path: Path of the index file
+        """
+        self.path = path
+        self.index_file = open(path, 'rb')
+        self.index_map = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.game_count, self.posting_count = self.HEADER.unpack_from(self.index_map)
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a position index")
+
+        offset = self.HEADER.size
+        self.results = np.frombuffer(self.index_map, np.uint8, self.game_count, offset)
+        offset += _padded(self.game_count)
+        count = self.posting_count
+        self.keys = np.frombuffer(self.index_map, np.uint64, count, offset)
+        offset += 8 * count
+        self.games = np.frombuffer(self.index_map, np.uint32, count, offset)
+        offset += 4 * count
+        self.plies = np.frombuffer(self.index_map, np.uint16, count, offset)
+        offset += 2 * count
+        self.moves = np.frombuffer(self.index_map, np.uint16, count, offset)
+
+    @classmethod
+    def build(cls, games, path):
+        """
+        Index a collection of games
+
+        Args:
+            games: Iterable of GameRecord objects, numbered in order
+            path: Path of the index file to write
+
+        Returns:
+            Number of games indexed
+        """
+        results = array('B')
+        keys = array('Q')
+        game_numbers = array('I')
+        plies = array('H')
+        moves = array('H')
+
+        for number, record in enumerate(games):
+            results.append(RESULTS.index(record.result))
+            board = record.get_start_board()
+            key = zobrist_key(board)
+            for ply, move in enumerate(record.moves):
+                if not board.is_legal(move):
+                    # Keep what was reached before the broken move
+                    break
+                keys.append(position_key(board, key))
+                game_numbers.append(number)
+                plies.append(ply)
+                moves.append(encode_move(move))
+                key = zobrist_key_after(board, key, move)
+                board.push(move)
+            else:
+                keys.append(position_key(board, key))
+                game_numbers.append(number)
+                plies.append(len(record.moves))
+                moves.append(END_OF_GAME)
+
+        # A stable sort keeps the postings of one position in game order
+        order = np.argsort(np.frombuffer(keys, np.uint64), kind='stable')
+
+        # Write to a temporary file so a crash never leaves a partial index
+        temporary_path = path + ".tmp"
+        with open(temporary_path, 'wb') as index_file:
+            index_file.write(cls.HEADER.pack(cls.MAGIC, len(results), len(keys)))
+            index_file.write(results.tobytes().ljust(_padded(len(results)), b'\0'))
+            for column, dtype in ((keys, np.uint64), (game_numbers, np.uint32), (plies, np.uint16), (moves, np.uint16)):
+                np.frombuffer(column, dtype)[order].tofile(index_file)
+        os.replace(temporary_path, path)
+        return len(results)
+
+    def close(self):
+        """Release the memory map and file"""
+        self.results = self.keys = self.games = self.plies = self.moves = None
+        if self.index_map is not None:
+            self.index_map.close()
+            self.index_file.close()
+            self.index_map = self.index_file = None
+
+    def _find(self, chess_board):
+        """Get the slice of the postings of a position"""
+        key = np.uint64(position_key(chess_board))
+        start = int(np.searchsorted(self.keys, key, 'left'))
+        end = int(np.searchsorted(self.keys, key, 'right'))
+        return slice(start, end)
+
+    def count_games(self, chess_board):
+        """
+        Count the games reaching a position
+
+        Args:
+            chess_board: python-chess Board
+
+        Returns:
+            Number of postings, i.e. games (a game repeating the position
+            counts once per visit)
+        """
+        postings = self._find(chess_board)
+        return postings.stop - postings.start
+
+    def get_games(self, chess_board, limit=None):
+        """
+        Get the games reaching a position
+
+        Args:
+            chess_board: python-chess Board
+            limit: Maximum number of games returned, or None for all
+
+        Returns:
+            List of tuples (game number, ply) in game order
+        """
+        postings = self._find(chess_board)
+        games = self.games[postings][:limit].tolist()
+        plies = self.plies[postings][:limit].tolist()
+        return list(zip(games, plies))
+
+    def explore(self, chess_board):
+        """
+        Get the moves played in a position with their results
+
+        Args:
+            chess_board: python-chess Board
+
+        Returns:
+            List of ExplorerMove, most played first
+        """
+        postings = self._find(chess_board)
+        if postings.start == postings.stop:
+            return []
+
+        codes, inverse = np.unique(self.moves[postings], return_inverse=True)
+        results = self.results[self.games[postings]]
+        table = np.bincount(inverse * len(RESULTS) + results, minlength=len(codes) * len(RESULTS))
+        table = table.reshape(len(codes), len(RESULTS))
+
+        explored = []
+        for code, row in zip(codes.tolist(), table.tolist()):
+            move = decode_move(code) if code != END_OF_GAME else None
+            explored.append(ExplorerMove(move, sum(row), row[WHITE_WIN], row[DRAW], row[BLACK_WIN]))
+        explored.sort(key=lambda entry: entry.games, reverse=True)
+        return explored
+
+
+def _padded(size):
+    """Round a size up to a multiple of 8 bytes"""
+    return (size + 7) & ~7
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a position index for the opening explorer")
+    parser.add_argument("games", help="PGN file or binary record file (model.game_record)")
+    parser.add_argument("--output", help="index file to write (default: the games file + .pos)")
+    args = parser.parse_args()
+
+    output = args.output or args.games + ".pos"
+    start = time.perf_counter()
+    count = PositionIndex.build(read_games(args.games), output)
+    print(
+        f"Indexed {count} games in {time.perf_counter() - start:.1f} s: "
+        f"{os.path.getsize(output)} bytes written to {output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
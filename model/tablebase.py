@@ -0,0 +1,286 @@
+import mmap
+import os
+import struct
+import chess
+
+# Tables by name, with the strong side's pieces besides its king
+TABLES = {
+    "KQK": (chess.QUEEN,),
+    "KRK": (chess.ROOK,),
+    "KPK": (chess.PAWN,),
+    "KBNK": (chess.BISHOP, chess.KNIGHT)
+}
+
+FILE_HEADER = struct.Struct('<8s8sII')
+MAGIC = b'CHESSTB1'
+
+# Stored values: 0 is a draw, ILLEGAL an impossible position, anything
+# else is the number of plies to mate plus one, so odd values are losses
+# and even values wins for the side to move
+ILLEGAL = 255
+
+# Strong side to move comes first in every table, then weak side to move
+STRONG_TO_MOVE = 0
+WEAK_TO_MOVE = 1
+
+
+def _transform(square, symmetry):
+    """Mirror a square by file (bit 0), rank (bit 1) and diagonal (bit 2)"""
+    file, rank = square & 7, square >> 3
+    if symmetry & 1:
+        file = 7 - file
+    if symmetry & 2:
+        rank = 7 - rank
+    if symmetry & 4:
+        file, rank = rank, file
+    return rank * 8 + file
+
+
+TRANSFORMS = [[_transform(square, symmetry) for square in chess.SQUARES] for symmetry in range(8)]
+DIAGONAL_MIRROR = TRANSFORMS[4]
+DIAGONAL = {square for square in chess.SQUARES if chess.square_rank(square) == chess.square_file(square)}
+
+
+class TableLayout:
+    """
+    Index scheme of one table
+
+    Positions are normalized so that the strong side is white, and then
+    mirrored so that the strong king stands in a small region: the a1-d1-d4
+    triangle for pawnless tables (all 8 board symmetries) or files a-d when
+    pawns only allow mirroring left to right. The index is the region index
+    of the strong king followed by the weak king and the strong pieces as
+    base-64 digits. When the strong king ends up on the a1-h8 diagonal the
+    board may still be mirrored along it; the mirror image is taken if the
+    first piece off the diagonal lies above it, so every position has
+    exactly one index.
+    """
+
+    def __init__(self, name):
+        """
+        Initialize the layout
+
+        Args:
+            name: Table name, a key of TABLES
+        """
+        self.name = name
+        self.pieces = TABLES[name]
+        self.has_pawns = chess.PAWN in self.pieces
+
+        if self.has_pawns:
+            self.region = [square for square in chess.SQUARES if chess.square_file(square) <= 3]
+            symmetries = (0, 1)
+        else:
+            self.region = [
+                square for square in chess.SQUARES
+                if chess.square_rank(square) <= chess.square_file(square) <= 3
+            ]
+            symmetries = range(8)
+
+        self.region_index = [-1] * 64
+        for index, square in enumerate(self.region):
+            self.region_index[square] = index
+
+        # Symmetry that brings each strong king square into the region
+        self.symmetry_of = [
+            next(symmetry for symmetry in symmetries if TRANSFORMS[symmetry][square] in self.region)
+            for square in chess.SQUARES
+        ]
+        self.size = len(self.region) * 64 ** (1 + len(self.pieces))
+
+    def index(self, strong_king, weak_king, squares):
+        """
+        Get the index of a position with the strong side playing white
+
+        Args:
+            strong_king: Square of the strong king
+            weak_king: Square of the weak king
+            squares: Squares of the strong pieces, in table order
+
+        Returns:
+            Position index within one side-to-move half of the table
+        """
+        transform = TRANSFORMS[self.symmetry_of[strong_king]]
+        if not self.has_pawns and transform[strong_king] in DIAGONAL:
+            for square in [weak_king] + list(squares):
+                square = transform[square]
+                if square not in DIAGONAL:
+                    if chess.square_rank(square) > chess.square_file(square):
+                        transform = [DIAGONAL_MIRROR[target] for target in transform]
+                    break
+
+        index = self.region_index[transform[strong_king]] * 64 + transform[weak_king]
+        for square in squares:
+            index = index * 64 + transform[square]
+        return index
+
+
+class Tablebase:
+    """
+    Endgame tables generated by model.tablebase_generator
+
+    Every table found in the directory is memory-mapped, so probing reads
+    a single byte and the tables cost no memory until they are used.
+    """
+
+    def __init__(self, directory):
+        """
+        Open the tables of a directory
+
+        Args:
+            directory: Directory holding <name>.tb files
+        """
+        self.directory = directory
+        self.tables = {}
+        self.max_pieces = 0
+
+        for name in TABLES:
+            path = os.path.join(directory, name + ".tb")
+            if not os.path.exists(path):
+                continue
+
+            layout = TableLayout(name)
+            table_file = open(path, 'rb')
+            table_map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, table_name, _, size = FILE_HEADER.unpack_from(table_map)
+            if (magic != MAGIC or table_name.rstrip(b'\0').decode('ascii') != name or
+                    size != layout.size or len(table_map) != FILE_HEADER.size + 2 * size):
+                table_map.close()
+                table_file.close()
+                raise ValueError(f"{path} is not a valid {name} table")
+
+            self.tables[name] = (layout, table_file, table_map)
+            self.max_pieces = max(self.max_pieces, len(name))
+
+    def close(self):
+        """Release the memory maps and files"""
+        for _, table_file, table_map in self.tables.values():
+            table_map.close()
+            table_file.close()
+        self.tables = {}
+
+    def __contains__(self, name):
+        """Check if a table is available"""
+        return name in self.tables
+
+    def probe(self, chess_board):
+        """
+        Look up the result of a position
+
+        Args:
+            chess_board: python-chess Board
+
+        Returns:
+            Tuple (result, plies) where result is 1 if the side to move
+            mates, -1 if it gets mated and 0 for a draw, and plies is the
+            number of plies to mate with best play; None if no table
+            covers the position
+        """
+        if chess_board.castling_rights or chess.popcount(chess_board.occupied) > self.max_pieces:
+            return None
+
+        white_count = chess.popcount(chess_board.occupied_co[chess.WHITE])
+        black_count = chess.popcount(chess_board.occupied_co[chess.BLACK])
+        if white_count > 1 and black_count == 1:
+            strong = chess.WHITE
+        elif black_count > 1 and white_count == 1:
+            strong = chess.BLACK
+        else:
+            return None
+
+        piece_types = sorted(
+            (chess_board.piece_type_at(square)
+             for square in chess.scan_forward(chess_board.occupied_co[strong])
+             if chess_board.piece_type_at(square) != chess.KING),
+            reverse=True
+        )
+        name = "K" + "".join(chess.piece_symbol(piece_type).upper() for piece_type in piece_types) + "K"
+        table = self.tables.get(name)
+        if table is None:
+            return None
+        layout, _, table_map = table
+
+        strong_king = chess_board.king(strong)
+        weak_king = chess_board.king(not strong)
+        squares = [
+            chess.lsb(chess_board.pieces_mask(piece_type, strong))
+            for piece_type in layout.pieces
+        ]
+        if strong == chess.BLACK:
+            # Flip the board so that the strong side plays white
+            strong_king ^= 56
+            weak_king ^= 56
+            squares = [square ^ 56 for square in squares]
+
+        side = STRONG_TO_MOVE if chess_board.turn == strong else WEAK_TO_MOVE
+        offset = FILE_HEADER.size + side * layout.size + layout.index(strong_king, weak_king, squares)
+        value = table_map[offset]
+        if value == ILLEGAL:
+            return None
+        if value == 0:
+            return 0, 0
+        plies = value - 1
+        return (1 if plies % 2 else -1), plies
+
+    def _probe_after_move(self, chess_board):
+        """Get the result of a position reached by a move, including game ends"""
+        if chess_board.is_checkmate():
+            return -1, 0
+        if chess_board.is_stalemate() or chess_board.is_insufficient_material():
+            return 0, 0
+        return self.probe(chess_board)
+
+    def get_best_move(self, chess_board):
+        """
+        Find a move keeping the best result with the shortest win or the
+        longest defence
+
+        Args:
+            chess_board: python-chess Board (restored on return)
+
+        Returns:
+            Tuple (move, result, plies) with result and plies as returned by
+            probe for the position itself; None if no table covers it
+        """
+        probe = self.probe(chess_board)
+        if probe is None:
+            return None
+
+        best_move = None
+        best_key = None
+        for move in chess_board.legal_moves:
+            chess_board.push(move)
+            try:
+                child = self._probe_after_move(chess_board)
+            finally:
+                chess_board.pop()
+            if child is None:
+                continue
+
+            result, plies = -child[0], child[1]
+            # Win quickly, lose slowly
+            key = (result, -plies if result > 0 else plies)
+            if best_key is None or key > best_key:
+                best_move, best_key = move, key
+
+        if best_move is None:
+            return None
+        return best_move, probe[0], probe[1]
+
+
+def describe_result(chess_board, probe):
+    """
+    Describe a tablebase result for display
+
+    Args:
+        chess_board: python-chess Board the result belongs to
+        probe: Tuple (result, plies) from Tablebase.probe
+
+    Returns:
+        Text such as "White mates in 7" or "Draw"
+    """
+    result, plies = probe
+    if result == 0:
+        return "Draw"
+    winner = chess_board.turn if result > 0 else not chess_board.turn
+    return f"{'White' if winner == chess.WHITE else 'Black'} mates in {(plies + 1) // 2}"
\ No newline at end of file
@@ -0,0 +1,558 @@
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+import numpy as np
+import chess
+from model.tablebase import (
+    TABLES, TRANSFORMS, FILE_HEADER, MAGIC, ILLEGAL,
+    STRONG_TO_MOVE, WEAK_TO_MOVE, TableLayout
+)
+
+# Tables are solved before the tables that depend on them
+DEPENDENCIES = {"KPK": ("KQK", "KRK")}
+
+CHUNK_SIZE = 1 << 20
+NO_MOVE = -1
+DRAW_MOVE = -2
+
+
+def _attack_table(attacks):
+    """Build a 64x64 table of attacks[from_square] bitboards"""
+    return np.array(
+        [[bool(attacks(source) & chess.BB_SQUARES[target]) for target in chess.SQUARES]
+         for source in chess.SQUARES]
+    )
+
+
+def _step_table(offsets):
+    """Build a 64xN table of squares one step away, -1 off the board"""
+    table = np.full((64, len(offsets)), -1, dtype=np.int64)
+    for square in chess.SQUARES:
+        file, rank = chess.square_file(square), chess.square_rank(square)
+        for index, (file_step, rank_step) in enumerate(offsets):
+            if 0 <= file + file_step < 8 and 0 <= rank + rank_step < 8:
+                table[square, index] = square + rank_step * 8 + file_step
+    return table
+
+
+KING_ATTACKS = _attack_table(lambda square: chess.BB_KING_ATTACKS[square])
+KNIGHT_ATTACKS = _attack_table(lambda square: chess.BB_KNIGHT_ATTACKS[square])
+PAWN_ATTACKS = _attack_table(lambda square: chess.BB_PAWN_ATTACKS[chess.WHITE][square])
+DIAGONAL_LINES = _attack_table(lambda square: chess.BB_DIAG_ATTACKS[square][0])
+STRAIGHT_LINES = _attack_table(
+    lambda square: chess.BB_RANK_ATTACKS[square][0] | chess.BB_FILE_ATTACKS[square][0]
+)
+BETWEEN = np.array(
+    [[chess.between(source, target) for target in chess.SQUARES] for source in chess.SQUARES],
+    dtype=np.uint64
+)
+
+KING_OFFSETS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+KNIGHT_OFFSETS = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+KING_STEPS = _step_table(KING_OFFSETS)
+KNIGHT_STEPS = _step_table(KNIGHT_OFFSETS)
+DIAGONAL_STEPS = _step_table([(-1, -1), (1, -1), (-1, 1), (1, 1)])
+STRAIGHT_STEPS = _step_table([(0, -1), (-1, 0), (1, 0), (0, 1)])
+
+SLIDER_STEPS = {
+    chess.BISHOP: DIAGONAL_STEPS,
+    chess.ROOK: STRAIGHT_STEPS,
+    chess.QUEEN: np.concatenate((DIAGONAL_STEPS, STRAIGHT_STEPS), axis=1)
+}
+
+TRANSFORM_ARRAY = np.array(TRANSFORMS, dtype=np.int64)
+
+
+def _bits(squares):
+    """Get single-square bitboards of an array of squares"""
+    return np.left_shift(np.uint64(1), squares.astype(np.uint64))
+
+
+def _is_empty(occupied, squares):
+    """Check squares (which may be -1 off the board) against a bitboard"""
+    return (occupied & _bits(np.maximum(squares, 0))) == 0
+
+
+def attacks(piece_type, source, target, occupied):
+    """
+    Check whether white pieces attack target squares
+
+    Args:
+        piece_type: python-chess piece type
+        source: Array of squares of the attacking pieces
+        target: Array of target squares
+        occupied: Array of blocker bitboards
+
+    Returns:
+        Boolean array
+    """
+    if piece_type == chess.KING:
+        return KING_ATTACKS[source, target]
+    if piece_type == chess.KNIGHT:
+        return KNIGHT_ATTACKS[source, target]
+    if piece_type == chess.PAWN:
+        return PAWN_ATTACKS[source, target]
+
+    if piece_type == chess.BISHOP:
+        lines = DIAGONAL_LINES[source, target]
+    elif piece_type == chess.ROOK:
+        lines = STRAIGHT_LINES[source, target]
+    else:
+        lines = DIAGONAL_LINES[source, target] | STRAIGHT_LINES[source, target]
+    return lines & ((BETWEEN[source, target] & occupied) == 0)
+
+
+class VectorLayout:
+    """TableLayout indexing whole arrays of positions at once"""
+
+    def __init__(self, name):
+        """
+        Initialize the layout
+
+        Args:
+            name: Table name, a key of TABLES
+        """
+        self.layout = TableLayout(name)
+        self.pieces = self.layout.pieces
+        self.size = self.layout.size
+        self.region = np.array(self.layout.region, dtype=np.int64)
+        self.region_index = np.array(self.layout.region_index, dtype=np.int64)
+        self.symmetry_of = np.array(self.layout.symmetry_of, dtype=np.int64)
+
+    def encode(self, strong_king, weak_king, squares):
+        """
+        Index arrays of positions
+
+        Args:
+            strong_king: Array of strong king squares
+            weak_king: Array of weak king squares
+            squares: List of arrays of strong piece squares, in table order
+
+        Returns:
+            Array of position indices
+        """
+        transform = TRANSFORM_ARRAY[self.symmetry_of[strong_king]]
+        rows = np.arange(len(strong_king))
+        strong_king = transform[rows, strong_king]
+        weak_king = transform[rows, weak_king]
+        squares = [transform[rows, square] for square in squares]
+
+        if not self.layout.has_pawns:
+            # Mirror along the diagonal if the first piece off it is above it
+            undecided = (strong_king >> 3) == (strong_king & 7)
+            mirror = np.zeros(len(rows), dtype=bool)
+            for square in [weak_king] + squares:
+                mirror |= undecided & ((square >> 3) > (square & 7))
+                undecided &= (square >> 3) == (square & 7)
+            diagonal_mirror = TRANSFORM_ARRAY[4]
+            weak_king = np.where(mirror, diagonal_mirror[weak_king], weak_king)
+            squares = [np.where(mirror, diagonal_mirror[square], square) for square in squares]
+
+        index = self.region_index[strong_king] * 64 + weak_king
+        for square in squares:
+            index = index * 64 + square
+        return index
+
+    def decode(self, index):
+        """
+        Get the squares of indexed positions
+
+        Args:
+            index: Array of position indices
+
+        Returns:
+            Tuple (strong king, weak king, list of strong piece squares)
+        """
+        squares = []
+        for _ in self.pieces:
+            index, square = np.divmod(index, 64)
+            squares.insert(0, square)
+        index, weak_king = np.divmod(index, 64)
+        return self.region[index], weak_king, squares
+
+
+class TableGenerator:
+    """
+    Solves one table by retrograde analysis
+
+    Starting from the checkmates, every round finds the strong-side
+    positions that can reach a newly lost position by un-moving a strong
+    piece (wins in one more ply), then the weak-side positions that lead
+    only to won positions (losses in one more ply). Each round works on
+    whole arrays of positions, and only the positions next to the previous
+    round's results are ever looked at. Whatever is never reached is a draw.
+    """
+
+    def __init__(self, name, dependencies=None):
+        """
+        Initialize the generator
+
+        Args:
+            name: Table name, a key of TABLES
+            dependencies: Dictionary mapping the names of the tables this one
+                promotes into to their value arrays
+        """
+        self.name = name
+        self.layout = VectorLayout(name)
+        self.pieces = (chess.KING,) + self.layout.pieces
+        self.dependencies = dependencies or {}
+        self.values = np.zeros((2, self.layout.size), dtype=np.uint8)
+        self.legal = np.zeros((2, self.layout.size), dtype=bool)
+
+    def _decode(self, index):
+        """Decode positions into (strong squares including the king, weak king)"""
+        strong_king, weak_king, squares = self.layout.decode(index)
+        return [strong_king] + squares, weak_king
+
+    def _encode(self, strong, weak_king):
+        """Encode positions from (strong squares including the king, weak king)"""
+        return self.layout.encode(strong[0], weak_king, strong[1:])
+
+    @staticmethod
+    def _occupancy(squares):
+        """Get the bitboards of arrays of squares"""
+        occupied = np.zeros(len(squares[0]), dtype=np.uint64)
+        for square in squares:
+            occupied |= _bits(square)
+        return occupied
+
+    def _weak_king_attacked(self, strong, target):
+        """Check if target squares are attacked by the strong side"""
+        occupied = self._occupancy(strong)
+        attacked = np.zeros(len(target), dtype=bool)
+        for piece_type, square in zip(self.pieces, strong):
+            attacked |= attacks(piece_type, square, target, occupied)
+        return attacked
+
+    def _find_legal_positions(self):
+        """Mark impossible positions for both sides to move"""
+        for start in range(0, self.layout.size, CHUNK_SIZE):
+            index = np.arange(start, min(start + CHUNK_SIZE, self.layout.size))
+            strong, weak_king = self._decode(index)
+            squares = strong + [weak_king]
+
+            # Only the canonical index of symmetric duplicates is used
+            legal = self._encode(strong, weak_king) == index
+            legal &= ~KING_ATTACKS[strong[0], weak_king]
+            for first in range(len(squares)):
+                for second in range(first + 1, len(squares)):
+                    legal &= squares[first] != squares[second]
+            for piece_type, square in zip(self.pieces, strong):
+                if piece_type == chess.PAWN:
+                    legal &= (square >= 8) & (square < 56)
+
+            self.legal[WEAK_TO_MOVE, index] = legal
+            # The side not to move cannot be in check
+            self.legal[STRONG_TO_MOVE, index] = legal & ~self._weak_king_attacked(strong, weak_king)
+
+        self.values[~self.legal] = ILLEGAL
+
+    def _weak_moves(self, index):
+        """
+        Get the children of weak-side-to-move positions
+
+        Args:
+            index: Array of legal weak-to-move position indices
+
+        Returns:
+            Array (positions x 8) of strong-to-move child indices, with
+            NO_MOVE for illegal king moves and DRAW_MOVE for captures
+        """
+        strong, weak_king = self._decode(index)
+        occupied = self._occupancy(strong)
+        children = np.full((len(index), 8), NO_MOVE, dtype=np.int64)
+
+        for direction in range(8):
+            target = KING_STEPS[weak_king, direction]
+            on_board = target >= 0
+            target = np.maximum(target, 0)
+            legal = on_board & ~KING_ATTACKS[strong[0], target] & (target != strong[0])
+
+            captures = np.zeros(len(index), dtype=bool)
+            for piece_type, square in zip(self.pieces[1:], strong[1:]):
+                captures |= square == target
+                # The weak king no longer blocks lines through its old square
+                legal &= ~attacks(piece_type, square, target, occupied)
+
+            child = self._encode(strong, target)
+            children[:, direction] = np.where(legal, np.where(captures, DRAW_MOVE, child), NO_MOVE)
+        return children
+
+    def _find_checkmates(self):
+        """
+        Find the weak-side-to-move positions that are checkmate
+
+        Returns:
+            Array of position indices
+        """
+        checkmates = []
+        for start in range(0, self.layout.size, CHUNK_SIZE):
+            index = np.arange(start, min(start + CHUNK_SIZE, self.layout.size))
+            index = index[self.legal[WEAK_TO_MOVE, index]]
+            strong, weak_king = self._decode(index)
+            in_check = self._weak_king_attacked(strong, weak_king)
+            index = index[in_check]
+            stuck = (self._weak_moves(index) == NO_MOVE).all(axis=1)
+            checkmates.append(index[stuck])
+        return np.concatenate(checkmates)
+
+    def _strong_unmoves(self, index):
+        """
+        Get the strong-side-to-move positions leading to given positions
+
+        Args:
+            index: Array of weak-to-move position indices
+
+        Returns:
+            Array of unsolved strong-to-move position indices
+        """
+        strong, weak_king = self._decode(index)
+        occupied = self._occupancy(strong + [weak_king])
+        parents = []
+
+        for piece, (piece_type, square) in enumerate(zip(self.pieces, strong)):
+            origins = []
+            if piece_type == chess.PAWN:
+                # Pushes back, never from the first rank
+                single = square - 8
+                single_valid = (square >= 16) & _is_empty(occupied, single)
+                origins.append((single, single_valid))
+                double = square - 16
+                origins.append((double, single_valid & (square >> 3 == 3) & _is_empty(occupied, double)))
+            elif piece_type in (chess.KING, chess.KNIGHT):
+                steps = KING_STEPS if piece_type == chess.KING else KNIGHT_STEPS
+                for direction in range(8):
+                    origin = steps[square, direction]
+                    origins.append((origin, (origin >= 0) & _is_empty(occupied, origin)))
+            else:
+                steps = SLIDER_STEPS[piece_type]
+                for direction in range(steps.shape[1]):
+                    origin = square
+                    valid = np.ones(len(index), dtype=bool)
+                    for _ in range(7):
+                        origin = np.where(valid, steps[np.maximum(origin, 0), direction], -1)
+                        valid = valid & (origin >= 0) & _is_empty(occupied, origin)
+                        if not valid.any():
+                            break
+                        origins.append((origin, valid))
+
+            for origin, valid in origins:
+                moved = list(strong)
+                moved[piece] = np.where(valid, origin, square)
+                parents.append(self._encode(moved, weak_king)[valid])
+
+        if not parents:
+            return np.zeros(0, dtype=np.int64)
+        parents = np.unique(np.concatenate(parents))
+        return parents[self.values[STRONG_TO_MOVE, parents] == 0]
+
+    def _weak_unmoves(self, index):
+        """
+        Get the weak-side-to-move positions leading to given positions
+
+        Args:
+            index: Array of strong-to-move position indices
+
+        Returns:
+            Array of unsolved weak-to-move position indices
+        """
+        strong, weak_king = self._decode(index)
+        occupied = self._occupancy(strong)
+        parents = []
+        for direction in range(8):
+            origin = KING_STEPS[weak_king, direction]
+            valid = (origin >= 0) & _is_empty(occupied, origin)
+            parents.append(self._encode(strong, np.where(valid, origin, weak_king))[valid])
+
+        parents = np.unique(np.concatenate(parents))
+        parents = parents[self.values[WEAK_TO_MOVE, parents] == 0]
+        return parents[self.legal[WEAK_TO_MOVE, parents]]
+
+    def _find_promotion_wins(self):
+        """
+        Score the pawn promotions into already solved tables
+
+        Returns:
+            Array over strong-to-move positions holding the value of the
+            best winning promotion, or 0
+        """
+        promotion_values = np.zeros(self.layout.size, dtype=np.uint8)
+        pawn = self.pieces.index(chess.PAWN)
+        for start in range(0, self.layout.size, CHUNK_SIZE):
+            index = np.arange(start, min(start + CHUNK_SIZE, self.layout.size))
+            index = index[self.legal[STRONG_TO_MOVE, index]]
+            strong, weak_king = self._decode(index)
+            promotion_square = strong[pawn] + 8
+            occupied = self._occupancy(strong + [weak_king])
+            can_promote = (strong[pawn] >= 48) & _is_empty(occupied, np.minimum(promotion_square, 63))
+            index = index[can_promote]
+            strong = [square[can_promote] for square in strong]
+            weak_king = weak_king[can_promote]
+
+            promoted = list(strong)
+            promoted[pawn] = strong[pawn] + 8
+            best = np.zeros(len(index), dtype=np.uint8)
+            for name, values in self.dependencies.items():
+                # The promoted piece takes the pawn's place in the piece list
+                child = VectorLayout(name).encode(promoted[0], weak_king, promoted[1:])
+                value = values[WEAK_TO_MOVE, child]
+                wins = (value % 2 == 1) & (value != ILLEGAL)
+                value = np.where(wins, value + 1, 0).astype(np.uint8)
+                best = np.where((best == 0) | ((value > 0) & (value < best)), value, best)
+            promotion_values[index] = best
+        return promotion_values
+
+    def generate(self):
+        """
+        Solve the table
+
+        Returns:
+            Array (2 x size) of stored values, strong side to move first
+        """
+        self._find_legal_positions()
+        promotion_values = None
+        if chess.PAWN in self.pieces:
+            promotion_values = self._find_promotion_wins()
+
+        lost = self._find_checkmates()
+        self.values[WEAK_TO_MOVE, lost] = 1
+        value = 1
+        while value + 2 < ILLEGAL:
+            won = self._strong_unmoves(lost)
+            if promotion_values is not None:
+                promoted = np.flatnonzero(promotion_values == value + 1)
+                promoted = promoted[self.values[STRONG_TO_MOVE, promoted] == 0]
+                won = np.union1d(won, promoted)
+            self.values[STRONG_TO_MOVE, won] = value + 1
+
+            candidates = self._weak_unmoves(won)
+            children = self._weak_moves(candidates)
+            child_values = self.values[STRONG_TO_MOVE, np.maximum(children, 0)]
+            resolved = (children == NO_MOVE) | ((children >= 0) & (child_values != 0))
+            has_move = (children != NO_MOVE).any(axis=1)
+            lost = candidates[resolved.all(axis=1) & has_move]
+            self.values[WEAK_TO_MOVE, lost] = value + 2
+            value += 2
+
+            pending = promotion_values is not None and (promotion_values > value).any()
+            if not len(won) and not pending:
+                break
+        return self.values
+
+
+def load_values(path, name):
+    """
+    Read the values of a generated table
+
+    Args:
+        path: Path of the table file
+        name: Table name
+
+    Returns:
+        Array (2 x size) of stored values
+    """
+    size = TableLayout(name).size
+    values = np.fromfile(path, dtype=np.uint8, offset=FILE_HEADER.size)
+    return values.reshape(2, size)
+
+
+def write_table(path, name, values):
+    """
+    Write a table file
+
+    Args:
+        path: Output path
+        name: Table name
+        values: Array (2 x size) of stored values
+    """
+    temporary_path = path + ".tmp"
+    with open(temporary_path, 'wb') as table_file:
+        table_file.write(FILE_HEADER.pack(MAGIC, name.encode('ascii'), len(TABLES[name]) + 2, values.shape[1]))
+        values.tofile(table_file)
+    os.replace(temporary_path, path)
+
+
+def generate_table(name, directory):
+    """
+    Generate one table and write it to a directory
+
+    Args:
+        name: Table name
+        directory: Output directory, which must hold the dependencies
+
+    Returns:
+        Tuple (name, seconds, dictionary of counts by result)
+    """
+    start_time = time.perf_counter()
+    dependencies = {
+        dependency: load_values(os.path.join(directory, dependency + ".tb"), dependency)
+        for dependency in DEPENDENCIES.get(name, ())
+    }
+    values = TableGenerator(name, dependencies).generate()
+    write_table(os.path.join(directory, name + ".tb"), name, values)
+
+    legal = values != ILLEGAL
+    counts = {
+        "wins": int(((values % 2 == 0) & (values > 0) & legal).sum()),
+        "losses": int(((values % 2 == 1) & legal).sum()),
+        "draws": int((values == 0).sum()),
+        "longest mate": int(values[legal].max()) - 1
+    }
+    return name, time.perf_counter() - start_time, counts
+
+
+def generate_tables(names, directory, workers=None):
+    """
+    Generate tables, solving independent tables in parallel processes
+
+    Args:
+        names: Table names
+        directory: Output directory
+        workers: Number of worker processes (default: CPU count)
+
+    Yields:
+        Tuples (name, seconds, counts) as tables finish
+    """
+    os.makedirs(directory, exist_ok=True)
+    remaining = list(names)
+    for dependency in {dependency for name in names for dependency in DEPENDENCIES.get(name, ())}:
+        if dependency not in remaining and not os.path.exists(os.path.join(directory, dependency + ".tb")):
+            remaining.append(dependency)
+
+    with Pool(workers) as pool:
+        while remaining:
+            # Tables whose dependencies are all written
+            ready = [
+                name for name in remaining
+                if not any(dependency in remaining for dependency in DEPENDENCIES.get(name, ()))
+            ]
+            for name in ready:
+                remaining.remove(name)
+            for result in pool.starmap(generate_table, [(name, directory) for name in ready]):
+                yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate endgame tablebases by retrograde analysis")
+    parser.add_argument("tables", nargs="*", default=list(TABLES), help="tables to generate (default: all)")
+    parser.add_argument("--output", default="tablebases", help="output directory")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    for name in args.tables:
+        if name not in TABLES:
+            parser.error(f"unknown table {name} (choose from {', '.join(TABLES)})")
+
+    for name, seconds, counts in generate_tables(args.tables, args.output, args.workers):
+        print(
+            f"{name}: {counts['wins']} wins, {counts['losses']} losses, {counts['draws']} draws, "
+            f"longest mate {counts['longest mate']} plies ({seconds:.1f}s)",
+            file=sys.stderr
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
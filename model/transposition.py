@@ -0,0 +1,229 @@
+from array import array
+import chess
+
+# Bound types of stored scores (0 marks an empty slot)
+EXACT = 1
+LOWER_BOUND = 2
+UPPER_BOUND = 3
+
+SCORE_OFFSET = 1 << 23
+
+
+def encode_move(move):
+    """
+    Encode a move in 16 bits
+
+    Bits 0-5 hold the from-square, bits 6-11 the to-square and bits 12-14
+    the promotion piece type (0 for none).
+
+    Args:
+        move: python-chess Move, or None
+
+    Returns:
+        Integer move code (0 for None)
+    """
+    if move is None:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code):
+    """
+    Decode a 16-bit move code
+
+    Args:
+        code: Integer move code from encode_move
+
+    Returns:
+        python-chess Move, or None for code 0
+    """
+    if not code:
+        return None
+    return chess.Move(code & 63, (code >> 6) & 63, (code >> 12) & 7 or None)
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by Zobrist key
+
+    Entries live in one preallocated array of 64-bit words. Each bucket
+    holds two slots of (key ^ data, data): a depth-preferred slot that
+    keeps the deepest result of the current search and an always-replace
+    slot for everything else. Storing the key xor-ed with the data lets
+    readers detect torn writes when the buffer is shared between processes.
+
+    Data words pack the move code in bits 0-15, the offset score in bits
+    16-39, the depth in bits 40-47, the bound type in bits 48-49 and the
+    search generation in bits 50-57.
+    """
+
+    BUCKET_WORDS = 4
+    BUCKET_BYTES = BUCKET_WORDS * 8
+
+    # Bytes zeroed at a time by clear()
+    CLEAR_CHUNK_BYTES = 1 << 20
+
+    def __init__(self, size_mb=16, buffer=None):
+        """
+        Initialize the table
+
+        Args:
+            size_mb: Memory cap in megabytes; the table uses the largest
+                power-of-two number of buckets that fits
+            buffer: Optional writable buffer (e.g. shared memory) to hold the
+                entries instead of a private array; it must be zero-filled
+                and a multiple of the bucket size
+        """
+        if buffer is not None:
+            self.table = memoryview(buffer).cast('B').cast('Q')
+            bucket_count = len(self.table) // self.BUCKET_WORDS
+        else:
+            bucket_count = self.get_bucket_count(size_mb)
+            self.table = array('Q', [0]) * (bucket_count * self.BUCKET_WORDS)
+
+        # Power-of-two bucket count so the index is a simple mask
+        self.mask = (1 << (bucket_count.bit_length() - 1)) - 1
+        self.generation = 0
+        self.reset_stats()
+
+    @classmethod
+    def get_bucket_count(cls, size_mb):
+        """
+        Get the number of buckets that fit in a memory cap
+
+        Args:
+            size_mb: Memory cap in megabytes
+
+        Returns:
+            Largest power of two whose buckets fit in size_mb
+        """
+        buckets = max(1, int(size_mb * 1024 * 1024) // cls.BUCKET_BYTES)
+        return 1 << (buckets.bit_length() - 1)
+
+    def reset_stats(self):
+        """Reset the hit, miss and collision counters"""
+        self.probes = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def clear(self):
+        """Remove every entry"""
+        # Zeroed in place, so a table in shared memory stays shared, and in
+        # chunks, so a large table is not matched by a second zero buffer
+        table_bytes = memoryview(self.table).cast('B')
+        zeros = bytes(min(len(table_bytes), self.CLEAR_CHUNK_BYTES))
+        for start in range(0, len(table_bytes), len(zeros)):
+            end = min(start + len(zeros), len(table_bytes))
+            table_bytes[start:end] = zeros[:end - start]
+        self.generation = 0
+        self.reset_stats()
+
+    def new_search(self):
+        """Start a new search generation so older entries age out"""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        """
+        Look up a position
+
+        Args:
+            key: 64-bit Zobrist key
+
+        Returns:
+            Tuple (move code, score, depth, bound type) or None if absent
+        """
+        table = self.table
+        index = (key & self.mask) << 2
+        self.probes += 1
+
+        for slot in (index, index + 2):
+            data = table[slot + 1]
+            if data and table[slot] ^ data == key:
+                self.hits += 1
+                return (
+                    data & 0xFFFF,
+                    ((data >> 16) & 0xFFFFFF) - SCORE_OFFSET,
+                    (data >> 40) & 0xFF,
+                    (data >> 48) & 3
+                )
+
+        self.misses += 1
+        if table[index + 1] or table[index + 3]:
+            # The bucket is in use by other positions
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, bound, move_code):
+        """
+        Store a search result
+
+        Args:
+            key: 64-bit Zobrist key
+            depth: Searched depth in plies
+            score: Score in centipawns
+            bound: EXACT, LOWER_BOUND or UPPER_BOUND
+            move_code: Best move encoded with encode_move (0 for none)
+        """
+        table = self.table
+        index = (key & self.mask) << 2
+        depth = max(0, min(depth, 255))
+        data = (
+            move_code |
+            ((score + SCORE_OFFSET) << 16) |
+            (depth << 40) |
+            (bound << 48) |
+            (self.generation << 50)
+        )
+        self.stores += 1
+
+        old_data = table[index + 1]
+        old_key = table[index] ^ old_data
+        if old_data and old_key != key and (
+            depth < (old_data >> 40) & 0xFF and
+            (old_data >> 50) == self.generation
+        ):
+            # Keep the deeper entry and use the always-replace slot
+            table[index + 2] = key ^ data
+            table[index + 3] = data
+            return
+
+        if old_data and old_key != key:
+            # Demote the previous depth-preferred entry
+            table[index + 2] = table[index]
+            table[index + 3] = old_data
+        table[index] = key ^ data
+        table[index + 1] = data
+
+    def get_fill(self):
+        """
+        Estimate how full the table is
+
+        Returns:
+            Permille of sampled slots used by the current generation
+        """
+        table = self.table
+        slots = min(1000, len(table) // 2)
+        used = 0
+        for slot in range(slots):
+            data = table[slot * 2 + 1]
+            if data and (data >> 50) == self.generation:
+                used += 1
+        return used * 1000 // slots
+
+    def get_stats(self):
+        """
+        Get the usage counters
+
+        Returns:
+            Dictionary of probes, hits, misses, collisions, stores and fill
+        """
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "fill": self.get_fill()
+        }
\ No newline at end of file
@@ -0,0 +1,120 @@
+import chess
+from chess.polyglot import POLYGLOT_RANDOM_ARRAY
+
+# Random numbers per color, piece type and square, in Polyglot layout
+PIECE_KEYS = [
+    [
+        [0] * 64 if piece_type == 0 else [
+            POLYGLOT_RANDOM_ARRAY[64 * (2 * (piece_type - 1) + color) + square]
+            for square in chess.SQUARES
+        ]
+        for piece_type in range(7)
+    ]
+    for color in (chess.BLACK, chess.WHITE)
+]
+CASTLING_KEYS = (
+    (chess.BB_H1, POLYGLOT_RANDOM_ARRAY[768]),
+    (chess.BB_A1, POLYGLOT_RANDOM_ARRAY[769]),
+    (chess.BB_H8, POLYGLOT_RANDOM_ARRAY[770]),
+    (chess.BB_A8, POLYGLOT_RANDOM_ARRAY[771])
+)
+EP_KEYS = POLYGLOT_RANDOM_ARRAY[772:780]
+TURN_KEY = POLYGLOT_RANDOM_ARRAY[780]
+
+BB_CORNERS = chess.BB_A1 | chess.BB_H1 | chess.BB_A8 | chess.BB_H8
+
+
+def castling_key(castling_rights):
+    """
+    Get the hash contribution of a set of castling rights
+
+    Args:
+        castling_rights: python-chess castling rights bitboard
+
+    Returns:
+        64-bit hash contribution
+    """
+    key = 0
+    for mask, random in CASTLING_KEYS:
+        if castling_rights & mask:
+            key ^= random
+    return key
+
+
+def zobrist_key(chess_board):
+    """
+    Compute the Zobrist key of a position from scratch
+
+    The key uses the Polyglot random numbers, but hashes the en passant
+    file whenever an en passant square is set so that it can be updated
+    incrementally with zobrist_key_after.
+
+    Args:
+        chess_board: python-chess Board
+
+    Returns:
+        64-bit integer key
+    """
+    key = TURN_KEY if chess_board.turn == chess.WHITE else 0
+    for square, piece in chess_board.piece_map().items():
+        key ^= PIECE_KEYS[piece.color][piece.piece_type][square]
+    key ^= castling_key(chess_board.castling_rights & BB_CORNERS)
+    if chess_board.ep_square is not None:
+        key ^= EP_KEYS[chess.square_file(chess_board.ep_square)]
+    return key
+
+
+def zobrist_key_after(chess_board, key, move):
+    """
+    Compute the Zobrist key of the position after a move
+
+    Args:
+        chess_board: python-chess Board before the move is pushed
+        key: Zobrist key of the current position
+        move: Legal python-chess Move
+
+    Returns:
+        64-bit integer key of the resulting position
+    """
+    color = chess_board.turn
+    from_square = move.from_square
+    to_square = move.to_square
+    piece_type = chess_board.piece_type_at(from_square)
+    own_keys = PIECE_KEYS[color]
+
+    key ^= TURN_KEY
+    if chess_board.ep_square is not None:
+        key ^= EP_KEYS[chess.square_file(chess_board.ep_square)]
+
+    key ^= own_keys[piece_type][from_square]
+    castling_rights = chess_board.castling_rights & BB_CORNERS
+    new_rights = castling_rights & ~chess.BB_SQUARES[from_square] & ~chess.BB_SQUARES[to_square]
+
+    if piece_type == chess.KING:
+        new_rights &= ~(chess.BB_RANK_1 if color == chess.WHITE else chess.BB_RANK_8)
+
+        if chess_board.is_castling(move):
+            # The rook jumps to the other side of the king
+            rank_start = from_square & ~7
+            if to_square > from_square:
+                key ^= own_keys[chess.ROOK][rank_start + 7] ^ own_keys[chess.ROOK][rank_start + 5]
+            else:
+                key ^= own_keys[chess.ROOK][rank_start] ^ own_keys[chess.ROOK][rank_start + 3]
+            key ^= own_keys[chess.KING][to_square]
+            return key ^ castling_key(castling_rights) ^ castling_key(new_rights)
+
+    captured = chess_board.piece_type_at(to_square)
+    if captured:
+        key ^= PIECE_KEYS[not color][captured][to_square]
+    elif piece_type == chess.PAWN and to_square == chess_board.ep_square:
+        captured_square = to_square - 8 if color == chess.WHITE else to_square + 8
+        key ^= PIECE_KEYS[not color][chess.PAWN][captured_square]
+
+    key ^= own_keys[move.promotion or piece_type][to_square]
+
+    if piece_type == chess.PAWN and abs(to_square - from_square) == 16:
+        key ^= EP_KEYS[chess.square_file(from_square)]
+
+    if new_rights != castling_rights:
+        key ^= castling_key(castling_rights) ^ castling_key(new_rights)
+    return key
\ No newline at end of file
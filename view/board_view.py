@@ -1,4 +1,5 @@
 import pygame
+from view.sprite_atlas import SpriteAtlas
 
 class BoardView:
     """Handles rendering of the chess board"""
@@ -8,9 +9,13 @@ class BoardView:
     GRAY = (128, 128, 128)
     YELLOW = (204, 204, 0)
     BLUE = (50, 255, 255)
+    GREEN = (0, 170, 0)
     BLACK = (0, 0, 0)
+    ARROW_COLOR = (255, 140, 0, 170)
+    EVAL_WHITE = (240, 240, 240)
+    EVAL_BLACK = (30, 30, 30)
     
-    def __init__(self, screen, square_size, dimension=8):
+    def __init__(self, screen, square_size, dimension=8, atlas=None):
         """
         Initialize the board view
         
@@ -18,27 +23,48 @@ class BoardView:
             screen: Pygame screen to draw on
             square_size: Size of a square on the board in pixels
             dimension: Board dimension (default: 8x8)
+            atlas: SpriteAtlas to take the board background from (default:
+                a private one)
+        """
+        self.dimension = dimension
+        self.atlas = atlas or SpriteAtlas((self.WHITE, self.GRAY), dimension)
+        self.set_geometry(screen, square_size)
+    
+    def set_geometry(self, screen, square_size):
+        """
+        Switch to another screen or square size, e.g. after a resize
+        
+        Args:
+            screen: Pygame screen to draw on
+            square_size: Size of a square on the board in pixels
         """
         self.screen = screen
         self.square_size = square_size
-        self.dimension = dimension
+        self.background = self.atlas.get(square_size).background
     
     def draw_squares(self):
         """Draw the chess board squares"""
-        colors = [self.WHITE, self.GRAY]
-        for row in range(self.dimension):
-            for col in range(self.dimension):
-                color = colors[(row + col) % 2]
-                pygame.draw.rect(
-                    self.screen,
-                    color,
-                    pygame.Rect(
-                        col * self.square_size,
-                        row * self.square_size,
-                        self.square_size,
-                        self.square_size
-                    )
-                )
+        self.screen.blit(self.background, (0, 0))
+    
+    def draw_square(self, row, col):
+        """
+        Draw a single board square
+        
+        Args:
+            row: Board row (0-7)
+            col: Board column (0-7)
+            
+        Returns:
+            pygame.Rect covering the drawn square
+        """
+        rect = pygame.Rect(
+            col * self.square_size,
+            row * self.square_size,
+            self.square_size,
+            self.square_size
+        )
+        self.screen.blit(self.background, rect, rect)
+        return rect
     
     def highlight_square(self, row, col, color=YELLOW, border_width=2):
         """
@@ -62,17 +88,130 @@ class BoardView:
             border_width
         )
     
-    def highlight_selected_and_moves(self, selected_square, legal_moves):
+    def get_highlight_colors(self, selected_square, legal_moves, book_moves=()):
         """
-        Highlight the selected square and legal moves
+        Get the highlight color of every highlighted square
         
         Args:
             selected_square: Tuple (row, col) of selected square or None
             legal_moves: List of tuples (row, col) for legal moves
+            book_moves: Tuples (row, col) of legal moves that are also
+                opening book moves
+            
+        Returns:
+            Dictionary mapping (row, col) to an RGB color tuple
         """
+        highlights = {}
         if selected_square:
-            row, col = selected_square
-            self.highlight_square(row, col, self.YELLOW)
+            for move in legal_moves:
+                highlights[move] = self.BLUE
+            for move in book_moves:
+                highlights[move] = self.GREEN
+            highlights[selected_square] = self.YELLOW
+        return highlights
+    
+    def highlight_selected_and_moves(self, selected_square, legal_moves, book_moves=()):
+        """
+        Highlight the selected square, legal moves and book moves
+        
+        Args:
+            selected_square: Tuple (row, col) of selected square or None
+            legal_moves: List of tuples (row, col) for legal moves
+            book_moves: Tuples (row, col) of legal moves that are also
+                opening book moves
+        """
+        highlights = self.get_highlight_colors(selected_square, legal_moves, book_moves)
+        for (row, col), color in highlights.items():
+            self.highlight_square(row, col, color)
+    
+    def get_square_rect(self, row, col):
+        """Get the pygame.Rect of a board square"""
+        return pygame.Rect(
+            col * self.square_size,
+            row * self.square_size,
+            self.square_size,
+            self.square_size
+        )
+    
+    def get_arrow_rect(self, from_square, to_square):
+        """
+        Get the area covered by an arrow between two squares
+        
+        Args:
+            from_square: Tuple (row, col) where the arrow starts
+            to_square: Tuple (row, col) where the arrow points
             
-            for move_row, move_col in legal_moves:
-                self.highlight_square(move_row, move_col, self.BLUE)
\ No newline at end of file
+        Returns:
+            pygame.Rect spanning both squares
+        """
+        return self.get_square_rect(*from_square).union(self.get_square_rect(*to_square))
+    
+    def draw_arrow(self, from_square, to_square, color=ARROW_COLOR):
+        """
+        Draw a translucent arrow between the centers of two squares
+        
+        The arrow is blended over what is already drawn, so the squares
+        below it must be repainted before it is drawn again.
+        
+        Args:
+            from_square: Tuple (row, col) where the arrow starts
+            to_square: Tuple (row, col) where the arrow points
+            color: RGBA color tuple of the arrow
+            
+        Returns:
+            pygame.Rect covering the arrow
+        """
+        rect = self.get_arrow_rect(from_square, to_square)
+        half = self.square_size / 2
+        start = pygame.Vector2(from_square[1] * self.square_size + half - rect.left,
+                               from_square[0] * self.square_size + half - rect.top)
+        end = pygame.Vector2(to_square[1] * self.square_size + half - rect.left,
+                             to_square[0] * self.square_size + half - rect.top)
+        direction = end - start
+        if not direction.length():
+            return rect
+        direction.scale_to_length(1)
+        normal = pygame.Vector2(-direction.y, direction.x)
+        
+        # Shaft and head are one polygon, so the overlap is not blended twice
+        shaft = self.square_size * 0.08
+        head_width = self.square_size * 0.22
+        head_length = min(self.square_size * 0.4, (end - start).length())
+        neck = end - direction * head_length
+        points = [
+            start + normal * shaft, neck + normal * shaft, neck + normal * head_width,
+            end, neck - normal * head_width, neck - normal * shaft, start - normal * shaft
+        ]
+        
+        surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+        pygame.draw.polygon(surface, color, points)
+        self.screen.blit(surface, rect)
+        return rect
+    
+    def draw_eval_bar(self, rect, white_score, mate=False):
+        """
+        Draw an evaluation bar, white's share growing from the bottom
+        
+        Args:
+            rect: pygame.Rect of the bar in window coordinates
+            white_score: Score in centipawns from white's point of view
+            mate: True if the score announces a forced mate
+            
+        Returns:
+            pygame.Rect of the bar
+        """
+        if mate:
+            white_share = 1.0 if white_score > 0 else 0.0
+        else:
+            # Expected result for white, as in the Elo formula
+            white_share = 1 / (1 + 10 ** (-white_score / 400))
+        white_height = round(rect.height * white_share)
+        
+        self.screen.fill(self.EVAL_BLACK, rect)
+        self.screen.fill(
+            self.EVAL_WHITE,
+            pygame.Rect(rect.left, rect.bottom - white_height, rect.width, white_height)
+        )
+        # Mark the level of an equal position
+        pygame.draw.line(self.screen, self.GRAY, (rect.left, rect.centery), (rect.right - 1, rect.centery))
+        return rect
\ No newline at end of file
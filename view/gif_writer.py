@@ -0,0 +1,192 @@
+import struct
+import numpy as np
+import pygame
+
+# Palette: a 6x6x6 color cube, a ramp of 36 grays for the anti-aliased
+# piece edges, up to RESERVED_COLORS exact colors for the board and the
+# transparent index that marks pixels left as the previous frame had them
+CUBE_LEVELS = 6
+GRAY_LEVELS = 36
+TRANSPARENT = 255
+RESERVED_COLORS = TRANSPARENT - CUBE_LEVELS ** 3 - GRAY_LEVELS
+
+# LZW codes are at most 12 bits wide
+MAX_CODE = 4096
+
+
+class GifWriter:
+    """
+    Writes an animated GIF frame by frame, without Pillow
+
+    Frames are quantized to one fixed palette, so no colors need to be
+    collected first and every frame can be written as soon as it is drawn.
+    Each frame is cropped to the pixels that differ from the previous one,
+    and unchanged pixels inside the crop are transparent, so replaying a
+    game only encodes what each move changed.
+    """
+
+    def __init__(self, path, size, exact_colors=(), loop=True):
+        """
+        Open the file and write the GIF header
+
+        Args:
+            path: Path of the GIF file
+            size: Tuple (width, height) of the image in pixels
+            exact_colors: RGB colors reproduced exactly, such as the board
+                square colors (at most RESERVED_COLORS)
+            loop: Repeat the animation forever
+        """
+        if len(exact_colors) > RESERVED_COLORS:
+            raise ValueError(f"At most {RESERVED_COLORS} exact colors are supported")
+        self.size = size
+        self.exact_colors = list(exact_colors)
+        self.indexes = None
+        self.gif_file = open(path, 'wb')
+
+        palette = [
+            (red * 51, green * 51, blue * 51)
+            for red in range(CUBE_LEVELS) for green in range(CUBE_LEVELS) for blue in range(CUBE_LEVELS)
+        ]
+        palette += [(round(level * 255 / (GRAY_LEVELS - 1)),) * 3 for level in range(GRAY_LEVELS)]
+        palette += self.exact_colors
+        palette += [(0, 0, 0)] * (256 - len(palette))
+
+        # Logical screen with a 256-color global palette
+        self.gif_file.write(b'GIF89a' + struct.pack('<HHBBB', size[0], size[1], 0xF7, 0, 0))
+        self.gif_file.write(bytes(channel for color in palette for channel in color))
+        if loop:
+            self.gif_file.write(b'\x21\xFF\x0BNETSCAPE2.0\x03\x01' + struct.pack('<H', 0) + b'\x00')
+
+    def add_frame(self, surface, delay_ms, rect=None):
+        """
+        Append a frame
+
+        Args:
+            surface: pygame Surface of the whole image
+            delay_ms: Time the frame is shown in milliseconds
+            rect: pygame.Rect outside of which the image is known not to
+                have changed since the previous frame (default: anywhere)
+        """
+        width, height = self.size
+        if self.indexes is None or rect is None:
+            rect = pygame.Rect(0, 0, width, height)
+        pixels = pygame.image.tobytes(surface.subsurface(rect), 'RGB')
+        indexes = self._quantize(np.frombuffer(pixels, np.uint8).reshape(-1, 3)).reshape(rect.height, rect.width)
+
+        if self.indexes is None:
+            self.indexes = indexes
+            frame = indexes
+            left = top = 0
+        else:
+            # Crop to the changed pixels and let the rest show through
+            previous = self.indexes[rect.top:rect.bottom, rect.left:rect.right]
+            changed = indexes != previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0))
+            if not len(rows):
+                # Nothing changed; a single transparent pixel carries the delay
+                rows = cols = np.zeros(1, np.intp)
+            crop = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+            frame = np.where(changed[crop], indexes[crop], TRANSPARENT).astype(np.uint8)
+            previous[changed] = indexes[changed]
+            left = rect.left + int(cols[0])
+            top = rect.top + int(rows[0])
+
+        # Graphic control extension: keep the frame in place for the next
+        # one and treat TRANSPARENT as transparent
+        self.gif_file.write(b'\x21\xF9\x04\x05' + struct.pack('<HB', round(delay_ms / 10), TRANSPARENT) + b'\x00')
+        frame_height, frame_width = frame.shape
+        self.gif_file.write(b'\x2C' + struct.pack('<HHHHB', left, top, frame_width, frame_height, 0))
+        self.gif_file.write(b'\x08')
+        data = _lzw_compress(np.ascontiguousarray(frame).tobytes())
+        for start in range(0, len(data), 255):
+            block = data[start:start + 255]
+            self.gif_file.write(bytes((len(block),)) + block)
+        self.gif_file.write(b'\x00')
+
+    def _quantize(self, rgb):
+        """Map an array of RGB pixels to palette indexes"""
+        levels = (rgb.astype(np.uint16) * (CUBE_LEVELS - 1) + 127) // 255
+        indexes = (levels[:, 0] * CUBE_LEVELS + levels[:, 1]) * CUBE_LEVELS + levels[:, 2]
+
+        red, green, blue = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+        gray = (red == green) & (green == blue)
+        gray_levels = (red[gray].astype(np.uint16) * (GRAY_LEVELS - 1) + 127) // 255
+        indexes[gray] = CUBE_LEVELS ** 3 + gray_levels
+
+        for offset, color in enumerate(self.exact_colors):
+            indexes[(red == color[0]) & (green == color[1]) & (blue == color[2])] = TRANSPARENT - RESERVED_COLORS + offset
+        return indexes.astype(np.uint8)
+
+    def close(self):
+        """Write the trailer and close the file"""
+        if self.gif_file:
+            self.gif_file.write(b'\x3B')
+            self.gif_file.close()
+            self.gif_file = None
+
+
+def _lzw_compress(data):
+    """
+    Compress 8-bit palette indexes with the variable-width LZW of GIF
+
+    Args:
+        data: Bytes of palette indexes
+
+    Returns:
+        Compressed bytes, before splitting into sub-blocks
+    """
+    clear_code = 256
+    end_code = clear_code + 1
+    output = bytearray()
+    bit_buffer = 0
+    bit_count = 0
+    code_size = 9
+    next_code = end_code + 1
+    table = {}
+    lookup = table.get
+
+    # Start with a clear code, as decoders expect
+    bit_buffer |= clear_code << bit_count
+    bit_count += code_size
+
+    prefix = data[0]
+    for index in data[1:]:
+        key = prefix << 8 | index
+        code = lookup(key)
+        if code is not None:
+            prefix = code
+            continue
+
+        bit_buffer |= prefix << bit_count
+        bit_count += code_size
+        while bit_count >= 8:
+            output.append(bit_buffer & 0xFF)
+            bit_buffer >>= 8
+            bit_count -= 8
+        # Codes widen once the next one no longer fits
+        if next_code >= 1 << code_size and code_size < 12:
+            code_size += 1
+
+        if next_code < MAX_CODE:
+            table[key] = next_code
+            next_code += 1
+        else:
+            # Table full: start over with a clear code at the current width
+            bit_buffer |= clear_code << bit_count
+            bit_count += code_size
+            table.clear()
+            code_size = 9
+            next_code = end_code + 1
+        prefix = index
+
+    for code in (prefix, end_code):
+        bit_buffer |= code << bit_count
+        bit_count += code_size
+        if next_code >= 1 << code_size and code_size < 12:
+            code_size += 1
+    while bit_count > 0:
+        output.append(bit_buffer & 0xFF)
+        bit_buffer >>= 8
+        bit_count -= 8
+    return bytes(output)
\ No newline at end of file
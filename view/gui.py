@@ -1,29 +1,466 @@
 import pygame
 
+class LazyFont:
+    """
+    System font looked up on first use
+    
+    Finding a system font can scan every installed font, so it is left
+    until text is actually drawn instead of delaying the first frame.
+    """
+    
+    def __init__(self, name, point_size):
+        """
+        Initialize the font reference
+        
+        Args:
+            name: System font name
+            point_size: Font size
+        """
+        self.name = name
+        self.point_size = point_size
+        self.font = None
+    
+    def get(self):
+        """Get the pygame Font, loading it (and the font module) if needed"""
+        if self.font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self.font = pygame.font.SysFont(self.name, self.point_size)
+        return self.font
+    
+    def render(self, text, antialias, color):
+        """Render text like pygame.font.Font.render"""
+        return self.get().render(text, antialias, color)
+    
+    def size(self, text):
+        """Get the rendered size of text like pygame.font.Font.size"""
+        return self.get().size(text)
+    
+    def get_linesize(self):
+        """Get the line height like pygame.font.Font.get_linesize"""
+        return self.get().get_linesize()
+
+
+class MoveListPanel:
+    """Scrolling list of the moves played, drawn beside the board"""
+    
+    BACKGROUND_COLOR = (40, 40, 40)
+    TEXT_COLOR = (230, 230, 230)
+    PADDING = 8
+    
+    def __init__(self, rect, font):
+        """
+        Initialize the panel
+        
+        Args:
+            rect: pygame.Rect of the panel in window coordinates
+            font: pygame Font used for the move lines
+        """
+        self.font = font
+        
+        # Rendered text of every move pair, cached between frames
+        self.line_surfaces = []
+        self.synced_log = []
+        self.first_line = 0
+        self.follow = True
+        self.set_rect(rect)
+    
+    def sync(self, san_log):
+        """
+        Bring the cached lines up to date with a SAN move log
+        
+        Only the lines from the first differing move onwards are rendered
+        again, so appending a move costs one line however long the game is.
+        
+        Args:
+            san_log: List of SAN moves played so far
+            
+        Returns:
+            True if the panel content changed
+        """
+        synced = self.synced_log
+        if len(san_log) == len(synced) and san_log == synced:
+            return False
+        
+        # Length of the unchanged prefix
+        common = min(len(san_log), len(synced))
+        if san_log[:common] != synced[:common]:
+            common = next(
+                index for index in range(common)
+                if san_log[index] != synced[index]
+            )
+        
+        first_changed = common // 2
+        del self.line_surfaces[first_changed:]
+        for line in range(first_changed, (len(san_log) + 1) // 2):
+            text = f"{line + 1}. " + " ".join(san_log[2 * line:2 * line + 2])
+            self.line_surfaces.append(self.font.render(text, True, self.TEXT_COLOR))
+        self.synced_log = list(san_log)
+        
+        if self.follow:
+            self.first_line = self._get_last_first_line()
+        else:
+            self.first_line = min(self.first_line, self._get_last_first_line())
+        return True
+    
+    def set_rect(self, rect):
+        """
+        Move or resize the panel, keeping the rendered lines
+        
+        Args:
+            rect: pygame.Rect of the panel in window coordinates
+        """
+        self.rect = rect
+        if self.follow:
+            self.first_line = self._get_last_first_line()
+        else:
+            self.first_line = min(self.first_line, self._get_last_first_line())
+    
+    @property
+    def visible_lines(self):
+        """Get the number of lines that fit on the panel"""
+        return max(1, (self.rect.height - 2 * self.PADDING) // self.font.get_linesize())
+    
+    def _get_last_first_line(self):
+        """Get the first visible line when scrolled to the bottom"""
+        if not self.line_surfaces:
+            # Spares loading the font while the list is empty
+            return 0
+        return max(0, len(self.line_surfaces) - self.visible_lines)
+    
+    def scroll(self, lines):
+        """
+        Scroll the list
+        
+        Args:
+            lines: Number of lines to scroll down (negative scrolls up)
+            
+        Returns:
+            True if the visible lines changed
+        """
+        last = self._get_last_first_line()
+        first_line = max(0, min(self.first_line + lines, last))
+        # Keep following new moves only while scrolled to the bottom
+        self.follow = first_line == last
+        if first_line == self.first_line:
+            return False
+        self.first_line = first_line
+        return True
+    
+    def contains(self, pos):
+        """Check if a window position lies on the panel"""
+        return self.rect.collidepoint(pos)
+    
+    def draw(self, screen):
+        """
+        Draw the visible lines from the cached surfaces
+        
+        Args:
+            screen: Pygame surface to draw on
+            
+        Returns:
+            pygame.Rect of the panel
+        """
+        screen.fill(self.BACKGROUND_COLOR, self.rect)
+        if not self.line_surfaces:
+            return self.rect
+        y = self.rect.top + self.PADDING
+        line_height = self.font.get_linesize()
+        visible = self.line_surfaces[self.first_line:self.first_line + self.visible_lines]
+        for surface in visible:
+            screen.blit(surface, (self.rect.left + self.PADDING, y))
+            y += line_height
+        return self.rect
+
+
+class ExplorerPanel:
+    """Moves played from the current position in indexed games, with results"""
+    
+    BACKGROUND_COLOR = (28, 28, 28)
+    TEXT_COLOR = (230, 230, 230)
+    HEADER_COLOR = (255, 204, 0)
+    WHITE_COLOR = (235, 235, 235)
+    DRAW_COLOR = (140, 140, 140)
+    BLACK_COLOR = (10, 10, 10)
+    PADDING = 8
+    BAR_HEIGHT = 6
+    
+    def __init__(self, rect, font):
+        """
+        Initialize the panel
+        
+        Args:
+            rect: pygame.Rect of the panel in window coordinates
+            font: pygame Font used for the rows
+        """
+        self.font = font
+        self.line_height = font.get_linesize()
+        self.title_surface = font.render("No games", True, self.HEADER_COLOR)
+        self.rows = []
+        self.set_rect(rect)
+    
+    def set_rect(self, rect):
+        """
+        Move or resize the panel
+        
+        Args:
+            rect: pygame.Rect of the panel in window coordinates
+        """
+        self.rect = rect
+        self.visible_rows = max(0, (rect.height - 2 * self.PADDING) // self.line_height - 1)
+    
+    def set_moves(self, total, moves):
+        """
+        Show the statistics of a position
+        
+        Args:
+            total: Number of games reaching the position
+            moves: List of tuples (SAN, games, white wins, draws, black
+                wins), most played first
+        """
+        self.title_surface = self.font.render(
+            f"{total} games" if total else "No games", True, self.HEADER_COLOR
+        )
+        self.rows = []
+        for san, games, white_wins, draws, black_wins in moves:
+            # Rendered once here, not on every draw
+            self.rows.append((
+                self.font.render(san, True, self.TEXT_COLOR),
+                self.font.render(str(games), True, self.TEXT_COLOR),
+                (white_wins, draws, black_wins)
+            ))
+    
+    def draw(self, screen):
+        """
+        Draw the panel
+        
+        Args:
+            screen: Pygame surface to draw on
+            
+        Returns:
+            pygame.Rect of the panel
+        """
+        screen.fill(self.BACKGROUND_COLOR, self.rect)
+        left = self.rect.left + self.PADDING
+        width = self.rect.width - 2 * self.PADDING
+        y = self.rect.top + self.PADDING
+        screen.blit(self.title_surface, (left, y))
+        
+        # Columns: move, game count and a white/draw/black result bar
+        count_left = left + width // 4
+        bar_left = left + width // 2
+        bar_width = width - width // 2
+        for san_surface, count_surface, results in self.rows[:self.visible_rows]:
+            y += self.line_height
+            screen.blit(san_surface, (left, y))
+            screen.blit(count_surface, (count_left, y))
+            
+            finished = sum(results)
+            if finished:
+                bar_top = y + (self.line_height - self.BAR_HEIGHT) // 2
+                x = bar_left
+                for count, color in zip(results, (self.WHITE_COLOR, self.DRAW_COLOR, self.BLACK_COLOR)):
+                    segment = round(bar_width * count / finished)
+                    screen.fill(color, pygame.Rect(x, bar_top, min(segment, bar_left + bar_width - x), self.BAR_HEIGHT))
+                    x += segment
+        return self.rect
+
+
+class ProfilerOverlay:
+    """Table of frame phase timings drawn over the board"""
+    
+    BACKGROUND_COLOR = (0, 0, 0)
+    BACKGROUND_ALPHA = 200
+    TEXT_COLOR = (230, 230, 230)
+    HEADER_COLOR = (255, 204, 0)
+    PADDING = 6
+    COLUMNS = ("p50", "p95", "p99", "max")
+    REFRESH_INTERVAL = 0.5
+    
+    def __init__(self, font, phases, position=(4, 4)):
+        """
+        Initialize the overlay
+        
+        Args:
+            font: pygame Font used for the table
+            phases: Names of the phases shown, one per row
+            position: Tuple (x, y) of the top-left corner in the window
+        """
+        self.font = font
+        self.phases = phases
+        self.line_height = font.get_linesize()
+        
+        # Fixed column widths keep the overlay the same size every refresh
+        self.name_width = max(font.size(phase)[0] for phase in phases) + self.PADDING
+        self.column_width = font.size("0000.00")[0] + self.PADDING
+        width = self.name_width + self.column_width * len(self.COLUMNS) + self.PADDING
+        height = self.line_height * (len(phases) + 1) + 2 * self.PADDING
+        self.rect = pygame.Rect(position, (width, height))
+        
+        self.surface = None
+        self.rendered_at = None
+    
+    def _render(self, summary):
+        """
+        Render the table
+        
+        Args:
+            summary: Dictionary mapping phase names to timing summaries
+                from FrameProfiler.summarize
+        """
+        surface = pygame.Surface(self.rect.size)
+        surface.fill(self.BACKGROUND_COLOR)
+        surface.set_alpha(self.BACKGROUND_ALPHA)
+        
+        y = self.PADDING
+        surface.blit(self.font.render("ms", True, self.HEADER_COLOR), (self.PADDING, y))
+        for index, column in enumerate(self.COLUMNS):
+            x = self.PADDING + self.name_width + index * self.column_width
+            surface.blit(self.font.render(column, True, self.HEADER_COLOR), (x, y))
+        
+        for phase in self.phases:
+            y += self.line_height
+            values = summary.get(phase, {})
+            surface.blit(self.font.render(phase, True, self.TEXT_COLOR), (self.PADDING, y))
+            for index, column in enumerate(self.COLUMNS):
+                value = values.get(column + "_ms")
+                text = f"{value:.2f}" if value is not None else "-"
+                x = self.PADDING + self.name_width + index * self.column_width
+                surface.blit(self.font.render(text, True, self.TEXT_COLOR), (x, y))
+        
+        self.surface = surface
+    
+    def draw(self, screen, profiler):
+        """
+        Draw the overlay, refreshing the numbers at most every
+        REFRESH_INTERVAL seconds
+        
+        Args:
+            screen: Pygame surface to draw on
+            profiler: FrameProfiler whose timings are shown
+        
+        Returns:
+            pygame.Rect of the overlay
+        """
+        now = profiler.now()
+        if self.surface is None or now - self.rendered_at >= self.REFRESH_INTERVAL:
+            self._render(profiler.summarize())
+            self.rendered_at = now
+        screen.blit(self.surface, self.rect)
+        return self.rect
+
+
 class ChessGUI:
     """Main GUI handler for the chess application"""
     
-    def __init__(self, width, height, dimension=8):
+    MIN_SQUARE_SIZE = 16
+    EVAL_BAR_WIDTH = 12
+    EXPLORER_HEIGHT_FRACTION = 0.45
+    
+    def __init__(self, width, height, dimension=8, panel_width=0, resizable=False):
         """
         Initialize the GUI
         
         Args:
-            width: Window width in pixels
+            width: Window width in pixels, including the move list panel
             height: Window height in pixels
             dimension: Board dimension (default: 8x8)
+            panel_width: Width of the move list panel right of the board,
+                or 0 for no panel
+            resizable: Let the user resize the window
         """
-        self.width = width
-        self.height = height
         self.dimension = dimension
-        self.square_size = min(width, height) // dimension
+        self.panel_width = panel_width
+        self.display_flags = pygame.RESIZABLE if resizable else 0
         
-        # Initialize pygame
-        pygame.init()
-        self.screen = pygame.display.set_mode((width, height))
+        # Initialize only the display; pygame.init() would also start audio
+        # and joystick support that is never used. Fonts load on first use.
+        pygame.display.init()
         pygame.display.set_caption("Chess")
-        self.font = pygame.font.SysFont("Arial", 32)
-        self.small_font = pygame.font.SysFont("Arial", 16)
+        self.font = LazyFont("Arial", 32)
+        self.small_font = LazyFont("Arial", 16)
         self.clock = pygame.time.Clock()
+        
+        self.move_list = None
+        self.eval_bar_rect = None
+        self.show_eval_bar = False
+        self.explorer = None
+        self.show_explorer = False
+        self.resize(width, height)
+    
+    def resize(self, width, height):
+        """
+        Set the window size and recompute the board layout
+        
+        Args:
+            width: Window width in pixels, including the move list panel
+            height: Window height in pixels
+        """
+        self.square_size = max(
+            self.MIN_SQUARE_SIZE,
+            min(width - self.panel_width, height) // self.dimension
+        )
+        board_size = self.square_size * self.dimension
+        self.width = max(width, board_size + self.panel_width)
+        self.height = max(height, board_size)
+        self.screen = pygame.display.set_mode((self.width, self.height), self.display_flags)
+        self._layout_side()
+    
+    def _layout_side(self):
+        """Place the evaluation bar, the move list and the explorer right of the board"""
+        board_size = self.square_size * self.dimension
+        left = board_size
+        self.eval_bar_rect = None
+        if self.show_eval_bar:
+            if self.panel_width:
+                self.eval_bar_rect = pygame.Rect(left, 0, self.EVAL_BAR_WIDTH, self.height)
+                left += self.EVAL_BAR_WIDTH
+            else:
+                # Without a panel the bar covers the left edge of the board
+                self.eval_bar_rect = pygame.Rect(0, 0, self.EVAL_BAR_WIDTH, board_size)
+        
+        if self.panel_width:
+            # The panel takes all the remaining width right of the board,
+            # the explorer its lower part
+            panel_rect = pygame.Rect(left, 0, self.width - left, self.height)
+            if self.show_explorer:
+                explorer_height = int(self.height * self.EXPLORER_HEIGHT_FRACTION)
+                panel_rect.height -= explorer_height
+                explorer_rect = pygame.Rect(left, panel_rect.bottom, panel_rect.width, explorer_height)
+                if self.explorer:
+                    self.explorer.set_rect(explorer_rect)
+                else:
+                    self.explorer = ExplorerPanel(explorer_rect, self.small_font)
+            
+            if self.move_list:
+                self.move_list.set_rect(panel_rect)
+            else:
+                self.move_list = MoveListPanel(panel_rect, self.small_font)
+    
+    def set_eval_bar_visible(self, visible):
+        """
+        Show or hide the evaluation bar
+        
+        Args:
+            visible: True to make room for the bar
+        """
+        self.show_eval_bar = visible
+        self._layout_side()
+    
+    def set_explorer_visible(self, visible):
+        """
+        Show or hide the opening explorer below the move list
+        
+        Args:
+            visible: True to make room for the explorer (needs a panel)
+        """
+        self.show_explorer = visible and bool(self.panel_width)
+        self._layout_side()
+    
+    def load_fonts(self):
+        """Load the fonts now, e.g. while idle after the first frame"""
+        self.font.get()
+        self.small_font.get()
     
     def get_clicked_position(self, mouse_pos):
         """
@@ -67,9 +504,31 @@ class ChessGUI:
             restart_rect = restart_text.get_rect(center=(self.width//2, self.height//2 + 40))
             self.screen.blit(restart_text, restart_rect)
     
-    def update_display(self):
-        """Update the display"""
-        pygame.display.flip()
+    def update_display(self, rects=None):
+        """
+        Update the display
+        
+        Args:
+            rects: List of pygame.Rect areas to push to the screen,
+                or None to flip the whole display
+        """
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+    
+    def set_caption(self, caption):
+        """
+        Set the window title
+        
+        Args:
+            caption: Title text
+        """
+        pygame.display.set_caption(caption)
+    
+    def post_wakeup_event(self):
+        """Wake up an event loop waiting for input (safe from any thread)"""
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT))
     
     def tick(self, fps):
         """Control the frame rate"""
@@ -1,39 +1,38 @@
 import pygame
-import os
-import chess
+from view.sprite_atlas import SpriteAtlas
 
 class PieceView:
     """Handles rendering of chess pieces"""
     
-    def __init__(self, square_size):
+    def __init__(self, square_size, atlas=None):
         """
         Initialize the piece view
         
         Args:
             square_size: Size of a square on the board in pixels
+            atlas: SpriteAtlas to take the piece images from (default: a
+                private one)
         """
-        self.square_size = square_size
-        self.images = {}
-        self.load_images()
+        self.atlas = atlas or SpriteAtlas()
+        self.set_square_size(square_size)
     
-    def load_images(self):
-        """Load images for all chess pieces"""
-        piece_symbols = ['wp', 'wR', 'wN', 'wB', 'wK', 'wQ', 'bp', 'bR', 'bN', 'bB', 'bK', 'bQ']
+    def set_square_size(self, square_size):
+        """
+        Switch to another square size, e.g. after the window was resized
         
-        for symbol in piece_symbols:
-            try:
-                image_path = os.path.join("images", f"{symbol}.png")
-                self.images[symbol] = pygame.transform.scale(
-                    pygame.image.load(image_path),
-                    (self.square_size, self.square_size)
-                )
-            except pygame.error as e:
-                print(f"Could not load image for {symbol}: {e}")
-                # Create a placeholder if image is missing
-                surface = pygame.Surface((self.square_size, self.square_size))
-                surface.fill((200, 200, 200))
-                pygame.draw.rect(surface, (0, 0, 0), pygame.Rect(0, 0, self.square_size, self.square_size), 2)
-                self.images[symbol] = surface
+        Args:
+            square_size: Size of a square on the board in pixels
+        """
+        self.square_size = square_size
+        sprite_set = self.atlas.get(square_size)
+        self.images = sprite_set.images
+        # Images and top-left corners indexed like board snapshots
+        self.images_by_code = sprite_set.images_by_code
+        self.square_positions = [
+            (col * square_size, row * square_size)
+            for row in range(8)
+            for col in range(8)
+        ]
     
     def draw_piece(self, screen, piece, row, col):
         """
@@ -54,4 +53,44 @@ class PieceView:
                     self.square_size,
                     self.square_size
                 )
-            )
\ No newline at end of file
+            )
+    
+    def draw_code(self, screen, code, row, col):
+        """
+        Draw a piece given by its snapshot code
+        
+        Args:
+            screen: Pygame screen to draw on
+            code: Piece code (see model.piece.piece_code)
+            row: Board row (0-7)
+            col: Board column (0-7)
+        """
+        screen.blit(self.images_by_code[code], self.square_positions[row * 8 + col])
+    
+    def draw_code_at(self, screen, code, position):
+        """
+        Draw a piece off the square grid, e.g. while it is dragged
+        
+        Args:
+            screen: Pygame screen to draw on
+            code: Piece code (see model.piece.piece_code)
+            position: Tuple (x, y) of the top-left corner in pixels
+        
+        Returns:
+            pygame.Rect of the area drawn
+        """
+        return screen.blit(self.images_by_code[code], position)
+    
+    def draw_snapshot(self, screen, snapshot):
+        """
+        Draw every piece of a board snapshot
+        
+        Args:
+            screen: Pygame screen to draw on
+            snapshot: Flat sequence of 64 piece codes (see Board.get_snapshot)
+        """
+        images = self.images_by_code
+        positions = self.square_positions
+        for index, code in enumerate(snapshot):
+            if code:
+                screen.blit(images[code], positions[index])
\ No newline at end of file
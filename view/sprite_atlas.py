@@ -0,0 +1,299 @@
+import hashlib
+import os
+import struct
+import sys
+from collections import OrderedDict
+import pygame
+from model.piece import PIECES
+
+class SpriteSet:
+    """Piece images and board background rendered for one square size"""
+
+    def __init__(self, square_size, images, background, pixels=None):
+        """
+        Initialize the sprite set
+
+        Args:
+            square_size: Size of a square in pixels
+            images: Dictionary mapping piece symbols to surfaces
+            background: Surface holding the empty board
+            pixels: Buffer the surfaces were created on, kept alive with
+                them, or None
+        """
+        self.square_size = square_size
+        self.images = images
+        self.background = background
+        self.pixels = pixels
+
+        # Images indexed like board snapshots
+        self.images_by_code = [None] * len(PIECES)
+        for piece in PIECES:
+            if piece:
+                self.images_by_code[piece.code] = images[piece.symbol]
+
+
+class SpriteAtlas:
+    """
+    Cache of sprites pre-scaled to the square sizes in use
+
+    The piece images are loaded from disk once. For every square size the
+    pieces are scaled and converted to the display pixel format, and the
+    empty board is rendered to a single background surface, so drawing
+    never scales or converts. The most recently used sizes are kept, up to
+    max_sizes, so resizing back and forth between a few window sizes costs
+    nothing after the first time.
+
+    Rendered sizes are also baked to disk as raw pixels, one file per
+    square size named after a hash of the piece images and board colors.
+    Later runs load a size with a single read instead of decoding and
+    scaling the PNGs, and a changed image or color simply misses the
+    cache. Like the sizes in memory, only the max_sizes most recently
+    used files are kept, so resizing the window does not fill the disk.
+
+    Cache layout (little-endian): CACHE_HEADER of magic, square size and
+    dimension, the RGBA pixels of every piece in PIECE_SYMBOLS order, then
+    the RGB pixels of the background.
+    """
+
+    PIECE_SYMBOLS = ['wp', 'wR', 'wN', 'wB', 'wK', 'wQ', 'bp', 'bR', 'bN', 'bB', 'bK', 'bQ']
+    CACHE_MAGIC = b'SPRITES1'
+    CACHE_HEADER = struct.Struct('<8sII')
+
+    def __init__(self, square_colors=((255, 255, 255), (128, 128, 128)),
+                 dimension=8, max_sizes=4, image_dir="images", cache_dir=None, use_cache=True):
+        """
+        Initialize the atlas
+
+        Args:
+            square_colors: RGB colors of the light and dark squares
+            dimension: Board dimension (default: 8x8)
+            max_sizes: Number of square sizes to keep cached
+            image_dir: Directory holding the piece images
+            cache_dir: Directory of the baked sprite files (default: .cache
+                in image_dir)
+            use_cache: Load and bake sprite files at all
+        """
+        self.square_colors = square_colors
+        self.dimension = dimension
+        self.max_sizes = max_sizes
+        self.image_dir = image_dir
+        self.cache_dir = cache_dir or os.path.join(image_dir, ".cache")
+        self.use_cache = use_cache
+        self.asset_hash = None
+        self.source_images = None
+        self.sprite_sets = OrderedDict()
+        # Where the most recent size came from: "memory", "cache" or "rendered"
+        self.last_source = None
+
+    def get(self, square_size):
+        """
+        Get the sprites for a square size, rendering them on first use
+
+        Args:
+            square_size: Size of a square in pixels
+
+        Returns:
+            SpriteSet for the square size
+        """
+        sprite_set = self.sprite_sets.get(square_size)
+        if sprite_set is not None:
+            self.sprite_sets.move_to_end(square_size)
+            self.last_source = "memory"
+            return sprite_set
+
+        sprite_set = self._load_baked(square_size) if self.use_cache else None
+        if sprite_set is not None:
+            self.last_source = "cache"
+        else:
+            sprite_set = SpriteSet(
+                square_size,
+                self._scale_pieces(square_size),
+                self._render_background(square_size)
+            )
+            self.last_source = "rendered"
+            if self.use_cache:
+                self._bake(sprite_set)
+        self.sprite_sets[square_size] = sprite_set
+        if len(self.sprite_sets) > self.max_sizes:
+            # Drop the least recently used size
+            self.sprite_sets.popitem(last=False)
+        return sprite_set
+
+    def clear(self):
+        """Drop every cached size (e.g. after the display format changed)"""
+        self.sprite_sets.clear()
+
+    def _get_asset_hash(self):
+        """Hash the piece image files and board settings that shape the sprites"""
+        if self.asset_hash is None:
+            digest = hashlib.sha1(self.CACHE_MAGIC)
+            digest.update(repr((self.square_colors, self.dimension)).encode())
+            for symbol in self.PIECE_SYMBOLS:
+                digest.update(symbol.encode())
+                try:
+                    with open(os.path.join(self.image_dir, f"{symbol}.png"), 'rb') as image_file:
+                        digest.update(image_file.read())
+                except OSError:
+                    digest.update(b'missing')
+            self.asset_hash = digest.hexdigest()[:16]
+        return self.asset_hash
+
+    def _get_cache_path(self, square_size):
+        """Get the path of the baked sprite file of a square size"""
+        return os.path.join(self.cache_dir, f"sprites-{square_size}-{self._get_asset_hash()}.raw")
+
+    def _load_baked(self, square_size):
+        """
+        Load a square size from its baked sprite file
+
+        Args:
+            square_size: Size of a square in pixels
+
+        Returns:
+            SpriteSet, or None if the size was never baked
+        """
+        path = self._get_cache_path(square_size)
+        try:
+            with open(path, 'rb') as cache_file:
+                pixels = cache_file.read()
+            # Mark the file as recently used for _prune_cache
+            os.utime(path)
+        except OSError:
+            return None
+
+        board_size = square_size * self.dimension
+        piece_bytes = square_size * square_size * 4
+        expected = self.CACHE_HEADER.size + len(self.PIECE_SYMBOLS) * piece_bytes + board_size * board_size * 3
+        if len(pixels) != expected or self.CACHE_HEADER.unpack_from(pixels) != (
+                self.CACHE_MAGIC, square_size, self.dimension):
+            return None
+
+        # The surfaces are views into the buffer until converted
+        view = memoryview(pixels)
+        offset = self.CACHE_HEADER.size
+        images = {}
+        for symbol in self.PIECE_SYMBOLS:
+            images[symbol] = _convert(
+                pygame.image.frombuffer(view[offset:offset + piece_bytes], (square_size, square_size), 'RGBA'),
+                alpha=True
+            )
+            offset += piece_bytes
+        background = _convert(pygame.image.frombuffer(view[offset:], (board_size, board_size), 'RGB'))
+        return SpriteSet(square_size, images, background, pixels)
+
+    def _bake(self, sprite_set):
+        """
+        Write a rendered square size to its sprite file
+
+        Failing to write (e.g. on a read-only install) only costs the
+        speed-up on the next start.
+
+        Args:
+            sprite_set: SpriteSet rendered by this atlas
+        """
+        parts = [self.CACHE_HEADER.pack(self.CACHE_MAGIC, sprite_set.square_size, self.dimension)]
+        for symbol in self.PIECE_SYMBOLS:
+            parts.append(pygame.image.tobytes(sprite_set.images[symbol], 'RGBA'))
+        parts.append(pygame.image.tobytes(sprite_set.background, 'RGB'))
+
+        path = self._get_cache_path(sprite_set.square_size)
+        temporary_path = path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temporary_path, 'wb') as cache_file:
+                cache_file.write(b''.join(parts))
+            os.replace(temporary_path, path)
+            self._prune_cache()
+        except OSError as e:
+            print(f"Could not write sprite cache {path}: {e}", file=sys.stderr)
+
+    def _prune_cache(self):
+        """Delete all but the max_sizes most recently used sprite files"""
+        used = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith("sprites-") and entry.name.endswith(".raw"):
+                try:
+                    used.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    # Pruned by another process meanwhile
+                    pass
+        used.sort(reverse=True)
+        for _, path in used[self.max_sizes:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _load_sources(self):
+        """Load the full-size piece images once"""
+        if self.source_images is not None:
+            return self.source_images
+
+        self.source_images = {}
+        for symbol in self.PIECE_SYMBOLS:
+            try:
+                image_path = os.path.join(self.image_dir, f"{symbol}.png")
+                self.source_images[symbol] = _convert(pygame.image.load(image_path), alpha=True)
+            except pygame.error as e:
+                print(f"Could not load image for {symbol}: {e}", file=sys.stderr)
+                self.source_images[symbol] = None
+        return self.source_images
+
+    def _scale_pieces(self, square_size):
+        """
+        Scale every piece image to a square size
+
+        Args:
+            square_size: Size of a square in pixels
+
+        Returns:
+            Dictionary mapping piece symbols to display-format surfaces
+        """
+        images = {}
+        for symbol, source in self._load_sources().items():
+            if source is not None:
+                # Baked once per size, so the slower filtered scaling is affordable
+                images[symbol] = _convert(_smooth_scale(source, square_size), alpha=True)
+            else:
+                # Create a placeholder if image is missing
+                surface = pygame.Surface((square_size, square_size))
+                surface.fill((200, 200, 200))
+                pygame.draw.rect(surface, (0, 0, 0), pygame.Rect(0, 0, square_size, square_size), 2)
+                images[symbol] = _convert(surface)
+        return images
+
+    def _render_background(self, square_size):
+        """
+        Render the empty board
+
+        Args:
+            square_size: Size of a square in pixels
+
+        Returns:
+            Display-format surface of the whole board
+        """
+        board_size = square_size * self.dimension
+        background = pygame.Surface((board_size, board_size))
+        for row in range(self.dimension):
+            for col in range(self.dimension):
+                background.fill(
+                    self.square_colors[(row + col) % 2],
+                    pygame.Rect(col * square_size, row * square_size, square_size, square_size)
+                )
+        return _convert(background)
+
+
+def _smooth_scale(surface, size):
+    """Scale a surface to a square size, filtered where the format allows"""
+    try:
+        return pygame.transform.smoothscale(surface, (size, size))
+    except ValueError:
+        # smoothscale only handles 24 and 32 bit surfaces
+        return pygame.transform.scale(surface, (size, size))
+
+
+def _convert(surface, alpha=False):
+    """Convert a surface to the display pixel format once a display exists"""
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
\ No newline at end of file